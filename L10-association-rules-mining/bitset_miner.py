@@ -0,0 +1,250 @@
+"""
+Bitset-based frequent itemset mining for association rules
+Each product is stored as a packed bit-vector over all transactions, so the
+support count of any itemset is the popcount of its ANDed columns.
+"""
+
+import numpy as np
+from collections import defaultdict
+
+
+# Popcount lookup for every possible byte value (fallback for numpy < 2.0)
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def popcount(packed):
+    """Count set bits along the last axis of a packed uint8 array"""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(packed).sum(axis=-1, dtype=np.int64)
+    return _POPCOUNT_TABLE[packed].sum(axis=-1, dtype=np.int64)
+
+
+def min_support_count(min_support, n_transactions):
+    """Convert a relative support threshold into an absolute basket count"""
+    return max(1, int(np.ceil(min_support * n_transactions - 1e-9)))
+
+
+class BitsetMiner:
+    """
+    Frequent itemset miner over packed per-item bit-vectors.
+
+    Itemsets are represented as sorted tuples of column indices; `counts`
+    maps every frequent itemset found so far to its absolute support count.
+    """
+
+    def __init__(self, bitsets, n_transactions, items=None):
+        self.bitsets = np.ascontiguousarray(bitsets, dtype=np.uint8)
+        self.n_transactions = n_transactions
+        self.n_items = self.bitsets.shape[0]
+        self.items = list(items) if items is not None else list(range(self.n_items))
+        self.counts = {}
+
+    @classmethod
+    def from_dense(cls, matrix, items=None):
+        """Build a miner from a dense 0/1 matrix (transactions × items)"""
+        matrix = np.asarray(matrix)
+        bitsets = np.packbits(matrix.astype(bool).T, axis=1)
+        return cls(bitsets, matrix.shape[0], items)
+
+    @classmethod
+    def from_dataframe(cls, df):
+        """Build a miner from a binary pandas DataFrame (one column per product)"""
+        return cls.from_dense(df.to_numpy(), items=df.columns)
+
+    # ------------------------------------------------------------------
+    # Support counting
+    # ------------------------------------------------------------------
+
+    def item_index(self, item):
+        """Return the column index of a product name (or pass an index through)"""
+        if isinstance(item, (int, np.integer)):
+            return int(item)
+        return self.items.index(item)
+
+    def itemset_bits(self, itemset):
+        """AND together the bit-vectors of every item in the itemset"""
+        indices = [self.item_index(item) for item in itemset]
+        return np.bitwise_and.reduce(self.bitsets[indices], axis=0)
+
+    def support_count(self, itemset):
+        """Number of transactions that contain every item of the itemset"""
+        if len(itemset) == 0:
+            return self.n_transactions
+        key = tuple(sorted(self.item_index(item) for item in itemset))
+        if key in self.counts:
+            return self.counts[key]
+        return int(popcount(self.itemset_bits(key)))
+
+    def support(self, itemset):
+        """Support(X) = Count(X) / Total Transactions"""
+        return self.support_count(itemset) / self.n_transactions
+
+    # ------------------------------------------------------------------
+    # Apriori
+    # ------------------------------------------------------------------
+
+    def apriori(self, min_support=0.01, max_len=None, allowed_items=None):
+        """
+        Level-wise Apriori with downward-closure pruning.
+
+        A k-itemset is only counted if all of its (k-1)-subsets are frequent.
+        Candidates sharing a (k-1)-prefix are counted together as one
+        vectorized AND + popcount against the parent's bit-vector.
+        Returns the dict of frequent itemsets -> support count.
+        """
+        min_count = min_support_count(min_support, self.n_transactions)
+        candidates = range(self.n_items) if allowed_items is None else \
+            sorted(self.item_index(item) for item in allowed_items)
+        candidates = np.array(list(candidates), dtype=np.int64)
+
+        self.counts = {}
+        item_counts = popcount(self.bitsets[candidates]) if len(candidates) else np.array([])
+        frequent_items = candidates[item_counts >= min_count]
+        for item, count in zip(candidates, item_counts):
+            if count >= min_count:
+                self.counts[(int(item),)] = int(count)
+
+        # Bit-vectors of the current level's frequent itemsets
+        level = {(int(item),): self.bitsets[item] for item in frequent_items}
+        k = 1
+        while level and (max_len is None or k < max_len):
+            next_level = {}
+            for itemset, bits in level.items():
+                last = itemset[-1]
+                extensions = [
+                    item for item in frequent_items
+                    if item > last and self._subsets_frequent(itemset, int(item))
+                ]
+                if not extensions:
+                    continue
+                extension_bits = bits & self.bitsets[extensions]
+                extension_counts = popcount(extension_bits)
+                for item, ext_bits, count in zip(extensions, extension_bits, extension_counts):
+                    if count >= min_count:
+                        new_itemset = itemset + (int(item),)
+                        self.counts[new_itemset] = int(count)
+                        next_level[new_itemset] = ext_bits
+            level = next_level
+            k += 1
+
+        return self.counts
+
+    def _subsets_frequent(self, itemset, item):
+        """Downward closure: every k-subset of itemset + item must be frequent"""
+        if (item,) not in self.counts:
+            return False
+        # Subsets that keep `item` and drop one element of the parent itemset
+        for drop in range(len(itemset)):
+            subset = itemset[:drop] + itemset[drop + 1:] + (item,)
+            if subset not in self.counts:
+                return False
+        return True
+
+    # ------------------------------------------------------------------
+    # FP-Growth
+    # ------------------------------------------------------------------
+
+    def iter_transactions(self, chunk_size=65536):
+        """Yield each transaction as an array of the item indices it contains"""
+        for start in range(0, self.n_transactions, chunk_size):
+            stop = min(start + chunk_size, self.n_transactions)
+            byte_start, byte_stop = start // 8, (stop + 7) // 8
+            rows = np.unpackbits(self.bitsets[:, byte_start:byte_stop], axis=1)
+            rows = rows[:, start - byte_start * 8:stop - byte_start * 8].T
+            for row in rows:
+                yield np.flatnonzero(row)
+
+    def fp_growth(self, min_support=0.01, max_len=None, allowed_items=None):
+        """
+        FP-Growth: compress the transactions into a prefix tree ordered by
+        item frequency and mine it recursively via conditional pattern bases.
+        Produces the same frequent itemsets as `apriori`.
+        """
+        min_count = min_support_count(min_support, self.n_transactions)
+        allowed = None if allowed_items is None else \
+            {self.item_index(item) for item in allowed_items}
+
+        item_counts = popcount(self.bitsets)
+        frequent = {
+            int(item): int(count) for item, count in enumerate(item_counts)
+            if count >= min_count and (allowed is None or item in allowed)
+        }
+        # Order by descending frequency so shared prefixes are as long as possible
+        rank = {item: r for r, item in enumerate(
+            sorted(frequent, key=lambda item: (-frequent[item], item)))}
+
+        # Identical baskets collapse into one weighted path
+        paths = defaultdict(int)
+        for transaction in self.iter_transactions():
+            path = tuple(sorted((int(i) for i in transaction if int(i) in rank),
+                                key=rank.__getitem__))
+            if path:
+                paths[path] += 1
+
+        self.counts = {}
+        self._mine_tree(list(paths.items()), (), min_count, max_len)
+        return self.counts
+
+    def _mine_tree(self, weighted_paths, suffix, min_count, max_len):
+        """Recursively mine the FP-tree built from (path, count) pairs"""
+        header = _build_fp_tree(weighted_paths, min_count)
+        for item, nodes in header.items():
+            count = sum(node.count for node in nodes)
+            itemset = tuple(sorted(suffix + (item,)))
+            self.counts[itemset] = count
+            if max_len is not None and len(itemset) >= max_len:
+                continue
+
+            # Conditional pattern base: prefix paths leading to this item
+            conditional = []
+            for node in nodes:
+                path = []
+                parent = node.parent
+                while parent.item is not None:
+                    path.append(parent.item)
+                    parent = parent.parent
+                if path:
+                    conditional.append((tuple(reversed(path)), node.count))
+            if conditional:
+                self._mine_tree(conditional, suffix + (item,), min_count, max_len)
+
+
+class _FPNode:
+    """Node of an FP-tree"""
+
+    __slots__ = ('item', 'count', 'parent', 'children')
+
+    def __init__(self, item, parent):
+        self.item = item
+        self.count = 0
+        self.parent = parent
+        self.children = {}
+
+
+def _build_fp_tree(weighted_paths, min_count):
+    """
+    Build an FP-tree from (path, count) pairs and return its header table
+    (item -> list of nodes), least frequent item first.
+    """
+    item_counts = defaultdict(int)
+    for path, count in weighted_paths:
+        for item in path:
+            item_counts[item] += count
+    frequent = {item for item, count in item_counts.items() if count >= min_count}
+
+    root = _FPNode(None, None)
+    header = defaultdict(list)
+    for path, count in weighted_paths:
+        node = root
+        for item in path:
+            if item not in frequent:
+                continue
+            child = node.children.get(item)
+            if child is None:
+                child = _FPNode(item, node)
+                node.children[item] = child
+                header[item].append(child)
+            child.count += count
+            node = child
+
+    return dict(sorted(header.items(), key=lambda entry: item_counts[entry[0]]))
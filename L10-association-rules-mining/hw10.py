@@ -1,9 +1,11 @@
 import pandas as pd
 import numpy as np
-from itertools import combinations
 import matplotlib.pyplot as plt
 from collections import defaultdict
 import warnings
+from bitset_miner import BitsetMiner
+from parallel_miner import parallel_mine
+from rule_scoring import score_rules, split_itemsets, top_k_by_lift
 warnings.filterwarnings('ignore')
 
 # Product list
@@ -80,105 +82,67 @@ df = pd.DataFrame(transactions, columns=products)
 print(f"\nData shape: {df.shape}")
 print(f"Number of transactions: {len(df)}")
 
-# Function to calculate Support
-def calculate_support(df, itemset):
-    """
-    Support(X) = Number of transactions containing X / Total number of transactions
-    """
-    if isinstance(itemset, str):
-        itemset = [itemset]
-    
-    # Check that all items in the set were purchased together
-    mask = df[list(itemset)].all(axis=1)
-    support = mask.sum() / len(df)
-    return support
-
-# Function to calculate Confidence
-def calculate_confidence(df, antecedent, consequent):
-    """
-    Confidence(X -> Y) = Support(X ∪ Y) / Support(X)
-    """
-    support_xy = calculate_support(df, list(antecedent) + list(consequent))
-    support_x = calculate_support(df, antecedent)
-    
-    if support_x == 0:
-        return 0
-    return support_xy / support_x
-
-# Function to calculate Lift
-def calculate_lift(df, antecedent, consequent):
-    """
-    Lift(X -> Y) = Confidence(X -> Y) / Support(Y)
-    or
-    Lift(X -> Y) = Support(X ∪ Y) / (Support(X) * Support(Y))
-    """
-    support_xy = calculate_support(df, list(antecedent) + list(consequent))
-    support_x = calculate_support(df, antecedent)
-    support_y = calculate_support(df, consequent)
-    
-    if support_x == 0 or support_y == 0:
-        return 0
-    return support_xy / (support_x * support_y)
-
-# Find association rules - OPTIMIZED VERSION
+# Find association rules - BITSET APRIORI / FP-GROWTH VERSION
 def find_association_rules(df, min_support=0.01, min_confidence=0.3, 
-                          antecedent_size=3, consequent_size=2, max_items=30):
+                          antecedent_size=3, consequent_size=2, max_items=None,
+                          algorithm='apriori', n_workers=None, top_k=None):
     """
     Find association rules with X items in antecedent and Y items in consequent
-    OPTIMIZED: Limits the number of frequent items to analyze
+    Mines frequent itemsets over packed bit-vectors (support = popcount of
+    ANDed columns), so every product can be analyzed. max_items optionally
+    restricts the search to the most frequent products.
+    df can also be a prebuilt BitsetMiner, e.g. from transaction_stream
+    for basket files that do not fit in memory as a DataFrame.
+    algorithm: 'apriori', 'fpgrowth' or 'parallel' (process pool over
+    n_workers cores; run it under `if __name__ == '__main__':` on Windows)
+    All candidate rules are scored in one batched NumPy pass; top_k keeps
+    only the k highest-lift rules (partial selection, no full sort).
     """
-    rules = []
+    miner = df if isinstance(df, BitsetMiner) else BitsetMiner.from_dataframe(df)
     
     # Calculate support for all items and sort by frequency
-    item_support = {}
-    for product in products:
-        sup = calculate_support(df, product)
-        if sup >= min_support:
-            item_support[product] = sup
-    
-    # Take only the most frequent items (limit to max_items)
+    item_support = {product: miner.support([product]) for product in miner.items}
+    item_support = {product: sup for product, sup in item_support.items() 
+                    if sup >= min_support}
     frequent_items = sorted(item_support.keys(), 
                            key=lambda x: item_support[x], 
                            reverse=True)[:max_items]
     
     print(f"\nItems with support above {min_support}: {len(item_support)}")
-    print(f"Using top {len(frequent_items)} items for analysis")
+    print(f"Using {len(frequent_items)} items for analysis ({algorithm})")
+    
+    # Mine every frequent itemset up to the rule size (downward-closure pruning)
+    max_len = antecedent_size + consequent_size
+    if algorithm == 'parallel':
+        itemsets, _ = parallel_mine(miner, min_support=min_support, max_len=max_len,
+                                    allowed_items=frequent_items, n_workers=n_workers)
+    else:
+        mine = miner.fp_growth if algorithm == 'fpgrowth' else miner.apriori
+        itemsets = mine(min_support=min_support, max_len=max_len,
+                        allowed_items=frequent_items)
+    print(f"Frequent itemsets found: {len(itemsets):,}")
     
-    # Calculate total combinations
-    total_combinations = len(list(combinations(frequent_items, antecedent_size))) * \
-                        len(list(combinations(frequent_items, consequent_size)))
-    print(f"Checking {total_combinations:,} combinations...")
+    # Split every frequent (X+Y)-itemset into X -> Y and score all rules at once
+    candidates = np.array([itemset for itemset in itemsets if len(itemset) == max_len],
+                          dtype=np.int64).reshape(-1, max_len)
+    antecedents, consequents = split_itemsets(candidates, antecedent_size)
+    scores = score_rules(miner, antecedents, consequents)
     
-    # Progress counter
-    checked = 0
+    keep = np.flatnonzero(scores['confidence'] >= min_confidence)
+    if top_k is not None:
+        keep = keep[top_k_by_lift(scores['lift'][keep], top_k)]
     
-    # Create combinations
-    for antecedent in combinations(frequent_items, antecedent_size):
-        for consequent in combinations(frequent_items, consequent_size):
-            checked += 1
-            if checked % 10000 == 0:
-                print(f"Progress: {checked:,}/{total_combinations:,} ({checked*100/total_combinations:.1f}%)")
-            
-            # Ensure no overlap between antecedent and consequent
-            if set(antecedent).isdisjoint(set(consequent)):
-                support = calculate_support(df, list(antecedent) + list(consequent))
-                
-                if support >= min_support:
-                    confidence = calculate_confidence(df, antecedent, consequent)
-                    
-                    if confidence >= min_confidence:
-                        lift = calculate_lift(df, antecedent, consequent)
-                        
-                        rules.append({
-                            'antecedent': ' + '.join(antecedent),
-                            'consequent': ' + '.join(consequent),
-                            'support': support,
-                            'confidence': confidence,
-                            'lift': lift
-                        })
+    names = np.array(miner.items, dtype=object)
+    rules = pd.DataFrame({
+        'antecedent': [' + '.join(row) for row in names[antecedents[keep]]],
+        'consequent': [' + '.join(row) for row in names[consequents[keep]]],
+        'support': scores['support'][keep],
+        'confidence': scores['confidence'][keep],
+        'lift': scores['lift'][keep]
+    })
     
     print(f"\nAnalysis complete! Found {len(rules)} rules.")
-    return pd.DataFrame(rules)
+    return rules
 
 # Run the algorithm
 print("\n🔍 Searching for association rules...")
@@ -187,19 +151,21 @@ print("\n🎯 ASSIGNMENT: Finding rules where 3 items → 2 items")
 print("=" * 50)
 
 # OPTIMIZED: Use fewer items for faster processing
-print("\n⚡ FAST MODE: Using top 25 most frequent items")
+print("\n⚡ BITSET MODE: Mining all 169 products with FP-Growth")
 
 # Search ONLY for rules with 3→2 pattern as required
 rules_df = find_association_rules(df, 
-                                  min_support=0.001,  # Very low to find any 5-item combinations
+                                  min_support=0.005,   # 5 baskets - every product, no top-N cap
                                   min_confidence=0.1,  # Lower confidence threshold
                                   antecedent_size=3,   # EXACTLY 3 items in X
                                   consequent_size=2,   # EXACTLY 2 items in Y
-                                  max_items=25)        # REDUCED to 25 for speed!
+                                  algorithm='fpgrowth')
 
-# If no rules found with 25 items, try with 30
+# If no rules found, drop support to a single basket on the top 30 items
+# (at 1 basket almost every 5-item combination is "frequent", so the
+# output itself would explode if all products were included)
 if rules_df.empty:
-    print("\n⚠️ No 3→2 rules found with top 25 items.")
+    print("\n⚠️ No 3→2 rules found with min_support=0.005.")
     print("Trying with top 30 items...")
     
     rules_df = find_association_rules(df, 
@@ -207,7 +173,7 @@ if rules_df.empty:
                                       min_confidence=0.05,  
                                       antecedent_size=3,
                                       consequent_size=2,
-                                      max_items=30)        # Still reasonable
+                                      max_items=30)
     
     if rules_df.empty:
         print("\n❌ No 3→2 rules found even with 30 items.")
@@ -344,7 +310,8 @@ print("""
    
 4. Finding Dependencies:
    - We search for combinations of 3 items leading to 2 items
-   - Scan all possible combinations
+   - Mine frequent itemsets with Apriori / FP-Growth over product bitsets
+   - Support of any itemset = popcount of its ANDed product columns
    - Filter by minimum Support and Confidence thresholds
    - Lift > 1.2 indicates an interesting and strong relationship
 """)
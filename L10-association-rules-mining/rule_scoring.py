@@ -0,0 +1,103 @@
+"""
+Batched Support / Confidence / Lift scoring for many rules at once
+Rules are given as integer arrays of item indices (one row per rule), and
+all metrics are computed with a few NumPy operations instead of one
+DataFrame scan (or dict) per rule.
+"""
+
+import numpy as np
+from itertools import combinations
+
+from bitset_miner import popcount
+
+
+def cooccurrence_counts(miner, chunk_bytes=8192):
+    """
+    Item × item co-occurrence counts (diagonal = single item counts),
+    computed as a matrix product of the unpacked 0/1 columns, one chunk
+    of baskets at a time.
+    """
+    n_items = miner.n_items
+    counts = np.zeros((n_items, n_items), dtype=np.int64)
+    for start in range(0, miner.bitsets.shape[1], chunk_bytes):
+        block = np.unpackbits(miner.bitsets[:, start:start + chunk_bytes], axis=1)
+        block = block.astype(np.float32)
+        counts += np.rint(block @ block.T).astype(np.int64)
+    return counts
+
+
+def itemset_counts(miner, itemsets, pair_counts=None, memory_budget=64 * 2**20):
+    """
+    Support counts for an (R, k) array of itemsets.
+
+    k = 1 and k = 2 are table lookups in the co-occurrence matrix when it
+    is given; higher orders AND the k bit-vectors of each row together and
+    popcount the result, in row chunks that fit into memory_budget bytes.
+    """
+    itemsets = np.asarray(itemsets, dtype=np.int64)
+    n_rules, k = itemsets.shape
+    if pair_counts is not None and k == 1:
+        return pair_counts[itemsets[:, 0], itemsets[:, 0]]
+    if pair_counts is not None and k == 2:
+        return pair_counts[itemsets[:, 0], itemsets[:, 1]]
+
+    n_bytes = miner.bitsets.shape[1]
+    rows_per_chunk = max(1, memory_budget // max(1, k * n_bytes))
+    counts = np.empty(n_rules, dtype=np.int64)
+    for start in range(0, n_rules, rows_per_chunk):
+        chunk = itemsets[start:start + rows_per_chunk]
+        bits = np.bitwise_and.reduce(miner.bitsets[chunk], axis=1)
+        counts[start:start + len(chunk)] = popcount(bits)
+    return counts
+
+
+def score_rules(miner, antecedents, consequents, pair_counts=None):
+    """
+    Score rules X -> Y given as index arrays antecedents (R, a) and
+    consequents (R, c). Returns a dict of support, confidence and lift
+    arrays (each of length R).
+    """
+    antecedents = np.asarray(antecedents, dtype=np.int64)
+    consequents = np.asarray(consequents, dtype=np.int64)
+    if pair_counts is None and min(antecedents.shape[1], consequents.shape[1]) <= 2:
+        pair_counts = cooccurrence_counts(miner)
+
+    n = miner.n_transactions
+    count_xy = itemset_counts(miner, np.hstack([antecedents, consequents]), pair_counts)
+    count_x = itemset_counts(miner, antecedents, pair_counts)
+    count_y = itemset_counts(miner, consequents, pair_counts)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        confidence = np.where(count_x > 0, count_xy / count_x, 0.0)
+        lift = np.where(count_y > 0, confidence * n / count_y, 0.0)
+    return {
+        'support': count_xy / n,
+        'confidence': confidence,
+        'lift': lift,
+    }
+
+
+def split_itemsets(itemsets, antecedent_size):
+    """
+    Every way of splitting each row of an (M, k) itemset array into
+    antecedent (antecedent_size items) and consequent (the rest).
+    Returns (antecedents, consequents) index arrays with M * C(k, a) rows.
+    """
+    itemsets = np.asarray(itemsets, dtype=np.int64)
+    k = itemsets.shape[1]
+    splits = list(combinations(range(k), antecedent_size))
+    ante_pos = np.array(splits, dtype=np.int64)
+    cons_pos = np.array([[p for p in range(k) if p not in split] for split in splits],
+                        dtype=np.int64).reshape(len(splits), k - antecedent_size)
+    antecedents = itemsets[:, ante_pos].reshape(-1, antecedent_size)
+    consequents = itemsets[:, cons_pos].reshape(-1, k - antecedent_size)
+    return antecedents, consequents
+
+
+def top_k_by_lift(lift, k):
+    """Indices of the k highest-lift rules (descending), without a full sort"""
+    lift = np.asarray(lift)
+    if k >= len(lift):
+        return np.argsort(-lift, kind='stable')
+    top = np.argpartition(-lift, k - 1)[:k]
+    return top[np.argsort(-lift[top], kind='stable')]
@@ -0,0 +1,168 @@
+"""
+Streaming (out-of-core) transaction ingestion for association rule mining
+Baskets are read lazily from disk and packed straight into per-item
+bit-vectors, so the dense transactions × products 0/1 matrix is never built.
+"""
+
+import numpy as np
+import pandas as pd
+from collections import Counter
+
+from bitset_miner import BitsetMiner, min_support_count
+
+
+def read_basket_file(path, sep=','):
+    """
+    Yield one basket (list of item names) per line of a text file.
+    A blank line is an empty basket - it still counts as a transaction.
+    """
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            basket = [item.strip() for item in line.split(sep)]
+            yield [item for item in basket if item]
+
+
+def read_binary_csv(path, chunksize=100_000):
+    """Yield a 0/1 transaction CSV (header = product names) in row chunks"""
+    yield from pd.read_csv(path, chunksize=chunksize)
+
+
+class BitsetBuilder:
+    """
+    Incrementally pack transactions into per-item bit-vectors.
+
+    Rows are buffered in chunks of at most `chunk_size` baskets, packed
+    into bytes and then dropped, so memory holds one chunk plus the packed
+    bits (1 bit per basket per item). If `items` is given, only those
+    items are kept (e.g. the frequent items from a first pass); otherwise
+    the vocabulary grows as new items are seen.
+    """
+
+    def __init__(self, items=None, chunk_size=65536):
+        if chunk_size % 8:
+            raise ValueError("chunk_size must be a multiple of 8")
+        self.fixed_items = items is not None
+        self.items = list(items) if items is not None else []
+        self.index = {item: i for i, item in enumerate(self.items)}
+        self.chunk_size = chunk_size
+        self.n_transactions = 0
+        self._packed = []        # list of (n_items_at_that_time, n_bytes) arrays
+        self._baskets = []       # pending baskets as lists of column indices
+        self._remainder = None   # < 8 dense rows that did not fill a whole byte
+
+    def _column(self, item):
+        column = self.index.get(item)
+        if column is None and not self.fixed_items:
+            column = len(self.items)
+            self.items.append(item)
+            self.index[item] = column
+        return column
+
+    def add_basket(self, basket):
+        """Add one transaction given as an iterable of item names"""
+        columns = [self._column(item) for item in basket]
+        self._baskets.append([c for c in columns if c is not None])
+        if len(self._baskets) >= self.chunk_size:
+            self._flush_baskets()
+
+    def add_baskets(self, baskets):
+        """Add every transaction from an iterable / generator of baskets"""
+        for basket in baskets:
+            self.add_basket(basket)
+        return self
+
+    def add_dense_chunk(self, chunk):
+        """Add a 0/1 DataFrame chunk (rows = transactions, columns = items)"""
+        self._flush_baskets()
+        columns = [self._column(item) for item in chunk.columns]
+        keep = [i for i, c in enumerate(columns) if c is not None]
+        rows = np.zeros((len(chunk), len(self.items)), dtype=bool)
+        rows[:, [columns[i] for i in keep]] = chunk.to_numpy()[:, keep] != 0
+        self._add_rows(rows)
+        return self
+
+    def _flush_baskets(self):
+        if not self._baskets:
+            return
+        rows = np.zeros((len(self._baskets), len(self.items)), dtype=bool)
+        for r, columns in enumerate(self._baskets):
+            rows[r, columns] = True
+        self._baskets = []
+        self._add_rows(rows)
+
+    def _add_rows(self, rows):
+        """Pack whole bytes of rows; keep the < 8 leftover rows for the next call"""
+        self.n_transactions += len(rows)
+        if self._remainder is not None:
+            remainder = np.zeros((len(self._remainder), rows.shape[1]), dtype=bool)
+            remainder[:, :self._remainder.shape[1]] = self._remainder
+            rows = np.vstack([remainder, rows])
+            self._remainder = None
+
+        full = len(rows) - len(rows) % 8
+        if full:
+            self._packed.append(np.packbits(rows[:full].T, axis=1))
+        if full < len(rows):
+            self._remainder = rows[full:]
+
+    def build(self):
+        """Finish ingestion and return a BitsetMiner over the packed columns"""
+        self._flush_baskets()
+        n_items = len(self.items)
+        n_bytes = (self.n_transactions + 7) // 8
+        bitsets = np.zeros((n_items, n_bytes), dtype=np.uint8)
+
+        offset = 0
+        for packed in self._packed:
+            bitsets[:packed.shape[0], offset:offset + packed.shape[1]] = packed
+            offset += packed.shape[1]
+        if self._remainder is not None:
+            tail = np.packbits(self._remainder.T, axis=1)
+            bitsets[:tail.shape[0], offset:offset + tail.shape[1]] = tail
+
+        self._packed = []
+        self._remainder = None
+        return BitsetMiner(bitsets, self.n_transactions, self.items)
+
+
+def count_items(baskets):
+    """First pass: item frequencies and number of transactions, in one scan"""
+    counts = Counter()
+    n_transactions = 0
+    for basket in baskets:
+        counts.update(set(basket))
+        n_transactions += 1
+    return counts, n_transactions
+
+
+def count_items_csv(chunks):
+    """First pass over 0/1 DataFrame chunks: column sums and number of rows"""
+    counts = Counter()
+    n_transactions = 0
+    for chunk in chunks:
+        counts.update((chunk != 0).sum().to_dict())
+        n_transactions += len(chunk)
+    return counts, n_transactions
+
+
+def two_pass_miner(open_stream, min_support=0.01, binary_csv=False, chunk_size=65536):
+    """
+    Two-pass out-of-core ingestion.
+
+    open_stream() must return a fresh generator each time it is called
+    (e.g. `lambda: read_basket_file(path)`). Pass 1 counts single items,
+    pass 2 packs bit-vectors for the frequent items only - infrequent items
+    can never be part of a frequent itemset (downward closure).
+    """
+    count = count_items_csv if binary_csv else count_items
+    counts, n_transactions = count(open_stream())
+    min_count = min_support_count(min_support, n_transactions)
+    frequent_items = [item for item, c in counts.items() if c >= min_count]
+
+    builder = BitsetBuilder(items=frequent_items, chunk_size=chunk_size)
+    if binary_csv:
+        for chunk in open_stream():
+            builder.add_dense_chunk(chunk)
+    else:
+        builder.add_baskets(open_stream())
+    return builder.build()
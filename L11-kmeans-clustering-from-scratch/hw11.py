@@ -1,6 +1,12 @@
+import sys
+from pathlib import Path
+
 import numpy as np
 import matplotlib.pyplot as plt
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.kmeans import KMeansEngine
+
 # הגדרת פרמטרים
 n_total = 6000  # סה"כ נקודות
 n_clusters = 3
@@ -71,47 +77,18 @@ print(f"\n=== מערך הנתונים הסופי ===")
 print(f"סה\"כ רשומות (כולל כפילויות): {len(X)}")
 print(f"נקודות ייחודיות ממשיות: {n_unique_per_cluster * 3 + n_shared}")
 
-# ===== מימוש K-means ידני =====
+# ===== מימוש K-means (מנוע משותף: אתחול k-means++, מרחקים ב-GEMM) =====
 def kmeans(X, k=3, max_iters=100):
     """מימוש אלגוריתם K-means"""
-    n_samples = X.shape[0]
-    
-    # אתחול מרכזים אקראיים
-    random_indices = np.random.choice(n_samples, k, replace=False)
-    centers = X[random_indices].copy()
-    
-    for iteration in range(max_iters):
-        # חישוב מרחקים
-        distances = np.zeros((n_samples, k))
-        for i in range(k):
-            distances[:, i] = np.sqrt(np.sum((X - centers[i])**2, axis=1))
-        
-        # שיוך לקלאסטר הקרוב ביותר
-        labels = np.argmin(distances, axis=1)
-        
-        # עדכון מרכזים
-        new_centers = np.zeros((k, X.shape[1]))
-        for i in range(k):
-            cluster_points = X[labels == i]
-            if len(cluster_points) > 0:
-                new_centers[i] = cluster_points.mean(axis=0)
-            else:
-                new_centers[i] = centers[i]
-        
-        # בדיקת התכנסות
-        if np.allclose(centers, new_centers, rtol=1e-6):
-            print(f"K-means התכנס אחרי {iteration + 1} איטרציות")
-            break
-        
-        centers = new_centers
-    
-    # חישוב inertia
-    inertia = 0
-    for i in range(k):
-        cluster_points = X[labels == i]
-        inertia += np.sum((cluster_points - centers[i])**2)
-    
-    return labels, centers, inertia
+    # Hamerly: אותה תוצאה כמו Lloyd, מדלג על מרחקים שלא יכולים לשנות שיוך
+    engine = KMeansEngine(n_clusters=k, max_iter=max_iters, algorithm="hamerly",
+                          random_state=np.random.randint(2**31))
+    engine.fit(X)
+    print(f"K-means התכנס אחרי {engine.n_iter_} איטרציות")
+    total = engine.distance_evaluations_ + engine.skipped_distance_evaluations_
+    print(f"חישובי מרחק: {engine.distance_evaluations_:,} מתוך {total:,} "
+          f"(דולגו {engine.skipped_distance_evaluations_:,})")
+    return engine.labels_, engine.cluster_centers_, engine.inertia_
 
 
 # הרצת K-means
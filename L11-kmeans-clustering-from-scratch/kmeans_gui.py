@@ -3,9 +3,12 @@ Interactive GUI application for K-means algorithm
 Allows dragging clusters, exploding clusters, and running K-means with accuracy display
 """
 
-import itertools
+import queue
+import sys
+import threading
 import tkinter as tk
 from dataclasses import dataclass
+from pathlib import Path
 from tkinter import ttk
 
 import matplotlib
@@ -15,6 +18,10 @@ import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.kmeans import KMeansEngine
+from common.label_matching import confusion_matrix, match_labels
+
 
 # =============================================================================
 # Data creation
@@ -96,49 +103,30 @@ def create_gaussian_dataset(
 def run_kmeans(
     points: np.ndarray, 
     k: int = 3, 
-    max_iters: int = 200
+    max_iters: int = 200,
+    algorithm: str = "auto",
+    batch_size: int = 4096,
 ) -> tuple[np.ndarray, np.ndarray]:
     """
-    Runs K-means algorithm
+    Runs K-means algorithm (shared engine: k-means++ init, GEMM distances)
+    
+    Args:
+        algorithm: "lloyd" (full batch), "hamerly" (full batch, skips
+            distances that cannot change an assignment), "minibatch", or
+            "auto" - Hamerly up to 100,000 points, mini-batch above
+        batch_size: Points per mini-batch step
     
     Returns:
         labels: Labels for each point (0, 1, or 2)
         centers: Found cluster centers
     """
-    rng = np.random.default_rng()
-    n_samples = points.shape[0]
-    
-    # Random initialization of centers
-    initial_indices = rng.choice(n_samples, size=k, replace=False)
-    centers = points[initial_indices].copy()
-
-    # Iteration loop
-    for _ in range(max_iters):
-        # Calculate distances from each point to each center
-        distances = np.linalg.norm(
-            points[:, None, :] - centers[None, :, :], 
-            axis=2
-        )
-        
-        # Assign each point to the nearest center
-        labels = distances.argmin(axis=1)
-
-        # Update centers
-        new_centers = np.zeros_like(centers)
-        for i in range(k):
-            mask = labels == i
-            if mask.any():
-                new_centers[i] = points[mask].mean(axis=0)
-            else:
-                new_centers[i] = centers[i]
-
-        # Check convergence
-        if np.allclose(new_centers, centers):
-            centers = new_centers
-            break
-        centers = new_centers
-
-    return labels, centers
+    engine = KMeansEngine(
+        n_clusters=k,
+        max_iter=max_iters,
+        algorithm=algorithm,
+        batch_size=batch_size,
+    ).fit(points)
+    return engine.labels_, engine.cluster_centers_
 
 
 # =============================================================================
@@ -150,11 +138,8 @@ def compute_confusion_matrix(
     predicted_labels: np.ndarray, 
     k: int
 ) -> np.ndarray:
-    """Creates confusion matrix"""
-    matrix = np.zeros((k, k), dtype=int)
-    for t, p in zip(true_labels, predicted_labels):
-        matrix[t, p] += 1
-    return matrix
+    """Creates confusion matrix (single np.bincount, no loop over points)"""
+    return confusion_matrix(true_labels, predicted_labels, k, k)
 
 
 def evaluate_clustering(
@@ -172,27 +157,22 @@ def evaluate_clustering(
     matrix = compute_confusion_matrix(true_labels, predicted_labels, k)
 
     # Find the best matching between original and predicted labels
-    best_accuracy = 0.0
-    best_mapping: dict[int, int] | None = None
-
-    for permutation in itertools.permutations(range(k)):
-        correct = sum(matrix[i, permutation[i]] for i in range(k))
-        accuracy = correct / matrix.sum()
-        if accuracy > best_accuracy:
-            best_accuracy = accuracy
-            best_mapping = {permutation[i]: i for i in range(k)}
+    # (Hungarian algorithm, O(k³) instead of trying all k! permutations)
+    best_mapping = match_labels(matrix)
+    correct = sum(matrix[original, predicted] 
+                  for predicted, original in best_mapping.items())
+    best_accuracy = correct / matrix.sum() if matrix.sum() else 0.0
 
     # Calculate accuracy for each cluster
     cluster_scores: dict[int, float] = {}
-    if best_mapping is not None:
-        for predicted_cluster, original_cluster in best_mapping.items():
-            total = matrix[:, predicted_cluster].sum()
-            if total:
-                cluster_scores[original_cluster] = (
-                    matrix[original_cluster, predicted_cluster] / total
-                )
-            else:
-                cluster_scores[original_cluster] = 0.0
+    for predicted_cluster, original_cluster in best_mapping.items():
+        total = matrix[:, predicted_cluster].sum()
+        if total:
+            cluster_scores[original_cluster] = (
+                matrix[original_cluster, predicted_cluster] / total
+            )
+        else:
+            cluster_scores[original_cluster] = 0.0
 
     return best_accuracy, cluster_scores
 
@@ -213,6 +193,11 @@ class KMeansGUI:
     EDGE_COLORS = ["darkred", "darkgreen", "navy"]
     MARKERS = ["o", "s", "^"]  # Circle, square, triangle
 
+    # Live mode: redraw rate limit and K-means iterations per drag update
+    TARGET_FPS = 30
+    LIVE_ITERATIONS = 5
+    LIVE_POLL_MS = 15
+
     def __init__(self, cluster_data: ClusterData):
         self.data = cluster_data
         self.points = self.data.points.copy()
@@ -222,6 +207,19 @@ class KMeansGUI:
         # Variables for dragging
         self.dragging_cluster: int | None = None
         self._drag_reference: np.ndarray | None = None
+        # Point indices of each cluster (instead of a boolean mask per event)
+        self._cluster_indices = [
+            np.flatnonzero(self.original_labels == idx) for idx in range(3)
+        ]
+
+        # Live re-clustering state
+        self.kmeans_centers: np.ndarray | None = None
+        self._redraw_pending = False
+        self._live_thread: threading.Thread | None = None
+        self._live_dirty = False
+        self._live_results: queue.Queue = queue.Queue()
+        # Bumped by a reset; results of passes started before it are dropped
+        self._live_generation = 0
 
         # Create main window
         self.root = tk.Tk()
@@ -301,6 +299,15 @@ class KMeansGUI:
         )
         reset_button.grid(row=6, column=0, sticky="ew", pady=2)
 
+        # Live mode: re-cluster in the background while dragging
+        self.live_var = tk.BooleanVar(value=False)
+        live_check = ttk.Checkbutton(
+            controls_frame,
+            text="Live K-means while dragging",
+            variable=self.live_var
+        )
+        live_check.grid(row=7, column=0, sticky="w", pady=(6, 2))
+
         # Statistics labels
         self.cluster_stat_labels: list[ttk.Label] = []
         for idx in range(3):
@@ -336,8 +343,10 @@ class KMeansGUI:
         self.ax_points.set_xlim(-3, 13)
         self.ax_points.set_ylim(-3, 8)
 
-        # Scatter of all points (original colors)
+        # Scatter of all points (original colors - labels never change)
         self.base_scatter = self.ax_points.scatter([], [], s=20, alpha=0.6)
+        self.base_scatter.set_facecolors(self.COLORS[self.original_labels])
+        self.base_scatter.set_edgecolors("none")
         
         # Scatter of cluster centers
         self.center_scatter = self.ax_points.scatter(
@@ -350,22 +359,63 @@ class KMeansGUI:
             zorder=10
         )
         
-        # Lists for K-means results
-        self.assignment_scatters: list = []
-        self.kmeans_center_scatter = None
+        # K-means results: one outline scatter per cluster, created once
+        # and updated in place with set_offsets
+        self.assignment_scatters: list = [
+            self.ax_points.scatter(
+                [], [],
+                facecolors="none",
+                edgecolors=self.EDGE_COLORS[cluster_idx],
+                linewidths=1.2,
+                marker=self.MARKERS[cluster_idx],
+                s=60,
+                alpha=0.8
+            )
+            for cluster_idx in range(3)
+        ]
+        self.kmeans_center_scatter = self.ax_points.scatter(
+            [], [],
+            marker="X",
+            s=250,
+            edgecolors="yellow",
+            linewidths=2,
+            zorder=11
+        )
+        self.kmeans_center_scatter.set_facecolors(self.EDGE_COLORS)
 
-        # Accuracy graph
+        # Accuracy graph: four bars with a percentage above each, created
+        # once (empty) and updated in place with set_height / set_text
         self.ax_stats.set_title("K-means Accuracy", fontsize=14, fontweight='bold')
         self.ax_stats.set_ylim(0, 1.05)
         self.ax_stats.set_ylabel("Accuracy")
         self.ax_stats.grid(True, alpha=0.3, axis='y')
+        self.accuracy_bars = self.ax_stats.bar(
+            range(4),
+            [0.0] * 4,
+            color=["#555555", "#d94c4c", "#4cd96a", "#4c6cd9"],
+            edgecolor='black',
+            linewidth=1.5
+        )
+        self.accuracy_texts = [
+            self.ax_stats.text(
+                bar.get_x() + bar.get_width() / 2,
+                0.02,
+                "",
+                ha="center",
+                va="bottom",
+                fontweight='bold',
+                fontsize=10
+            )
+            for bar in self.accuracy_bars
+        ]
+        self.ax_stats.set_xticks(range(4))
+        self.ax_stats.set_xticklabels(
+            ["Total", "Cluster 1", "Cluster 2", "Cluster 3"]
+        )
 
     def _update_scatter(self) -> None:
         """Updates the point display"""
-        colors = self.COLORS[self.original_labels]
         self.base_scatter.set_offsets(self.points)
-        self.base_scatter.set_facecolors(colors)
-        self.base_scatter.set_edgecolors("none")
         self.center_scatter.set_offsets(self.cluster_centers)
         self._clear_assignments()
         
@@ -376,14 +426,28 @@ class KMeansGUI:
         self.canvas.draw_idle()
 
     def _clear_assignments(self) -> None:
-        """Clears previous K-means results"""
+        """Clears previous K-means results (artists are kept for reuse)"""
+        empty = np.empty((0, 2))
         for scatter in self.assignment_scatters:
-            scatter.remove()
-        self.assignment_scatters.clear()
+            scatter.set_offsets(empty)
+        self.kmeans_center_scatter.set_offsets(empty)
 
-        if self.kmeans_center_scatter is not None:
-            self.kmeans_center_scatter.remove()
-            self.kmeans_center_scatter = None
+    def _schedule_redraw(self) -> None:
+        """Coalesces redraw requests to at most TARGET_FPS frames per second"""
+        if self._redraw_pending:
+            return
+        self._redraw_pending = True
+        self.root.after(int(1000 / self.TARGET_FPS), self._flush_redraw)
+
+    def _flush_redraw(self) -> None:
+        """Pushes the current point positions to the plot"""
+        self._redraw_pending = False
+        self.base_scatter.set_offsets(self.points)
+        self.center_scatter.set_offsets(self.cluster_centers)
+        if not self.live_var.get():
+            self._clear_assignments()
+        self._update_stats_labels()
+        self.canvas.draw_idle()
 
     # -------------------------------------------------------------------------
     # Cluster dragging
@@ -419,12 +483,12 @@ class KMeansGUI:
         self._drag_reference = current
 
         # Move all points in the cluster and the center
-        mask = self.original_labels == self.dragging_cluster
-        self.points[mask] += delta
+        self.points[self._cluster_indices[self.dragging_cluster]] += delta
         self.cluster_centers[self.dragging_cluster] += delta
 
-        self._update_scatter()
-        self._update_stats_labels()
+        if self.live_var.get():
+            self._request_live_kmeans()
+        self._schedule_redraw()
         self.status_var.set(f"Dragging cluster {self.dragging_cluster + 1}")
 
     def _on_release(self, _event):
@@ -463,6 +527,13 @@ class KMeansGUI:
         """Returns data to initial state"""
         self.points = self.data.points.copy()
         self.cluster_centers = self.data.centers.copy()
+
+        # Forget K-means results, including a live pass still running
+        self.kmeans_centers = None
+        self._live_dirty = False
+        self._live_generation += 1
+        self._clear_accuracy()
+
         self._update_scatter()
         self._update_stats_labels()
         self.status_var.set("Data reset to initial state")
@@ -470,10 +541,73 @@ class KMeansGUI:
     def _run_kmeans(self) -> None:
         """Runs the K-means algorithm"""
         labels, centers = run_kmeans(self.points, k=3)
+        self.kmeans_centers = centers
         self._update_assignments(labels, centers)
         self._update_accuracy(labels)
         self.status_var.set("K-means completed!")
 
+    # -------------------------------------------------------------------------
+    # Live re-clustering
+    # -------------------------------------------------------------------------
+
+    def _request_live_kmeans(self) -> None:
+        """
+        Re-clusters in a background thread, warm-started from the previous
+        K-means centers. Only one pass runs at a time; drags that arrive
+        meanwhile mark the result dirty and trigger one more pass.
+        """
+        if self._live_thread is not None and self._live_thread.is_alive():
+            self._live_dirty = True
+            return
+
+        self._live_dirty = False
+        start_centers = (
+            self.kmeans_centers if self.kmeans_centers is not None
+            else self.cluster_centers
+        )
+        self._live_thread = threading.Thread(
+            target=self._live_worker,
+            args=(self._live_generation, self.points.copy(), start_centers.copy()),
+            daemon=True,
+        )
+        self._live_thread.start()
+        self.root.after(self.LIVE_POLL_MS, self._poll_live_results)
+
+    def _live_worker(
+        self,
+        generation: int,
+        points: np.ndarray,
+        centers: np.ndarray
+    ) -> None:
+        """Runs a few warm-started iterations (no Tk calls in this thread)"""
+        engine = KMeansEngine(
+            n_clusters=3,
+            init=centers,
+            max_iter=self.LIVE_ITERATIONS,
+            algorithm="hamerly",
+        ).fit(points)
+        self._live_results.put((generation, engine.labels_, engine.cluster_centers_))
+
+    def _poll_live_results(self) -> None:
+        """Applies a finished background pass on the Tk thread"""
+        try:
+            generation, labels, centers = self._live_results.get_nowait()
+        except queue.Empty:
+            self.root.after(self.LIVE_POLL_MS, self._poll_live_results)
+            return
+
+        # The worker's last step is posting the result; wait for it to exit
+        # so a dirty re-run below is never dropped as "still running"
+        self._live_thread.join()
+        self._live_thread = None
+        if generation == self._live_generation:
+            self.kmeans_centers = centers
+            if self.live_var.get():
+                self._update_assignments(labels, centers)
+                self._update_accuracy(labels)
+        if self._live_dirty:
+            self._request_live_kmeans()
+
     # -------------------------------------------------------------------------
     # Display update
     # -------------------------------------------------------------------------
@@ -484,82 +618,38 @@ class KMeansGUI:
         centers: np.ndarray
     ) -> None:
         """Displays K-means results - frames around points"""
-        self._clear_assignments()
+        # Move the frames of each cluster (existing artists, no new scatters)
+        for cluster_idx, scatter in enumerate(self.assignment_scatters):
+            scatter.set_offsets(self.points[labels == cluster_idx])
 
-        # Draw frames around each point according to its new cluster
-        for cluster_idx in range(3):
-            mask = labels == cluster_idx
-            if not mask.any():
-                continue
-            
-            scatter = self.ax_points.scatter(
-                self.points[mask, 0],
-                self.points[mask, 1],
-                facecolors="none",
-                edgecolors=self.EDGE_COLORS[cluster_idx],
-                linewidths=1.2,
-                marker=self.MARKERS[cluster_idx],
-                s=60,
-                alpha=0.8
-            )
-            self.assignment_scatters.append(scatter)
-
-        # Draw new K-means centers
-        self.kmeans_center_scatter = self.ax_points.scatter(
-            centers[:, 0],
-            centers[:, 1],
-            marker="X",
-            s=250,
-            c=["darkred", "darkgreen", "navy"],
-            edgecolors="yellow",
-            linewidths=2,
-            zorder=11
-        )
+        # Show new K-means centers
+        self.kmeans_center_scatter.set_offsets(centers)
 
         self.canvas.draw_idle()
 
     def _update_accuracy(self, labels: np.ndarray) -> None:
-        """Updates the accuracy graph"""
+        """Updates the accuracy graph (bars and labels are reused)"""
         accuracy, per_cluster = evaluate_clustering(
             self.original_labels, labels, k=3
         )
 
         cluster_values = [per_cluster.get(idx, 0.0) for idx in range(3)]
-
-        # Clear and redraw the graph
-        self.ax_stats.cla()
-        self.ax_stats.set_title("K-means Accuracy", fontsize=14, fontweight='bold')
-        self.ax_stats.set_ylim(0, 1.05)
-        self.ax_stats.set_ylabel("Accuracy")
-        self.ax_stats.grid(True, alpha=0.3, axis='y')
-        
-        bars = self.ax_stats.bar(
-            range(4),
-            [accuracy] + cluster_values,
-            color=["#555555", "#d94c4c", "#4cd96a", "#4c6cd9"],
-            edgecolor='black',
-            linewidth=1.5
-        )
-        
-        # Add percentages on top of bars
-        for bar, value in zip(bars, [accuracy] + cluster_values):
-            height = bar.get_height()
-            self.ax_stats.text(
-                bar.get_x() + bar.get_width() / 2,
-                height + 0.02,
-                f"{value*100:.1f}%",
-                ha="center",
-                va="bottom",
-                fontweight='bold',
-                fontsize=10
-            )
-        
-        self.ax_stats.set_xticks(range(4))
-        self.ax_stats.set_xticklabels(
-            ["Total", "Cluster 1", "Cluster 2", "Cluster 3"]
-        )
+        self._set_accuracy_bars([accuracy] + cluster_values)
         self.canvas.draw_idle()
 
+    def _set_accuracy_bars(self, values: list) -> None:
+        """Moves the accuracy bars and their percentages to new values"""
+        for bar, text, value in zip(self.accuracy_bars, self.accuracy_texts, values):
+            bar.set_height(value)
+            text.set_y(value + 0.02)
+            text.set_text(f"{value*100:.1f}%")
+
+    def _clear_accuracy(self) -> None:
+        """Empties the accuracy graph (artists are kept for reuse)"""
+        for bar, text in zip(self.accuracy_bars, self.accuracy_texts):
+            bar.set_height(0.0)
+            text.set_text("")
+
     def _update_stats_labels(self) -> None:
         """Updates the statistics labels"""
         for idx in range(3):
@@ -0,0 +1,267 @@
+"""
+Body Extraction Micro-Benchmark
+
+Times MIME body extraction and HTML-to-text conversion over a corpus of
+captured Gmail message payloads (JSON files with the format='full'
+response of messages().get), comparing the two ways EmailFetcher reads
+bodies with the previous regex-based implementation: the preview an
+Excel export without --full-body needs, and the whole body that CSV,
+Parquet, --full-body and the MCP fetch tools need.
+
+Usage:
+  # Capture a corpus from your mailbox
+  python benchmark_body.py --capture "label:newsletters" --max 200 --corpus corpus
+
+  # Run the benchmark (synthetic corpus if the directory does not exist)
+  python benchmark_body.py --corpus corpus --repeat 5
+"""
+
+import argparse
+import base64
+import json
+import os
+import re
+import time
+from typing import Callable, Dict, List
+
+from excel_handler import PREVIEW_BODY_CHARS
+from mime_body import extract_body
+
+
+def legacy_extract_body(payload: Dict) -> str:
+    """
+    Previous implementation: recursive walk, full decode, regex HTML strip.
+
+    Args:
+        payload: Gmail message payload
+
+    Returns:
+        Email body text
+    """
+    def decode(data):
+        return base64.urlsafe_b64decode(data).decode('utf-8', errors='ignore')
+
+    def html_to_text(html):
+        text = re.sub(r'<[^>]+>', '', html)
+        text = text.replace('&nbsp;', ' ')
+        text = text.replace('&amp;', '&')
+        text = text.replace('&lt;', '<')
+        text = text.replace('&gt;', '>')
+        text = text.replace('&quot;', '"')
+        return text.strip()
+
+    def from_parts(parts):
+        body = ''
+        for part in parts:
+            mime_type = part.get('mimeType', '')
+            if mime_type == 'text/plain':
+                if 'data' in part.get('body', {}):
+                    body = decode(part['body']['data'])
+                    break
+            elif mime_type == 'text/html' and not body:
+                if 'data' in part.get('body', {}):
+                    body = html_to_text(decode(part['body']['data']))
+            elif 'parts' in part:
+                body = from_parts(part['parts'])
+                if body:
+                    break
+        return body
+
+    if 'body' in payload and 'data' in payload['body']:
+        return decode(payload['body']['data'])
+    if 'parts' in payload:
+        return from_parts(payload['parts'])
+    return ''
+
+
+def _encode(text: str) -> str:
+    """Base64url encode text like the Gmail API does."""
+    return base64.urlsafe_b64encode(text.encode('utf-8')).decode('ascii')
+
+
+def synthetic_corpus(count: int = 300) -> List[Dict]:
+    """
+    Build newsletter-like messages (HTML-only, multipart/alternative
+    and messages with attachments).
+
+    Args:
+        count: Number of messages
+
+    Returns:
+        List of Gmail message objects
+    """
+    messages = []
+    for i in range(count):
+        rows = ''.join(
+            f'<tr><td style="padding:8px 16px;font-family:Arial,sans-serif;'
+            f'font-size:14px;color:#333333;line-height:20px">'
+            f'<a href="https://example.com/item?id={j}&amp;utm_source=newsletter" '
+            f'style="color:#1a73e8;text-decoration:none">Item {j}</a> &ndash; '
+            f'a short description of this week&#39;s item, only &euro;{j}.99'
+            f'</td></tr>'
+            for j in range(60)
+        )
+        html = (
+            '<html><head><style>td {color: #333}</style></head><body>'
+            f'<h1>Newsletter #{i}</h1><table>{rows}</table>'
+            '<script>track();</script></body></html>'
+        )
+        html_part = {'mimeType': 'text/html', 'body': {'data': _encode(html)}}
+        plain_part = {'mimeType': 'text/plain', 'body': {'data': _encode(f'Newsletter #{i}\n' * 200)}}
+        attachment = {
+            'mimeType': 'application/pdf',
+            'filename': 'report.pdf',
+            'body': {'attachmentId': 'att', 'size': 250000}
+        }
+
+        if i % 3 == 0:
+            payload = {'mimeType': 'text/html', 'body': {'data': html_part['body']['data']}}
+        elif i % 3 == 1:
+            payload = {'mimeType': 'multipart/mixed', 'parts': [
+                {'mimeType': 'multipart/alternative', 'parts': [html_part]},
+                attachment,
+            ]}
+        else:
+            payload = {'mimeType': 'multipart/mixed', 'parts': [
+                {'mimeType': 'multipart/alternative', 'parts': [plain_part, html_part]},
+                attachment,
+            ]}
+        messages.append({'id': f'synthetic{i}', 'payload': payload})
+    return messages
+
+
+def load_corpus(corpus_dir: str) -> List[Dict]:
+    """
+    Load captured messages from a directory of JSON files.
+
+    Args:
+        corpus_dir: Directory with one message per .json file
+
+    Returns:
+        List of Gmail message objects
+    """
+    messages = []
+    for name in sorted(os.listdir(corpus_dir)):
+        if name.endswith('.json'):
+            with open(os.path.join(corpus_dir, name), encoding='utf-8') as f:
+                messages.append(json.load(f))
+    return messages
+
+
+def capture_corpus(query: str, max_results: int, corpus_dir: str) -> None:
+    """
+    Save format='full' messages matching a query as JSON files.
+
+    Args:
+        query: Gmail search query
+        max_results: Maximum number of messages to save
+        corpus_dir: Output directory
+    """
+    from gmail_auth import GmailAuthenticator
+
+    service = GmailAuthenticator().get_gmail_service()
+    os.makedirs(corpus_dir, exist_ok=True)
+
+    results = service.users().messages().list(
+        userId='me',
+        q=query,
+        maxResults=min(max_results, 500)
+    ).execute()
+
+    messages = results.get('messages', [])
+    for msg in messages:
+        message = service.users().messages().get(
+            userId='me',
+            id=msg['id'],
+            format='full'
+        ).execute()
+        with open(os.path.join(corpus_dir, f"{msg['id']}.json"), 'w', encoding='utf-8') as f:
+            json.dump(message, f)
+
+    print(f"Saved {len(messages)} messages to {corpus_dir}")
+
+
+def time_extractor(extract: Callable[[Dict], str], messages: List[Dict], repeat: int) -> float:
+    """
+    Best-of-repeat time to extract all bodies.
+
+    Args:
+        extract: Function payload -> body text
+        messages: Gmail message objects
+        repeat: Number of timed runs
+
+    Returns:
+        Seconds for one pass over the corpus
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for message in messages:
+            extract(message['payload'])
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def leftover_markup(extract: Callable[[Dict], str], messages: List[Dict]) -> int:
+    """
+    Count bodies that still contain entities, tags or style/script text.
+
+    Args:
+        extract: Function payload -> body text
+        messages: Gmail message objects
+
+    Returns:
+        Number of affected bodies
+    """
+    leftover = re.compile(r'&#?\w+;|<[a-zA-Z/][^>]*>|\{[^}]*:[^}]*\}|track\(\);')
+    return sum(1 for message in messages if leftover.search(extract(message['payload'])))
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark email body extraction')
+    parser.add_argument('--corpus', type=str, default='corpus',
+                        help='Directory of captured message JSON files (default: corpus)')
+    parser.add_argument('--capture', type=str,
+                        help='Capture messages matching this Gmail query into --corpus')
+    parser.add_argument('--max', type=int, default=200,
+                        help='Messages to capture (default: 200)')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Timed runs per extractor (default: 5)')
+    parser.add_argument('--max-body-chars', type=int, default=PREVIEW_BODY_CHARS,
+                        help=f'Body characters read for a preview (default: {PREVIEW_BODY_CHARS})')
+    args = parser.parse_args()
+
+    if args.capture:
+        capture_corpus(args.capture, args.max, args.corpus)
+        return
+
+    if os.path.isdir(args.corpus):
+        messages = load_corpus(args.corpus)
+        source = args.corpus
+    else:
+        messages = synthetic_corpus()
+        source = 'synthetic'
+
+    total_bytes = sum(len(json.dumps(message['payload'])) for message in messages)
+    print(f"Corpus: {len(messages)} messages ({source}, {total_bytes / 2**20:.1f} MB of payload JSON)")
+
+    extractors = [
+        ('legacy (regex)', legacy_extract_body),
+        ('preview', lambda payload: extract_body(payload, args.max_body_chars)),
+        ('full body', lambda payload: extract_body(payload, None)),
+    ]
+    baseline = None
+    for name, extract in extractors:
+        seconds = time_extractor(extract, messages, args.repeat)
+        baseline = baseline or seconds
+        print(
+            f"  {name:<16} {seconds * 1000:8.1f} ms  "
+            f"{len(messages) / seconds:8.0f} messages/s  "
+            f"x{baseline / seconds:.2f}  "
+            f"{leftover_markup(extract, messages)} bodies with leftover markup"
+        )
+
+
+if __name__ == "__main__":
+    main()
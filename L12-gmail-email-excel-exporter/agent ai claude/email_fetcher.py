@@ -5,24 +5,168 @@ This module fetches emails from Gmail API based on search queries
 and parses them into structured data.
 """
 
-import base64
-import re
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Callable, Iterable, Iterator, Tuple
 from email.utils import parsedate_to_datetime
 
+from mail_cache import MailCache
+from mime_body import read_body
+from rate_limiter import (
+    TokenBucket,
+    GET_COST,
+    HISTORY_COST,
+    LIST_COST,
+    PROFILE_COST,
+    backoff_delay,
+    execute_with_backoff,
+    http_status,
+    is_retryable,
+)
+
+# Gmail accepts at most 100 calls in one batch request; smaller batches
+# stay clear of the per-user concurrent request limit
+GMAIL_BATCH_LIMIT = 100
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_RETRIES = 5
+
+# Marks the end of the message ID stream between the pipeline stages
+_END_OF_PAGES = object()
+
+
+class FetchRun:
+    """
+    Statistics, failures and cache-sync state of one search or fetch.
+
+    Every call gets its own run, so calls running at the same time on
+    one EmailFetcher (e.g. MCP tools on executor threads) never mix their
+    counts, failure lists or history changes.
+    """
+
+    def __init__(self, max_body_chars: Optional[int] = None):
+        """
+        Start an empty run.
+
+        Args:
+            max_body_chars: Characters of each body to read (None for the
+                whole body; a preview export needs only the first few)
+        """
+        self.max_body_chars = max_body_chars
+        self.stats = {
+            'list': {'calls': 0, 'items': 0, 'seconds': 0.0},
+            'get': {'calls': 0, 'items': 0, 'seconds': 0.0},
+            'retries': 0,
+            'failures': 0,
+            'cache_hits': 0,
+            'metadata_refreshes': 0,
+            'started': time.perf_counter(),
+        }
+        self.failures: List[Dict[str, str]] = []
+        # Cached messages whose labels changed since the last sync, and
+        # the ones this run refreshed
+        self.changed_ids: set = set()
+        self.refreshed_ids: set = set()
+        self.refresh_all = False
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, items: int, seconds: float) -> None:
+        """Add one call of a pipeline stage to the statistics."""
+        with self._lock:
+            self.stats[stage]['calls'] += 1
+            self.stats[stage]['items'] += items
+            self.stats[stage]['seconds'] += seconds
+
+    def count_retry(self, _error: Optional[Exception] = None) -> None:
+        """Count one retried request."""
+        with self._lock:
+            self.stats['retries'] += 1
+
+    def record_failure(self, message_id: str, error: Exception) -> None:
+        """Remember a message that could not be fetched."""
+        with self._lock:
+            self.stats['failures'] += 1
+            self.failures.append({'message_id': message_id, 'error': str(error)})
+
+    def record_cache(
+        self,
+        hits: int,
+        refreshed_ids: Iterable[str],
+        fetched_ids: Iterable[str] = ()
+    ) -> None:
+        """
+        Count cache hits and the cached messages refreshed with metadata.
+
+        Messages downloaded again (fetched_ids) are up to date as well.
+        """
+        refreshed_ids = list(refreshed_ids)
+        with self._lock:
+            self.stats['cache_hits'] += hits
+            self.stats['metadata_refreshes'] += len(refreshed_ids)
+            self.refreshed_ids.update(refreshed_ids)
+            self.refreshed_ids.update(fetched_ids)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy of the statistics, consistent across stages."""
+        with self._lock:
+            return {
+                key: dict(value) if isinstance(value, dict) else value
+                for key, value in self.stats.items()
+            }
+
 
 class EmailFetcher:
     """Handles fetching and parsing emails from Gmail API."""
 
-    def __init__(self, gmail_service):
+    def __init__(
+        self,
+        gmail_service,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        http_factory: Optional[Callable[[], Any]] = None,
+        limiter: Optional[TokenBucket] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        cache: Optional[MailCache] = None
+    ):
         """
         Initialize email fetcher.
 
         Args:
             gmail_service: Authenticated Gmail API service object
+            batch_size: Message gets per batch request (max 100)
+            max_workers: Maximum number of batch requests in flight
+            http_factory: Returns a new authorized http object; each worker
+                thread gets its own because httplib2 is not thread-safe.
+                Without it, listing and batches run one request at a time.
+            limiter: Token bucket in Gmail quota units shared by all calls
+                (default: the per-user quota of 250 units per second)
+            max_retries: Retries for rate-limit (429) and server (5xx) errors
+            cache: Local cache of parsed emails; searches then only
+                download new messages
         """
         self.service = gmail_service
+        self.batch_size = max(1, min(batch_size, GMAIL_BATCH_LIMIT))
+        self.max_workers = max(1, max_workers)
+        self.http_factory = http_factory
+        self.limiter = limiter or TokenBucket()
+        self.max_retries = max_retries
+        self.cache = cache
+        self._local = threading.local()
+        self.last_run = FetchRun()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Raw statistics of the most recently started search or fetch."""
+        return self.last_run.stats
+
+    @property
+    def failures(self) -> List[Dict[str, str]]:
+        """Messages that failed in the most recently started search or fetch."""
+        return self.last_run.failures
 
     def search_emails(
         self,
@@ -39,54 +183,244 @@ class EmailFetcher:
             user_id: Gmail user ID (default: 'me')
 
         Returns:
-            List of email dictionaries with parsed data
+            List of email dictionaries with parsed data, in the order
+            Gmail listed them (messages that failed are skipped and
+            recorded in self.failures)
 
         Raises:
-            Exception: If API call fails
+            Exception: If listing messages fails
         """
         print(f"Searching emails with query: '{query}'")
         print(f"Max results: {max_results}")
 
+        run = self.reset_stats()
         try:
-            emails = []
-            page_token = None
+            emails = list(self.iter_search(query, max_results, user_id, run=run))
+
+            print(f"Total emails fetched: {len(emails)}")
+            if run.failures:
+                print(f"Failed to fetch {len(run.failures)} emails (see fetcher.failures)")
+            self.print_stats(run)
+            return emails
 
-            while len(emails) < max_results:
-                # Fetch message list
-                results = self.service.users().messages().list(
+        except Exception as e:
+            print(f"Error searching emails: {e}")
+            raise
+
+    def iter_search(
+        self,
+        query: str,
+        max_results: int = 100,
+        user_id: str = 'me',
+        listed_ids: Optional[List[str]] = None,
+        run: Optional[FetchRun] = None,
+        max_body_chars: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Search and fetch emails as a two-stage pipeline.
+
+        A producer thread lists result pages and queues message IDs in
+        batch-sized chunks, so the next page is requested while earlier
+        batches are still being fetched. The chunk queue is bounded, which
+        keeps listing at most a few batches ahead of fetching.
+
+        Without an http_factory every request shares the service's single
+        http object, so there is no producer thread: pages are listed on
+        the calling thread between batches instead.
+
+        Args:
+            query: Gmail search query
+            max_results: Maximum number of messages to list
+            user_id: Gmail user ID (default: 'me')
+            listed_ids: Optional list that receives every listed message ID
+            run: Receives the statistics and failures of this search
+                (default: a new run, kept as last_run)
+            max_body_chars: Characters of each body to read when a new
+                run is started (None for the whole body)
+
+        Yields:
+            Parsed email dictionaries, in the order Gmail listed them
+
+        Raises:
+            Exception: If listing messages fails
+        """
+        run = run or self.reset_stats(max_body_chars)
+        history_id = self._start_cache_sync(user_id, run) if self.cache is not None else None
+        pages = self._iter_pages(query, max_results, user_id, listed_ids, run)
+
+        if self.http_factory is None:
+            # One worker: the next page is only listed once the previous
+            # batch has finished, so no two requests share the http object
+            yield from self._run_batches(pages, user_id, run)
+        else:
+            chunks: queue.Queue = queue.Queue(maxsize=2 * self.max_workers)
+            stop = threading.Event()
+            producer_error: List[Exception] = []
+
+            producer = threading.Thread(
+                target=self._list_pages,
+                args=(pages, chunks, stop, producer_error),
+                daemon=True
+            )
+            producer.start()
+
+            try:
+                yield from self._run_batches(iter(chunks.get, _END_OF_PAGES), user_id, run)
+            finally:
+                stop.set()
+                # Unblock the producer if it is waiting on a full queue
+                while producer.is_alive():
+                    try:
+                        chunks.get_nowait()
+                    except queue.Empty:
+                        producer.join(0.05)
+
+            if producer_error:
+                raise producer_error[0]
+
+        if history_id is not None:
+            self._finish_cache_sync(user_id, history_id, run)
+
+    def _iter_pages(
+        self,
+        query: str,
+        max_results: int,
+        user_id: str,
+        listed_ids: Optional[List[str]],
+        run: FetchRun
+    ) -> Iterator[List[str]]:
+        """
+        List result pages lazily, one page per request.
+
+        Args:
+            query: Gmail search query
+            max_results: Maximum number of messages to list
+            user_id: Gmail user ID
+            listed_ids: Optional list that receives every listed message ID
+            run: Statistics of the search
+
+        Yields:
+            Lists of at most batch_size message IDs, in listed order
+        """
+        listed = 0
+        page_token = None
+
+        while listed < max_results:
+            start = time.perf_counter()
+            results = execute_with_backoff(
+                self.service.users().messages().list(
                     userId=user_id,
                     q=query,
-                    maxResults=min(max_results - len(emails), 500),
+                    maxResults=min(max_results - listed, 500),
                     pageToken=page_token
-                ).execute()
+                ),
+                self.limiter,
+                LIST_COST,
+                self.max_retries,
+                on_retry=run.count_retry,
+                http=self._worker_http()
+            )
+            messages = results.get('messages', [])[:max_results - listed]
+            run.record('list', len(messages), time.perf_counter() - start)
+
+            if not messages:
+                break
+
+            print(f"Found {len(messages)} messages in this batch...")
+
+            message_ids = [msg['id'] for msg in messages]
+            listed += len(message_ids)
+            if listed_ids is not None:
+                listed_ids.extend(message_ids)
+            for offset in range(0, len(message_ids), self.batch_size):
+                yield message_ids[offset:offset + self.batch_size]
+
+            # Check for next page
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+
+    def _list_pages(
+        self,
+        pages: Iterator[List[str]],
+        chunks: queue.Queue,
+        stop: threading.Event,
+        errors: List[Exception]
+    ) -> None:
+        """
+        Producer stage: list result pages on this thread and queue the chunks.
 
-                messages = results.get('messages', [])
+        Only used with an http_factory, so this thread lists pages with its
+        own http object.
 
-                if not messages:
+        Args:
+            pages: Message ID chunks from _iter_pages
+            chunks: Queue receiving lists of at most batch_size IDs
+            stop: Set by the consumer to stop listing early
+            errors: Receives the exception if listing fails
+        """
+        try:
+            while not stop.is_set():
+                chunk = next(pages, None)
+                if chunk is None:
                     break
+                chunks.put(chunk)
 
-                print(f"Found {len(messages)} messages in this batch...")
+        except Exception as e:
+            errors.append(e)
 
-                # Fetch full details for each message
-                for msg in messages:
-                    email_data = self.get_email_details(msg['id'], user_id)
-                    if email_data:
-                        emails.append(email_data)
+        finally:
+            chunks.put(_END_OF_PAGES)
 
-                    if len(emails) >= max_results:
-                        break
+    def search_page(
+        self,
+        query: str,
+        page_size: int = 50,
+        page_token: Optional[str] = None,
+        user_id: str = 'me'
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Fetch one page of search results.
 
-                # Check for next page
-                page_token = results.get('nextPageToken')
-                if not page_token:
-                    break
+        Lets callers page through a large result set with Gmail's own page
+        tokens instead of fetching everything at once. With a cache, each
+        page syncs it like iter_search does.
 
-            print(f"Total emails fetched: {len(emails)}")
-            return emails
+        Args:
+            query: Gmail search query
+            page_size: Maximum number of emails in the page (max 500)
+            page_token: Token from the previous page (None for the first)
+            user_id: Gmail user ID (default: 'me')
 
-        except Exception as e:
-            print(f"Error searching emails: {e}")
-            raise
+        Returns:
+            Tuple of (parsed emails in listed order, next page token or
+            None on the last page)
+        """
+        run = self.reset_stats()
+        history_id = self._start_cache_sync(user_id, run) if self.cache is not None else None
+
+        start = time.perf_counter()
+        results = execute_with_backoff(
+            self.service.users().messages().list(
+                userId=user_id,
+                q=query,
+                maxResults=max(1, min(page_size, 500)),
+                pageToken=page_token
+            ),
+            self.limiter,
+            LIST_COST,
+            self.max_retries,
+            on_retry=run.count_retry,
+            http=self._worker_http()
+        )
+        message_ids = [msg['id'] for msg in results.get('messages', [])]
+        run.record('list', len(message_ids), time.perf_counter() - start)
+
+        emails = list(self._run_batches(self._chunks(message_ids), user_id, run))
+
+        if history_id is not None:
+            self._finish_cache_sync(user_id, history_id, run)
+        return emails, results.get('nextPageToken')
 
     def get_email_details(
         self,
@@ -101,33 +435,493 @@ class EmailFetcher:
             user_id: Gmail user ID (default: 'me')
 
         Returns:
-            Dictionary with email details or None if error
+            Dictionary with email details or None if the message
+            does not exist
 
         Raises:
-            Exception: If API call fails
+            Exception: If API call fails (after retrying 429/5xx errors)
         """
         try:
-            message = self.service.users().messages().get(
-                userId=user_id,
-                id=message_id,
-                format='full'
-            ).execute()
+            message = execute_with_backoff(
+                self.service.users().messages().get(
+                    userId=user_id,
+                    id=message_id,
+                    format='full'
+                ),
+                self.limiter,
+                GET_COST,
+                self.max_retries,
+                http=self._worker_http()
+            )
+
+        except Exception as e:
+            if http_status(e) == 404:
+                print(f"Email not found: {message_id}")
+                return None
+            raise
+
+        return self._parse_email(message)
+
+    def get_emails_bulk(
+        self,
+        message_ids: Iterable[str],
+        user_id: str = 'me'
+    ) -> List[Dict[str, Any]]:
+        """
+        Get full details of many emails, keeping the input order.
+
+        Args:
+            message_ids: Gmail message IDs
+            user_id: Gmail user ID (default: 'me')
+
+        Returns:
+            List of parsed emails (messages that failed are skipped and
+            recorded in self.failures)
+        """
+        return list(self.iter_email_details(message_ids, user_id))
+
+    def iter_email_details(
+        self,
+        message_ids: Iterable[str],
+        user_id: str = 'me'
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Fetch and parse many emails with batch requests.
+
+        Message IDs are grouped into batch HTTP requests of up to
+        batch_size calls, and the batches run on a bounded pool of
+        worker threads.
+
+        Args:
+            message_ids: Gmail message IDs
+            user_id: Gmail user ID (default: 'me')
+
+        Yields:
+            Parsed email dictionaries, in the order of message_ids
+        """
+        run = self.reset_stats()
+        yield from self._run_batches(self._chunks(list(message_ids)), user_id, run)
+
+    def _chunks(self, message_ids: List[str]) -> Iterator[List[str]]:
+        """Split message IDs into batch_size chunks."""
+        for start in range(0, len(message_ids), self.batch_size):
+            yield message_ids[start:start + self.batch_size]
+
+    def _run_batches(
+        self,
+        chunks: Iterable[List[str]],
+        user_id: str,
+        run: FetchRun
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Consumer stage: fetch chunks of message IDs on the worker pool.
+
+        At most max_workers batches are in flight; the next chunk is only
+        taken once the oldest batch finishes. Batches that finish early
+        wait for the ones before them, so emails come out in chunk order
+        (exports keep Gmail's listing order from run to run).
+
+        Args:
+            chunks: Lists of message IDs (may be produced lazily)
+            user_id: Gmail user ID
+            run: Statistics and failures of the call
+
+        Yields:
+            Parsed email dictionaries, in chunk order
+        """
+        workers = self.max_workers if self.http_factory else 1
+        pool = ThreadPoolExecutor(max_workers=workers)
+        in_flight = deque()
+
+        try:
+            for chunk in chunks:
+                in_flight.append(pool.submit(self._fetch_batch, chunk, user_id, run))
+                if len(in_flight) >= workers:
+                    yield from in_flight.popleft().result()
+
+            while in_flight:
+                yield from in_flight.popleft().result()
+
+        finally:
+            # Stop queued batches if the caller stops iterating early
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _batch_get(
+        self,
+        message_ids: List[str],
+        user_id: str,
+        run: FetchRun,
+        message_format: str = 'full',
+        parse: Optional[Callable[[Dict], Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Get one batch of messages in a single HTTP round-trip.
 
-            return self._parse_email(message)
+        Messages that fail with 429/5xx are sent again in a smaller batch
+        after an exponential backoff; other errors are recorded in
+        run.failures.
+
+        Args:
+            message_ids: Gmail message IDs (at most batch_size)
+            user_id: Gmail user ID
+            run: Statistics and failures of the call
+            message_format: 'full', or 'metadata' for labels/historyId only
+            parse: Applied to each message as it arrives (default: _parse_email)
+
+        Returns:
+            Dictionary message_id -> parsed message
+        """
+        parse = parse or (lambda message: self._parse_email(message, run.max_body_chars))
+        request_args = {'format': message_format}
+        if message_format == 'metadata':
+            request_args['fields'] = 'id,historyId,labelIds'
+
+        results = {}
+        pending = list(message_ids)
+        attempt = 0
+
+        while pending:
+            retry = []
+            failed = {}
+
+            def on_response(request_id, response, exception):
+                # Parse each message as soon as its part of the batch arrives
+                if exception is None:
+                    results[request_id] = parse(response)
+                elif is_retryable(exception) and attempt < self.max_retries:
+                    retry.append(request_id)
+                else:
+                    failed[request_id] = exception
+
+            batch = self.service.new_batch_http_request(callback=on_response)
+            for message_id in pending:
+                batch.add(
+                    self.service.users().messages().get(
+                        userId=user_id,
+                        id=message_id,
+                        **request_args
+                    ),
+                    request_id=message_id
+                )
+
+            self.limiter.acquire(GET_COST * len(pending))
+            start = time.perf_counter()
+            try:
+                batch.execute(http=self._worker_http())
+            except Exception as e:
+                # The whole batch request failed
+                unanswered = [
+                    message_id for message_id in pending
+                    if message_id not in results and message_id not in failed
+                ]
+                if is_retryable(e) and attempt < self.max_retries:
+                    retry = unanswered
+                else:
+                    retry = []
+                    failed.update((message_id, e) for message_id in unanswered)
+            run.record('get', len(pending) - len(retry), time.perf_counter() - start)
+
+            for message_id, error in failed.items():
+                run.record_failure(message_id, error)
+
+            if not retry:
+                if attempt == 0:
+                    self.limiter.speed_up()
+                break
+
+            attempt += 1
+            self.limiter.slow_down()
+            for _ in retry:
+                run.count_retry()
+            time.sleep(backoff_delay(attempt))
+            pending = retry
+
+        return results
+
+    def _fetch_batch(
+        self,
+        message_ids: List[str],
+        user_id: str,
+        run: FetchRun
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch one chunk of messages, using the cache when there is one.
+
+        Args:
+            message_ids: Gmail message IDs (at most batch_size)
+            user_id: Gmail user ID
+            run: Statistics, failures and cache-sync state of the call
+
+        Returns:
+            List of parsed emails in the order of message_ids
+        """
+        if self.cache is None:
+            results = self._batch_get(message_ids, user_id, run)
+        else:
+            results = self._fetch_with_cache(message_ids, user_id, run)
+
+        return [results[message_id] for message_id in message_ids if message_id in results]
+
+    def _fetch_with_cache(
+        self,
+        message_ids: List[str],
+        user_id: str,
+        run: FetchRun
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch a chunk of messages through the local cache.
+
+        Uncached messages are fetched in format='full', parsed and stored.
+        Message content never changes in Gmail, so for cached messages only
+        labels can be stale: those that history reported as changed are
+        refreshed with format='metadata'. A cached body cut shorter than
+        the run needs counts as uncached and is replaced.
+
+        Args:
+            message_ids: Gmail message IDs
+            user_id: Gmail user ID
+            run: Statistics, failures and cache-sync state of the call
+
+        Returns:
+            Dictionary message_id -> parsed email
+        """
+        cached = {
+            message_id: entry
+            for message_id, entry in self.cache.get_many(message_ids).items()
+            if self._has_body(entry[0], run.max_body_chars)
+        }
+        results = {message_id: email for message_id, (email, _) in cached.items()}
+
+        missing = [message_id for message_id in message_ids if message_id not in cached]
+        fetched = {}
+        if missing:
+            fetched = self._batch_get(
+                missing,
+                user_id,
+                run,
+                parse=lambda message: (
+                    self._parse_email(message, run.max_body_chars),
+                    message.get('historyId')
+                )
+            )
+            self.cache.put_many(fetched.values())
+            results.update((message_id, email) for message_id, (email, _) in fetched.items())
+
+        stale = [
+            message_id for message_id in cached
+            if run.refresh_all or message_id in run.changed_ids
+        ]
+        metadata = {}
+        if stale:
+            metadata = self._batch_get(stale, user_id, run, 'metadata', parse=lambda message: message)
+            updated = []
+            for message_id, message in metadata.items():
+                email, history_id = cached[message_id]
+                if message.get('historyId') != history_id:
+                    email = dict(email, labels=', '.join(message.get('labelIds', [])))
+                    updated.append((email, message.get('historyId')))
+                    results[message_id] = email
+            self.cache.put_many(updated)
+
+        run.record_cache(len(cached) - len(stale), metadata, fetched)
+        return results
+
+    @staticmethod
+    def _has_body(email: Dict[str, Any], max_body_chars: Optional[int]) -> bool:
+        """
+        Check whether a cached email has as much body as a run reads.
+
+        Args:
+            email: Cached parsed email
+            max_body_chars: Characters of body the run needs (None for all)
+
+        Returns:
+            True if the whole body, or at least max_body_chars of it, is cached
+        """
+        if not email.get('body_truncated'):
+            return True
+        return max_body_chars is not None and len(email['body']) >= max_body_chars
+
+    def _start_cache_sync(self, user_id: str, run: FetchRun) -> Optional[str]:
+        """
+        Find cached messages that changed since the last sync.
+
+        Reads the mailbox history since the historyId stored in the cache:
+        deleted messages are dropped from the cache and messages with label
+        changes are marked for a metadata refresh. Without a stored
+        historyId (or when Gmail no longer has that history) every cached
+        message found by the search is refreshed.
+
+        Args:
+            user_id: Gmail user ID
+            run: Receives the changed message IDs
+
+        Returns:
+            Current mailbox historyId, to store once the fetch succeeds
+        """
+        profile = execute_with_backoff(
+            self.service.users().getProfile(userId=user_id),
+            self.limiter,
+            PROFILE_COST,
+            self.max_retries,
+            on_retry=run.count_retry,
+            http=self._worker_http()
+        )
+        current_history_id = profile.get('historyId')
+
+        last_history_id = self.cache.get_state(f'history_id:{user_id}')
+        if last_history_id is None:
+            run.refresh_all = True
+            return current_history_id
+
+        deleted = set()
+        page_token = None
+        try:
+            while True:
+                results = execute_with_backoff(
+                    self.service.users().history().list(
+                        userId=user_id,
+                        startHistoryId=last_history_id,
+                        pageToken=page_token
+                    ),
+                    self.limiter,
+                    HISTORY_COST,
+                    self.max_retries,
+                    on_retry=run.count_retry,
+                    http=self._worker_http()
+                )
+                for record in results.get('history', []):
+                    for change in record.get('labelsAdded', []) + record.get('labelsRemoved', []):
+                        run.changed_ids.add(change['message']['id'])
+                    for change in record.get('messagesDeleted', []):
+                        deleted.add(change['message']['id'])
+
+                page_token = results.get('nextPageToken')
+                if not page_token:
+                    break
 
         except Exception as e:
-            print(f"Error fetching email {message_id}: {e}")
+            if http_status(e) != 404:
+                raise
+            # History expired - verify every cached message instead
+            print("Cache history expired, refreshing cached labels...")
+            run.refresh_all = True
+            return current_history_id
+
+        self.cache.delete_many(deleted)
+        return current_history_id
+
+    def _finish_cache_sync(self, user_id: str, history_id: str, run: FetchRun) -> None:
+        """
+        Mark the cache as synced up to history_id after a successful fetch.
+
+        Changed messages the fetch did not come across (or could not
+        refresh) are dropped from the cache: the stored historyId moves
+        past their changes, so they are downloaded again when a later
+        search finds them.
+
+        Args:
+            user_id: Gmail user ID
+            history_id: historyId returned by _start_cache_sync
+            run: State of the finished fetch
+        """
+        self.cache.delete_many(run.changed_ids - run.refreshed_ids)
+        self.cache.set_state(f'history_id:{user_id}', history_id)
+
+    def _worker_http(self):
+        """
+        Get the http object of the current worker thread.
+
+        Returns:
+            Thread-local http object, or None to use the service's own
+        """
+        if self.http_factory is None:
             return None
+        if getattr(self._local, 'http', None) is None:
+            self._local.http = self.http_factory()
+        return self._local.http
+
+    def reset_stats(self, max_body_chars: Optional[int] = None) -> FetchRun:
+        """
+        Start a new run with empty statistics and failure list.
+
+        Args:
+            max_body_chars: Characters of each body the run reads (None for all)
+
+        Returns:
+            The new run (also kept as last_run)
+        """
+        self.last_run = FetchRun(max_body_chars)
+        return self.last_run
+
+    def get_stats(self, run: Optional[FetchRun] = None) -> Dict[str, Any]:
+        """
+        Get per-stage latency and throughput of a fetch.
+
+        Args:
+            run: Run to summarize (default: last_run)
 
-    def _parse_email(self, message: Dict) -> Dict[str, Any]:
+        Returns:
+            Dictionary with, per stage, calls, items, average latency per
+            call and items per second of wall time, plus retry/failure counts
+        """
+        stats = (run or self.last_run).snapshot()
+        elapsed = time.perf_counter() - stats['started']
+        summary = {
+            'elapsed_seconds': elapsed,
+            'retries': stats['retries'],
+            'failures': stats['failures'],
+            'cache_hits': stats['cache_hits'],
+            'metadata_refreshes': stats['metadata_refreshes'],
+            'rate_limit': self.limiter.rate,
+        }
+        for stage in ('list', 'get'):
+            data = stats[stage]
+            summary[stage] = {
+                'calls': data['calls'],
+                'items': data['items'],
+                'avg_latency': data['seconds'] / data['calls'] if data['calls'] else 0.0,
+                'items_per_second': data['items'] / elapsed if elapsed > 0 else 0.0,
+            }
+        return summary
+
+    def print_stats(self, run: Optional[FetchRun] = None) -> None:
+        """
+        Print a one-line summary per pipeline stage.
+
+        Args:
+            run: Run to summarize (default: last_run)
+        """
+        stats = self.get_stats(run)
+        for stage in ('list', 'get'):
+            data = stats[stage]
+            print(
+                f"  {stage}: {data['calls']} calls, {data['items']} messages, "
+                f"{data['avg_latency'] * 1000:.0f} ms/call, "
+                f"{data['items_per_second']:.1f} messages/s"
+            )
+        print(
+            f"  retries: {stats['retries']}, failures: {stats['failures']}, "
+            f"elapsed: {stats['elapsed_seconds']:.2f}s"
+        )
+        if self.cache is not None:
+            print(
+                f"  cache: {stats['cache_hits']} hits, "
+                f"{stats['metadata_refreshes']} label refreshes, "
+                f"{len(self.cache)} emails stored"
+            )
+
+    def _parse_email(self, message: Dict, max_body_chars: Optional[int] = None) -> Dict[str, Any]:
         """
         Parse Gmail API message into structured format.
 
         Args:
             message: Gmail API message object
+            max_body_chars: Characters of the body to read (None for all)
 
         Returns:
-            Dictionary with parsed email data
+            Dictionary with parsed email data ('body_truncated' tells
+            whether body holds only the start of the body)
         """
         headers = message['payload'].get('headers', [])
 
@@ -146,7 +940,7 @@ class EmailFetcher:
             date_formatted = date_str
 
         # Extract body
-        body = self._get_email_body(message['payload'])
+        body, whole_body = self._get_email_body(message['payload'], max_body_chars)
 
         # Extract labels
         labels = message.get('labelIds', [])
@@ -169,6 +963,7 @@ class EmailFetcher:
             'subject': subject,
             'snippet': snippet,
             'body': body,
+            'body_truncated': not whole_body,
             'labels': ', '.join(labels),
             'has_attachment': has_attachment,
         }
@@ -189,100 +984,18 @@ class EmailFetcher:
                 return header.get('value')
         return None
 
-    def _get_email_body(self, payload: Dict) -> str:
+    def _get_email_body(self, payload: Dict, max_chars: Optional[int] = None) -> Tuple[str, bool]:
         """
         Extract email body from payload.
 
         Args:
             payload: Gmail message payload
+            max_chars: Characters of body text to read (None for all)
 
         Returns:
-            Email body text
-        """
-        body = ''
-
-        # Try to get body from payload data
-        if 'body' in payload and 'data' in payload['body']:
-            body = self._decode_body(payload['body']['data'])
-
-        # If body is empty, check parts (multipart messages)
-        elif 'parts' in payload:
-            body = self._get_body_from_parts(payload['parts'])
-
-        return body
-
-    def _get_body_from_parts(self, parts: List[Dict]) -> str:
-        """
-        Extract body from multipart message.
-
-        Args:
-            parts: List of message parts
-
-        Returns:
-            Combined body text
-        """
-        body = ''
-
-        for part in parts:
-            mime_type = part.get('mimeType', '')
-
-            # Prefer plain text
-            if mime_type == 'text/plain':
-                if 'data' in part.get('body', {}):
-                    body = self._decode_body(part['body']['data'])
-                    break
-
-            # Fallback to HTML
-            elif mime_type == 'text/html' and not body:
-                if 'data' in part.get('body', {}):
-                    html_body = self._decode_body(part['body']['data'])
-                    body = self._html_to_text(html_body)
-
-            # Recursively check nested parts
-            elif 'parts' in part:
-                body = self._get_body_from_parts(part['parts'])
-                if body:
-                    break
-
-        return body
-
-    def _decode_body(self, data: str) -> str:
-        """
-        Decode base64url encoded body data.
-
-        Args:
-            data: Base64url encoded string
-
-        Returns:
-            Decoded text
+            Tuple of (body text, whether it is the whole body)
         """
-        try:
-            # Gmail uses base64url encoding
-            decoded = base64.urlsafe_b64decode(data).decode('utf-8', errors='ignore')
-            return decoded
-        except Exception as e:
-            print(f"Error decoding body: {e}")
-            return ""
-
-    def _html_to_text(self, html: str) -> str:
-        """
-        Convert HTML to plain text (simple version).
-
-        Args:
-            html: HTML string
-
-        Returns:
-            Plain text
-        """
-        # Remove HTML tags
-        text = re.sub(r'<[^>]+>', '', html)
-        # Decode HTML entities
-        text = text.replace('&nbsp;', ' ')
-        text = text.replace('&amp;', '&')
-        text = text.replace('&lt;', '<')
-        text = text.replace('&gt;', '>')
-        text = text.replace('&quot;', '"')
-        return text.strip()
+        return read_body(payload, max_chars)
 
     def _has_attachments(self, payload: Dict) -> bool:
         """
@@ -4,12 +4,63 @@ Excel Export Handler
 This module handles exporting email data to Excel format using openpyxl.
 """
 
+import csv
 import os
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional
 from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill
-from openpyxl.utils import get_column_letter
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, PatternFill, NamedStyle
+
+# Column headers and widths of the Excel sheet
+HEADERS = [
+    'Date',
+    'From',
+    'To',
+    'CC',
+    'Subject',
+    'Body Preview',
+    'Labels',
+    'Has Attachment',
+    'Message ID',
+    'Thread ID'
+]
+
+COLUMN_WIDTHS = {
+    'A': 20,  # Date
+    'B': 30,  # From
+    'C': 30,  # To
+    'D': 20,  # CC
+    'E': 40,  # Subject
+    'F': 60,  # Body Preview
+    'G': 20,  # Labels
+    'H': 15,  # Has Attachment
+    'I': 30,  # Message ID
+    'J': 30   # Thread ID
+}
+
+# Email fields in column order (CSV/Parquet use them as column names)
+FIELDS = [
+    'date',
+    'from',
+    'to',
+    'cc',
+    'subject',
+    'body',
+    'labels',
+    'has_attachment',
+    'message_id',
+    'thread_id'
+]
+
+PREVIEW_LENGTH = 200
+# Body characters a preview needs (one more than shown tells whether to add '...')
+PREVIEW_BODY_CHARS = PREVIEW_LENGTH + 1
+DATA_ROW_HEIGHT = 40
+
+# Named styles are stored once in the workbook and shared by all cells
+HEADER_STYLE = 'mem_header'
+CELL_STYLE = 'mem_cell'
 
 
 class ExcelHandler:
@@ -19,6 +70,7 @@ class ExcelHandler:
         """Initialize Excel handler."""
         self.workbook = None
         self.worksheet = None
+        self.rows_written = 0
 
     def export_emails(
         self,
@@ -43,188 +95,253 @@ class ExcelHandler:
         if not emails:
             raise ValueError("No emails to export")
 
-        # Generate filename if not provided
-        if not filename:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"emails_{timestamp}.xlsx"
+        output_path = self._output_path(filename, 'emails', '.xlsx', output_dir)
+        print(f"Exporting {len(emails)} emails to: {output_path}")
 
-        # Ensure .xlsx extension
-        if not filename.endswith('.xlsx'):
-            filename += '.xlsx'
+        return self._write_workbook(emails, output_path, full_body=False)
 
-        # Create full path
-        output_path = os.path.join(output_dir, filename)
+    def export_emails_with_full_body(
+        self,
+        emails: List[Dict[str, Any]],
+        filename: str = None,
+        output_dir: str = '.'
+    ) -> str:
+        """
+        Export emails with full body content (no truncation).
 
-        print(f"Exporting {len(emails)} emails to: {output_path}")
+        Args:
+            emails: List of email dictionaries
+            filename: Output filename
+            output_dir: Output directory path
 
-        try:
-            # Create workbook and worksheet
-            self.workbook = Workbook()
-            self.worksheet = self.workbook.active
-            self.worksheet.title = "Emails"
+        Returns:
+            Path to created Excel file
+        """
+        if not emails:
+            raise ValueError("No emails to export")
 
-            # Write data
-            self._write_headers()
-            self._write_email_data(emails)
-            self._format_worksheet()
+        output_path = self._output_path(filename, 'emails_full', '.xlsx', output_dir)
+        print(f"Exporting {len(emails)} emails with full body to: {output_path}")
 
-            # Save file
-            self.workbook.save(output_path)
-            print(f"Export successful! File saved to: {output_path}")
+        return self._write_workbook(emails, output_path, full_body=True)
+
+    def export_emails_stream(
+        self,
+        emails: Iterable[Dict[str, Any]],
+        filename: str = None,
+        output_dir: str = '.',
+        full_body: bool = False
+    ) -> str:
+        """
+        Export emails from any iterable (e.g. EmailFetcher.iter_search).
+
+        Rows are written as the emails arrive, so memory use does not grow
+        with the number of emails. The number of rows is available in
+        self.rows_written afterwards (the file only has headers if the
+        iterable was empty).
+
+        Args:
+            emails: Iterable of email dictionaries
+            filename: Output filename (optional, auto-generated if not provided)
+            output_dir: Output directory path
+            full_body: Include full email body (no truncation)
+
+        Returns:
+            Path to created Excel file
+        """
+        prefix = 'emails_full' if full_body else 'emails'
+        output_path = self._output_path(filename, prefix, '.xlsx', output_dir)
+        print(f"Streaming emails to: {output_path}")
+
+        return self._write_workbook(emails, output_path, full_body)
 
+    def export_emails_csv(
+        self,
+        emails: Iterable[Dict[str, Any]],
+        filename: str = None,
+        output_dir: str = '.'
+    ) -> str:
+        """
+        Export emails to a CSV file (full body, one row per email).
+
+        Fast path for scripts and data tools: no styling, rows are
+        streamed straight to disk.
+
+        Args:
+            emails: Iterable of email dictionaries
+            filename: Output filename (optional, auto-generated if not provided)
+            output_dir: Output directory path
+
+        Returns:
+            Path to created CSV file
+        """
+        output_path = self._output_path(filename, 'emails', '.csv', output_dir)
+        print(f"Streaming emails to: {output_path}")
+
+        try:
+            self.rows_written = 0
+            with open(output_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(FIELDS)
+                for email in emails:
+                    writer.writerow([email.get(field, '') for field in FIELDS])
+                    self.rows_written += 1
+
+            print(f"Export successful! {self.rows_written} emails saved to: {output_path}")
             return output_path
 
         except Exception as e:
-            print(f"Error exporting to Excel: {e}")
+            print(f"Error exporting to CSV: {e}")
             raise
 
-    def _write_headers(self):
-        """Write column headers."""
-        headers = [
-            'Date',
-            'From',
-            'To',
-            'CC',
-            'Subject',
-            'Body Preview',
-            'Labels',
-            'Has Attachment',
-            'Message ID',
-            'Thread ID'
-        ]
-
-        # Write headers
-        for col, header in enumerate(headers, 1):
-            cell = self.worksheet.cell(row=1, column=col)
-            cell.value = header
-            cell.font = Font(bold=True, size=11)
-            cell.fill = PatternFill(start_color='366092', end_color='366092', fill_type='solid')
-            cell.font = Font(bold=True, color='FFFFFF', size=11)
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-
-    def _write_email_data(self, emails: List[Dict[str, Any]]):
+    def export_emails_parquet(
+        self,
+        emails: Iterable[Dict[str, Any]],
+        filename: str = None,
+        output_dir: str = '.',
+        batch_size: int = 10000
+    ) -> str:
         """
-        Write email data to worksheet.
+        Export emails to a Parquet file (requires pyarrow).
+
+        Emails are written in row groups of batch_size, so at most one
+        batch is held in memory.
 
         Args:
-            emails: List of email dictionaries
+            emails: Iterable of email dictionaries
+            filename: Output filename (optional, auto-generated if not provided)
+            output_dir: Output directory path
+            batch_size: Emails per row group
+
+        Returns:
+            Path to created Parquet file
+
+        Raises:
+            ImportError: If pyarrow is not installed
         """
-        for row, email in enumerate(emails, 2):  # Start from row 2 (after headers)
-            # Truncate body for preview
-            body_preview = email.get('body', '')[:200]
-            if len(email.get('body', '')) > 200:
-                body_preview += '...'
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError(
+                "Parquet export requires pyarrow. Install it with: pip install pyarrow"
+            )
 
-            # Write row data
-            row_data = [
-                email.get('date', ''),
-                email.get('from', ''),
-                email.get('to', ''),
-                email.get('cc', ''),
-                email.get('subject', ''),
-                body_preview,
-                email.get('labels', ''),
-                'Yes' if email.get('has_attachment') else 'No',
-                email.get('message_id', ''),
-                email.get('thread_id', '')
-            ]
+        output_path = self._output_path(filename, 'emails', '.parquet', output_dir)
+        print(f"Streaming emails to: {output_path}")
 
-            for col, value in enumerate(row_data, 1):
-                cell = self.worksheet.cell(row=row, column=col)
-                cell.value = value
-                cell.alignment = Alignment(vertical='top', wrap_text=True)
+        schema = pa.schema([
+            (field, pa.bool_() if field == 'has_attachment' else pa.string())
+            for field in FIELDS
+        ])
 
-    def _format_worksheet(self):
-        """Apply formatting to worksheet."""
-        # Set column widths
-        column_widths = {
-            'A': 20,  # Date
-            'B': 30,  # From
-            'C': 30,  # To
-            'D': 20,  # CC
-            'E': 40,  # Subject
-            'F': 60,  # Body Preview
-            'G': 20,  # Labels
-            'H': 15,  # Has Attachment
-            'I': 30,  # Message ID
-            'J': 30   # Thread ID
-        }
+        try:
+            self.rows_written = 0
+            with pq.ParquetWriter(output_path, schema) as writer:
+                batch = []
+                for email in emails:
+                    batch.append(email)
+                    if len(batch) >= batch_size:
+                        writer.write_table(self._parquet_table(pa, batch, schema))
+                        self.rows_written += len(batch)
+                        batch = []
+                if batch:
+                    writer.write_table(self._parquet_table(pa, batch, schema))
+                    self.rows_written += len(batch)
+
+            print(f"Export successful! {self.rows_written} emails saved to: {output_path}")
+            return output_path
 
-        for col, width in column_widths.items():
-            self.worksheet.column_dimensions[col].width = width
+        except Exception as e:
+            print(f"Error exporting to Parquet: {e}")
+            raise
 
-        # Freeze header row
-        self.worksheet.freeze_panes = 'A2'
+    def _parquet_table(self, pa, emails: List[Dict[str, Any]], schema):
+        """
+        Build a pyarrow table from a batch of emails.
 
-        # Set row height for data rows
-        for row in range(2, self.worksheet.max_row + 1):
-            self.worksheet.row_dimensions[row].height = 40
+        Args:
+            pa: The pyarrow module
+            emails: Batch of email dictionaries
+            schema: Table schema
 
-    def export_emails_with_full_body(
+        Returns:
+            pyarrow Table
+        """
+        columns = {
+            field: [
+                bool(email.get(field)) if field == 'has_attachment' else str(email.get(field, ''))
+                for email in emails
+            ]
+            for field in FIELDS
+        }
+        return pa.Table.from_pydict(columns, schema=schema)
+
+    def _output_path(
         self,
-        emails: List[Dict[str, Any]],
-        filename: str = None,
-        output_dir: str = '.'
+        filename: Optional[str],
+        prefix: str,
+        extension: str,
+        output_dir: str
     ) -> str:
         """
-        Export emails with full body content (no truncation).
+        Build the output path, generating a filename if needed.
 
         Args:
-            emails: List of email dictionaries
-            filename: Output filename
+            filename: Output filename (optional)
+            prefix: Prefix of generated filenames
+            extension: File extension, added if missing
             output_dir: Output directory path
 
         Returns:
-            Path to created Excel file
+            Full output path
         """
-        if not emails:
-            raise ValueError("No emails to export")
-
+        # Generate filename if not provided
         if not filename:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"emails_full_{timestamp}.xlsx"
+            filename = f"{prefix}_{timestamp}{extension}"
 
-        if not filename.endswith('.xlsx'):
-            filename += '.xlsx'
+        # Ensure extension
+        if not filename.endswith(extension):
+            filename += extension
 
-        output_path = os.path.join(output_dir, filename)
+        return os.path.join(output_dir, filename)
 
-        print(f"Exporting {len(emails)} emails with full body to: {output_path}")
+    def _write_workbook(
+        self,
+        emails: Iterable[Dict[str, Any]],
+        output_path: str,
+        full_body: bool
+    ) -> str:
+        """
+        Write emails to a write-only (streaming) workbook and save it.
 
-        try:
-            self.workbook = Workbook()
-            self.worksheet = self.workbook.active
-            self.worksheet.title = "Emails"
+        Args:
+            emails: Iterable of email dictionaries
+            output_path: Path of the Excel file
+            full_body: Include full email body (no truncation)
 
-            # Write headers (same as before)
-            self._write_headers()
+        Returns:
+            Path to created Excel file
+
+        Raises:
+            Exception: If export fails
+        """
+        try:
+            # Write-only workbooks stream rows to disk instead of keeping
+            # every cell in memory
+            self.workbook = Workbook(write_only=True)
+            self._register_styles()
+            self.worksheet = self.workbook.create_sheet("Emails")
 
-            # Write full email data
-            for row, email in enumerate(emails, 2):
-                row_data = [
-                    email.get('date', ''),
-                    email.get('from', ''),
-                    email.get('to', ''),
-                    email.get('cc', ''),
-                    email.get('subject', ''),
-                    email.get('body', ''),  # Full body, no truncation
-                    email.get('labels', ''),
-                    'Yes' if email.get('has_attachment') else 'No',
-                    email.get('message_id', ''),
-                    email.get('thread_id', '')
-                ]
-
-                for col, value in enumerate(row_data, 1):
-                    cell = self.worksheet.cell(row=row, column=col)
-                    cell.value = value
-                    cell.alignment = Alignment(vertical='top', wrap_text=True)
-
-            # Apply formatting
+            # Sheet layout must be set before the first row is written
             self._format_worksheet()
+            self._write_headers()
+            self._write_email_data(emails, full_body)
 
             # Save file
             self.workbook.save(output_path)
-            print(f"Export successful! File saved to: {output_path}")
+            print(f"Export successful! {self.rows_written} emails saved to: {output_path}")
 
             return output_path
 
@@ -232,6 +349,87 @@ class ExcelHandler:
             print(f"Error exporting to Excel: {e}")
             raise
 
+    def _register_styles(self):
+        """Add the shared header and cell styles to the workbook."""
+        header_style = NamedStyle(name=HEADER_STYLE)
+        header_style.font = Font(bold=True, color='FFFFFF', size=11)
+        header_style.fill = PatternFill(start_color='366092', end_color='366092', fill_type='solid')
+        header_style.alignment = Alignment(horizontal='center', vertical='center')
+        self.workbook.add_named_style(header_style)
+
+        cell_style = NamedStyle(name=CELL_STYLE)
+        cell_style.alignment = Alignment(vertical='top', wrap_text=True)
+        self.workbook.add_named_style(cell_style)
+
+    def _write_headers(self):
+        """Write column headers."""
+        self.worksheet.append([
+            self._styled_cell(header, HEADER_STYLE) for header in HEADERS
+        ])
+
+    def _write_email_data(self, emails: Iterable[Dict[str, Any]], full_body: bool = False):
+        """
+        Write email data to worksheet, one row per email.
+
+        Args:
+            emails: Iterable of email dictionaries
+            full_body: Include full email body (no truncation)
+        """
+        self.rows_written = 0
+
+        for email in emails:
+            body = email.get('body', '')
+            if not full_body and len(body) > PREVIEW_LENGTH:
+                # Truncate body for preview
+                body = body[:PREVIEW_LENGTH] + '...'
+
+            row_data = [
+                email.get('date', ''),
+                email.get('from', ''),
+                email.get('to', ''),
+                email.get('cc', ''),
+                email.get('subject', ''),
+                body,
+                email.get('labels', ''),
+                'Yes' if email.get('has_attachment') else 'No',
+                email.get('message_id', ''),
+                email.get('thread_id', '')
+            ]
+
+            self.worksheet.append([
+                self._styled_cell(value, CELL_STYLE) for value in row_data
+            ])
+            self.rows_written += 1
+
+    def _styled_cell(self, value: Any, style: str) -> WriteOnlyCell:
+        """
+        Create a cell that uses one of the shared named styles.
+
+        Args:
+            value: Cell value
+            style: Named style
+
+        Returns:
+            Write-only cell
+        """
+        cell = WriteOnlyCell(self.worksheet, value=value)
+        cell.style = style
+        return cell
+
+    def _format_worksheet(self):
+        """Apply formatting to worksheet."""
+        # Set column widths
+        for col, width in COLUMN_WIDTHS.items():
+            self.worksheet.column_dimensions[col].width = width
+
+        # Freeze header row
+        self.worksheet.freeze_panes = 'A2'
+
+        # Data row height as the sheet default instead of one entry per row
+        self.worksheet.sheet_format.defaultRowHeight = DATA_ROW_HEIGHT
+        self.worksheet.sheet_format.customHeight = True
+        self.worksheet.row_dimensions[1].height = 15
+
 
 def main():
     """Test Excel export."""
@@ -7,7 +7,9 @@ It manages token storage, refresh, and provides an authenticated Gmail service.
 
 import os
 import pickle
+import httplib2
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
@@ -97,6 +99,21 @@ class GmailAuthenticator:
         service = build('gmail', 'v1', credentials=self.creds)
         return service
 
+    def new_http(self) -> AuthorizedHttp:
+        """
+        Create a new authorized http object.
+
+        httplib2 connections are not thread-safe, so every thread that
+        sends Gmail requests needs its own.
+
+        Returns:
+            Authorized http object
+        """
+        if not self.creds:
+            self.authenticate()
+
+        return AuthorizedHttp(self.creds, http=httplib2.Http())
+
     def revoke_credentials(self) -> bool:
         """
         Revoke stored credentials and delete token file.
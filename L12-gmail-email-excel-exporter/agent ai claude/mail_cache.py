@@ -0,0 +1,154 @@
+"""
+Local Mail Cache
+
+This module stores parsed emails in a SQLite database keyed by Gmail
+message ID, together with the message historyId and the mailbox historyId
+of the last sync, so repeated exports only download new mail.
+"""
+
+import json
+import sqlite3
+import threading
+from typing import Dict, Iterable, Optional, Tuple, Any
+
+# Cache database file (next to token.pickle)
+CACHE_FILE = 'mem_cache.sqlite'
+
+
+class MailCache:
+    """SQLite cache of parsed emails, safe to share between threads."""
+
+    def __init__(self, path: str = CACHE_FILE):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: Path of the SQLite file (':memory:' for a throwaway cache)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS messages (
+                    message_id TEXT PRIMARY KEY,
+                    history_id TEXT,
+                    email TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                )
+                """
+            )
+
+    def get_many(self, message_ids: Iterable[str]) -> Dict[str, Tuple[Dict[str, Any], Optional[str]]]:
+        """
+        Look up cached emails.
+
+        Args:
+            message_ids: Gmail message IDs
+
+        Returns:
+            Dictionary message_id -> (parsed email, message historyId)
+            for the IDs that are cached
+        """
+        message_ids = list(message_ids)
+        found = {}
+
+        with self._lock:
+            # Stay below SQLite's limit on bound parameters per statement
+            for start in range(0, len(message_ids), 500):
+                chunk = message_ids[start:start + 500]
+                placeholders = ', '.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT message_id, history_id, email FROM messages "
+                    f"WHERE message_id IN ({placeholders})",
+                    chunk
+                )
+                for message_id, history_id, email in rows:
+                    found[message_id] = (json.loads(email), history_id)
+
+        return found
+
+    def put_many(self, entries: Iterable[Tuple[Dict[str, Any], Optional[str]]]) -> None:
+        """
+        Insert or replace cached emails.
+
+        Args:
+            entries: (parsed email, message historyId) pairs
+        """
+        rows = [
+            (email['message_id'], history_id, json.dumps(email))
+            for email, history_id in entries
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO messages (message_id, history_id, email) "
+                "VALUES (?, ?, ?)",
+                rows
+            )
+
+    def delete_many(self, message_ids: Iterable[str]) -> None:
+        """
+        Remove emails from the cache.
+
+        Args:
+            message_ids: Gmail message IDs
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM messages WHERE message_id = ?",
+                [(message_id,) for message_id in message_ids]
+            )
+
+    def get_state(self, key: str) -> Optional[str]:
+        """
+        Get a sync state value (e.g. the last synced mailbox historyId).
+
+        Args:
+            key: State name
+
+        Returns:
+            Stored value or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM sync_state WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_state(self, key: str, value: str) -> None:
+        """
+        Store a sync state value.
+
+        Args:
+            key: State name
+            value: Value to store
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)",
+                (key, value)
+            )
+
+    def clear(self) -> None:
+        """Remove all cached emails and sync state."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM messages")
+            self._conn.execute("DELETE FROM sync_state")
+
+    def __len__(self) -> int:
+        """Number of cached emails."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -11,15 +11,22 @@ from typing import Optional
 
 from gmail_auth import GmailAuthenticator
 from email_fetcher import EmailFetcher
-from excel_handler import ExcelHandler
+from excel_handler import ExcelHandler, PREVIEW_BODY_CHARS
+from mail_cache import MailCache, CACHE_FILE
 
 
 class MEMApp:
     """Main application class for MEM."""
 
-    def __init__(self):
-        """Initialize MEM application."""
+    def __init__(self, cache_path: Optional[str] = CACHE_FILE):
+        """
+        Initialize MEM application.
+
+        Args:
+            cache_path: Local mail cache file (None disables the cache)
+        """
         self.authenticator = GmailAuthenticator()
+        self.cache_path = cache_path
         self.service = None
         self.fetcher = None
 
@@ -33,7 +40,12 @@ class MEMApp:
         try:
             print("Initializing MEM...")
             self.service = self.authenticator.get_gmail_service()
-            self.fetcher = EmailFetcher(self.service)
+            cache = MailCache(self.cache_path) if self.cache_path else None
+            self.fetcher = EmailFetcher(
+                self.service,
+                http_factory=self.authenticator.new_http,
+                cache=cache
+            )
             print("Initialization successful!\n")
             return True
         except Exception as e:
@@ -63,10 +75,14 @@ class MEMApp:
         max_results: int,
         output_file: Optional[str],
         output_dir: str,
-        full_body: bool = False
+        full_body: bool = False,
+        output_format: str = 'xlsx'
     ) -> bool:
         """
-        Fetch emails and export to Excel.
+        Fetch emails and export to Excel (or CSV/Parquet).
+
+        Emails are streamed from the fetcher straight into the export file,
+        so memory use does not grow with the number of emails.
 
         Args:
             query: Gmail search query
@@ -74,6 +90,7 @@ class MEMApp:
             output_file: Output filename (optional)
             output_dir: Output directory
             full_body: Include full email body (no truncation)
+            output_format: 'xlsx', 'csv' or 'parquet'
 
         Returns:
             True if successful, False otherwise
@@ -86,29 +103,45 @@ class MEMApp:
             print(f"Query: '{query}'")
             print(f"Max results: {max_results}\n")
 
-            emails = self.fetcher.search_emails(query, max_results)
-
-            if not emails:
-                print("No emails found matching your query.")
-                return False
+            # An Excel preview only needs the start of each body
+            preview = output_format == 'xlsx' and not full_body
+            emails = self.fetcher.iter_search(
+                query,
+                max_results,
+                max_body_chars=PREVIEW_BODY_CHARS if preview else None
+            )
 
-            # Export to Excel
+            # Export while fetching
             handler = ExcelHandler()
 
-            if full_body:
-                output_path = handler.export_emails_with_full_body(
+            if output_format == 'csv':
+                output_path = handler.export_emails_csv(
                     emails,
                     filename=output_file,
                     output_dir=output_dir
                 )
-            else:
-                output_path = handler.export_emails(
+            elif output_format == 'parquet':
+                output_path = handler.export_emails_parquet(
                     emails,
                     filename=output_file,
                     output_dir=output_dir
                 )
+            else:
+                output_path = handler.export_emails_stream(
+                    emails,
+                    filename=output_file,
+                    output_dir=output_dir,
+                    full_body=full_body
+                )
+
+            self.fetcher.print_stats()
 
-            print(f"\nSuccess! {len(emails)} emails exported to:")
+            if not handler.rows_written:
+                os.remove(output_path)
+                print("No emails found matching your query.")
+                return False
+
+            print(f"\nSuccess! {handler.rows_written} emails exported to:")
             print(f"  {output_path}")
 
             return True
@@ -181,6 +214,12 @@ Examples:
   # Fetch with full email body
   python main.py --query "has:attachment" --full-body
 
+  # Export to CSV for scripts and data tools
+  python main.py --query "label:newsletters" --max 100000 --format csv
+
+  # Fetch without the local mail cache
+  python main.py --query "label:work" --no-cache
+
   # Show account profile
   python main.py --profile
 
@@ -254,10 +293,32 @@ Gmail Query Examples:
         help='Include full email body (no truncation)'
     )
 
+    parser.add_argument(
+        '--format', '-f',
+        type=str,
+        choices=['xlsx', 'csv', 'parquet'],
+        default='xlsx',
+        help='Output format (default: xlsx; csv/parquet are faster for large exports)'
+    )
+
+    # Cache options
+    parser.add_argument(
+        '--cache-file',
+        type=str,
+        default=CACHE_FILE,
+        help=f'Local mail cache file (default: {CACHE_FILE})'
+    )
+
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Download every email again instead of using the local cache'
+    )
+
     args = parser.parse_args()
 
     # Create app instance
-    app = MEMApp()
+    app = MEMApp(cache_path=None if args.no_cache else args.cache_file)
 
     # Handle commands
     if args.auth:
@@ -278,7 +339,8 @@ Gmail Query Examples:
             max_results=args.max,
             output_file=args.output,
             output_dir=args.output_dir,
-            full_body=args.full_body
+            full_body=args.full_body,
+            output_format=args.format
         )
         sys.exit(0 if success else 1)
 
@@ -6,9 +6,11 @@ Gmail email fetching and Excel export functionality as tools for Claude.
 """
 
 import asyncio
+import functools
 import json
 import os
-from typing import Any, List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Dict
 
 from mcp.server.models import InitializationOptions
 from mcp.server import NotificationOptions, Server
@@ -17,14 +19,22 @@ from mcp.types import Tool, TextContent
 
 from gmail_auth import GmailAuthenticator
 from email_fetcher import EmailFetcher
-from excel_handler import ExcelHandler
+from excel_handler import ExcelHandler, PREVIEW_BODY_CHARS
+from mail_cache import MailCache
 
 
+# Default number of emails per fetch_gmail_emails page
+DEFAULT_PAGE_SIZE = 50
+
 # Global instances
 authenticator = GmailAuthenticator()
 gmail_service = None
 email_fetcher = None
 
+# Blocking Google API and openpyxl work runs here, off the event loop
+executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="mem-tool")
+_init_lock = asyncio.Lock()
+
 
 def initialize_gmail():
     """Initialize Gmail service if not already initialized."""
@@ -32,7 +42,40 @@ def initialize_gmail():
 
     if gmail_service is None:
         gmail_service = authenticator.get_gmail_service()
-        email_fetcher = EmailFetcher(gmail_service)
+        email_fetcher = EmailFetcher(
+            gmail_service,
+            http_factory=authenticator.new_http,
+            cache=MailCache()
+        )
+
+
+async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+    """
+    Run a blocking function in the tool executor.
+
+    Args:
+        func: Blocking function
+        *args, **kwargs: Arguments for func
+
+    Returns:
+        Result of func
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+
+async def ensure_gmail():
+    """Initialize Gmail once, even if several tool calls arrive together."""
+    if email_fetcher is not None:
+        return
+    async with _init_lock:
+        if email_fetcher is None:
+            await run_blocking(initialize_gmail)
+
+
+def to_json(data: Dict[str, Any]) -> str:
+    """Compact JSON for tool results (no indentation)."""
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
 
 
 # Create MCP server instance
@@ -50,7 +93,7 @@ async def handle_list_tools() -> list[Tool]:
     return [
         Tool(
             name="fetch_gmail_emails",
-            description="Fetch emails from Gmail using a search query. Supports full Gmail search syntax including filters like 'from:', 'subject:', 'after:', 'is:unread', etc.",
+            description="Fetch emails from Gmail using a search query, one page at a time. Supports full Gmail search syntax including filters like 'from:', 'subject:', 'after:', 'is:unread', etc. Pass the returned next_page_token to get the next page.",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -60,8 +103,12 @@ async def handle_list_tools() -> list[Tool]:
                     },
                     "max_results": {
                         "type": "integer",
-                        "description": "Maximum number of emails to fetch (default: 100)",
-                        "default": 100,
+                        "description": f"Maximum number of emails in this page (default: {DEFAULT_PAGE_SIZE}, max: 500)",
+                        "default": DEFAULT_PAGE_SIZE,
+                    },
+                    "page_token": {
+                        "type": "string",
+                        "description": "next_page_token from the previous page (omit for the first page)",
                     },
                 },
                 "required": ["query"],
@@ -161,8 +208,8 @@ async def handle_call_tool(name: str, arguments: dict) -> list[TextContent]:
         List of text content with results
     """
     try:
-        # Initialize Gmail service
-        initialize_gmail()
+        # Initialize Gmail service (only the first call does any work)
+        await ensure_gmail()
 
         if name == "fetch_gmail_emails":
             return await fetch_gmail_emails_tool(arguments)
@@ -191,16 +238,18 @@ async def handle_call_tool(name: str, arguments: dict) -> list[TextContent]:
 
 async def fetch_gmail_emails_tool(arguments: dict) -> list[TextContent]:
     """
-    Fetch emails from Gmail.
+    Fetch one page of emails from Gmail.
 
     Args:
         arguments: Tool arguments with 'query' and optional 'max_results'
+            (page size) and 'page_token'
 
     Returns:
-        List of text content with email data
+        List of text content with email data and the next page token
     """
     query = arguments.get("query")
-    max_results = arguments.get("max_results", 100)
+    page_size = arguments.get("max_results", DEFAULT_PAGE_SIZE)
+    page_token = arguments.get("page_token")
 
     if not query:
         return [TextContent(
@@ -208,20 +257,26 @@ async def fetch_gmail_emails_tool(arguments: dict) -> list[TextContent]:
             text="Error: 'query' parameter is required"
         )]
 
-    # Fetch emails
-    emails = email_fetcher.search_emails(query, max_results)
+    # Fetch one page of emails
+    emails, next_page_token = await run_blocking(
+        email_fetcher.search_page,
+        query,
+        page_size=page_size,
+        page_token=page_token
+    )
 
     # Format response
     result = {
         "success": True,
         "count": len(emails),
         "query": query,
+        "next_page_token": next_page_token,
         "emails": emails
     }
 
     return [TextContent(
         type="text",
-        text=json.dumps(result, indent=2)
+        text=to_json(result)
     )]
 
 
@@ -250,13 +305,15 @@ async def export_emails_to_excel_tool(arguments: dict) -> list[TextContent]:
     handler = ExcelHandler()
 
     if full_body:
-        output_path = handler.export_emails_with_full_body(
+        output_path = await run_blocking(
+            handler.export_emails_with_full_body,
             emails,
             filename=filename,
             output_dir=output_dir
         )
     else:
-        output_path = handler.export_emails(
+        output_path = await run_blocking(
+            handler.export_emails,
             emails,
             filename=filename,
             output_dir=output_dir
@@ -271,7 +328,7 @@ async def export_emails_to_excel_tool(arguments: dict) -> list[TextContent]:
 
     return [TextContent(
         type="text",
-        text=json.dumps(result, indent=2)
+        text=to_json(result)
     )]
 
 
@@ -294,7 +351,7 @@ async def get_email_details_tool(arguments: dict) -> list[TextContent]:
         )]
 
     # Get email details
-    email = email_fetcher.get_email_details(message_id)
+    email = await run_blocking(email_fetcher.get_email_details, message_id)
 
     if not email:
         return [TextContent(
@@ -309,7 +366,7 @@ async def get_email_details_tool(arguments: dict) -> list[TextContent]:
 
     return [TextContent(
         type="text",
-        text=json.dumps(result, indent=2)
+        text=to_json(result)
     )]
 
 
@@ -335,61 +392,60 @@ async def search_and_export_tool(arguments: dict) -> list[TextContent]:
             text="Error: 'query' parameter is required"
         )]
 
-    # Fetch emails
-    emails = email_fetcher.search_emails(query, max_results)
+    # Fetch and export in one streaming pass, off the event loop
+    handler = ExcelHandler()
+    output_path = await run_blocking(
+        handler.export_emails_stream,
+        email_fetcher.iter_search(
+            query,
+            max_results,
+            max_body_chars=None if full_body else PREVIEW_BODY_CHARS
+        ),
+        filename=filename,
+        output_dir=output_dir,
+        full_body=full_body
+    )
 
-    if not emails:
+    if not handler.rows_written:
+        os.remove(output_path)
         return [TextContent(
             type="text",
             text=f"No emails found for query: '{query}'"
         )]
 
-    # Export to Excel
-    handler = ExcelHandler()
-
-    if full_body:
-        output_path = handler.export_emails_with_full_body(
-            emails,
-            filename=filename,
-            output_dir=output_dir
-        )
-    else:
-        output_path = handler.export_emails(
-            emails,
-            filename=filename,
-            output_dir=output_dir
-        )
-
     result = {
         "success": True,
         "query": query,
-        "emails_found": len(emails),
+        "emails_found": handler.rows_written,
         "output_path": output_path,
         "full_body": full_body
     }
 
     return [TextContent(
         type="text",
-        text=json.dumps(result, indent=2)
+        text=to_json(result)
     )]
 
 
 async def main():
     """Main entry point for MCP server."""
     # Run the server using stdin/stdout streams
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="mem-gmail-server",
-                server_version="0.1.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name="mem-gmail-server",
+                    server_version="0.1.0",
+                    capabilities=server.get_capabilities(
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={},
+                    ),
                 ),
-            ),
-        )
+            )
+    finally:
+        executor.shutdown(wait=False)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,314 @@
+"""
+MIME Body Extraction
+
+This module extracts the readable text body from a Gmail API message
+payload. It walks the MIME tree once, stops at the first text/plain part
+and only decodes the part it returns. Bodies are decoded and converted
+to text chunk by chunk, so a caller that needs only the first characters
+(a preview) stops decoding as soon as it has them.
+"""
+
+import base64
+import codecs
+import html
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Base64 characters in the first chunk of a body decoded in chunks (a
+# multiple of 4); each further chunk is twice as long as the one before
+FIRST_CHUNK_CHARS = 2048
+
+# HTML held back for an unclosed hidden element before it is converted
+# like any other markup (keeps a missing </style> from stalling the stream)
+_MAX_PENDING = 256 * 1024
+
+# Elements whose content is never visible text
+_HIDDEN_RE = re.compile(
+    r'<!--.*?-->|<(script|style|head|title|noscript|template)\b.*?</\1\s*>',
+    re.IGNORECASE | re.DOTALL
+)
+
+# Start of a hidden element (left once the closed ones are removed
+# only if it is not closed yet)
+_HIDDEN_START_RE = re.compile(r'<(?:!--|(?:script|style|head|title|noscript|template)\b)', re.IGNORECASE)
+
+# Tags that start a new line in the text output (most frequent first)
+_BLOCK_TAG_RE = re.compile(
+    r'</?(?:t[dhr]|table|p|div|br|li|h[1-6]|ul|ol|hr|blockquote|pre|section|'
+    r'article|header|footer|nav|main|aside|address|dd|dl|dt|form)\b[^>]*>',
+    re.IGNORECASE
+)
+
+# Any other tag (or a tag cut off at the end of the text)
+_TAG_RE = re.compile(r'<[^>]*(?:>|\Z)')
+
+# Character references as html.unescape matches them
+_CHARREF_RE = re.compile(r'&(?:#[0-9]+;?|#[xX][0-9a-fA-F]+;?|[^\t\n\f <&#;]{1,32};?)')
+
+# Longest character reference, to find one cut off at the end of a chunk
+_MAX_REF_LEN = 34
+
+
+def _unescape_refs(text: str) -> str:
+    """
+    Decode character references like html.unescape, one replace per
+    distinct reference instead of one call per occurrence.
+
+    Falls back to html.unescape when replacing could decode a reference
+    twice (references without ';' or several that decode to '&').
+
+    Args:
+        text: Text with character references
+
+    Returns:
+        Decoded text
+    """
+    refs = set(_CHARREF_RE.findall(text))
+    if not all(ref.endswith(';') for ref in refs):
+        return html.unescape(text)
+
+    # A reference that decodes to '&' goes last so its '&' is not decoded again
+    decoded = sorted(((ref, html.unescape(ref)) for ref in refs), key=lambda item: '&' in item[1])
+    if len(decoded) > 1 and '&' in decoded[-2][1]:
+        return html.unescape(text)
+
+    for ref, char in decoded:
+        text = text.replace(ref, char)
+    return text
+
+
+def _markup_to_text(html_text: str) -> str:
+    """
+    Convert HTML without hidden elements to text (whitespace not collapsed).
+
+    Args:
+        html_text: HTML without a tag or reference cut off
+
+    Returns:
+        Text with a line break per block element
+    """
+    text = _BLOCK_TAG_RE.sub('\n', html_text)
+    text = _TAG_RE.sub('', text)
+    if '&' in text:
+        text = _unescape_refs(text)
+    return text
+
+
+class HtmlTextStream:
+    """
+    Streaming HTML-to-text converter.
+
+    HTML is fed in chunks of any size. Each chunk is converted up to the
+    last point where no tag, hidden element (script, style, head,
+    comments) or character reference is cut off; the rest is carried
+    into the next chunk. Whitespace is collapsed per line, so the text
+    read so far is final except for the line still being written.
+    """
+
+    def __init__(self):
+        self._pending = ''
+        self._line = ''
+        self.lines: List[str] = []
+        self.length = 0
+
+    def _add_text(self, text: str, final: bool = False) -> None:
+        """Append converted text, collapsing whitespace per finished line."""
+        lines = (self._line + text).split('\n')
+        self._line = '' if final else lines.pop()
+        for line in filter(None, map(' '.join, map(str.split, lines))):
+            self.lines.append(line)
+            self.length += len(line) + 1
+
+    def feed(self, html_chunk: str) -> None:
+        """
+        Convert the next chunk of HTML.
+
+        Args:
+            html_chunk: HTML continuing the previous chunk
+        """
+        html_text = self._pending + html_chunk
+
+        # Hold back a tag cut off at the end
+        end = html_text.rfind('<')
+        if end <= html_text.rfind('>'):
+            end = len(html_text)
+        head = _HIDDEN_RE.sub('', html_text[:end])
+        tail = html_text[end:]
+
+        # Hold back a hidden element that is not closed yet
+        match = _HIDDEN_START_RE.search(head)
+        if match and len(head) - match.start() < _MAX_PENDING:
+            head, tail = head[:match.start()], head[match.start():] + tail
+
+        # Hold back a character reference cut off at the end
+        amp = head.rfind('&', max(len(head) - _MAX_REF_LEN, 0))
+        if amp >= 0 and not re.search(r'[;\s<]', head[amp + 1:]):
+            head, tail = head[:amp], head[amp:] + tail
+
+        self._pending = tail
+        self._add_text(_markup_to_text(head))
+
+    def close(self) -> str:
+        """
+        Convert what is left of the document.
+
+        Returns:
+            Plain text of the whole document, one line per block element
+        """
+        self._add_text(_markup_to_text(_HIDDEN_RE.sub('', self._pending)), final=True)
+        self._pending = ''
+        return self.text()
+
+    def text(self) -> str:
+        """Text of the finished lines."""
+        return '\n'.join(self.lines)
+
+
+def html_to_text(html_text: str) -> str:
+    """
+    Convert HTML to plain text.
+
+    Each step is one pass over the whole document: hidden elements
+    (script, style, head, comments) are dropped, block elements become
+    line breaks, remaining tags are removed, every named and numeric
+    character reference is decoded, and whitespace is collapsed per line.
+
+    Args:
+        html_text: HTML string
+
+    Returns:
+        Plain text, one line per block element
+    """
+    text = _markup_to_text(_HIDDEN_RE.sub('', html_text))
+    return '\n'.join(filter(None, map(' '.join, map(str.split, text.split('\n')))))
+
+
+def iter_decoded(data: str, chunk_chars: int = FIRST_CHUNK_CHARS) -> Iterator[str]:
+    """
+    Decode base64url encoded body data lazily, in chunks that double in size.
+
+    Args:
+        data: Base64url encoded string
+        chunk_chars: Base64 characters in the first chunk (a multiple of 4)
+
+    Yields:
+        Decoded text of each chunk (UTF-8 sequences are never split)
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+    start = 0
+    while start < len(data):
+        chunk = data[start:start + chunk_chars]
+        start += chunk_chars
+        chunk_chars *= 2
+        # Gmail leaves out the padding of the last chunk
+        yield decoder.decode(base64.urlsafe_b64decode(chunk + '=' * (-len(chunk) % 4)))
+    yield decoder.decode(b'', final=True)
+
+
+def decode_body(data: str) -> str:
+    """
+    Decode base64url encoded body data.
+
+    Args:
+        data: Base64url encoded string
+
+    Returns:
+        Decoded text
+    """
+    try:
+        # Gmail uses base64url encoding without padding
+        decoded = base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+        return decoded.decode('utf-8', errors='ignore')
+    except Exception as e:
+        print(f"Error decoding body: {e}")
+        return ""
+
+
+def _read_plain(data: str, max_chars: Optional[int]) -> Tuple[str, bool]:
+    """Decode a text/plain body up to max_chars characters."""
+    if max_chars is None:
+        return decode_body(data), True
+
+    text = ''
+    try:
+        for chunk in iter_decoded(data):
+            text += chunk
+            if len(text) > max_chars:
+                return text[:max_chars], False
+    except Exception as e:
+        print(f"Error decoding body: {e}")
+        return "", True
+    return text, True
+
+
+def _read_html(data: str, max_chars: Optional[int]) -> Tuple[str, bool]:
+    """Decode a text/html body and convert it to at most max_chars characters of text."""
+    if max_chars is None:
+        return html_to_text(decode_body(data)), True
+
+    stream = HtmlTextStream()
+    try:
+        for chunk in iter_decoded(data):
+            stream.feed(chunk)
+            # The finished lines hold more than max_chars characters
+            if stream.length > max_chars + 1:
+                return stream.text()[:max_chars], False
+    except Exception as e:
+        print(f"Error decoding body: {e}")
+    text = stream.close()
+    return text[:max_chars], len(text) <= max_chars
+
+
+def read_body(payload: Dict, max_chars: Optional[int] = None) -> Tuple[str, bool]:
+    """
+    Extract the email body from a Gmail message payload.
+
+    The MIME tree is walked depth-first in document order. The first
+    text/plain part with data is returned right away; otherwise the first
+    text/html part is converted to text. Attachments are skipped and only
+    the chosen part is decoded, chunk by chunk until max_chars characters
+    of text are read.
+
+    Args:
+        payload: Gmail message payload
+        max_chars: Characters of body text to read (None for all)
+
+    Returns:
+        Tuple of (body text, whether it is the whole body)
+    """
+    html_data = None
+    stack = [payload]
+
+    while stack:
+        part = stack.pop()
+        mime_type = part.get('mimeType', '')
+        data = part.get('body', {}).get('data')
+
+        if data and not part.get('filename'):
+            if mime_type == 'text/html':
+                if html_data is None:
+                    html_data = data
+            elif mime_type == 'text/plain' or part is payload:
+                # text/plain part (or the body of a single-part message)
+                return _read_plain(data, max_chars)
+
+        # Push children reversed so they are visited in order
+        stack.extend(reversed(part.get('parts', [])))
+
+    if html_data is not None:
+        return _read_html(html_data, max_chars)
+    return '', True
+
+
+def extract_body(payload: Dict, max_chars: Optional[int] = None) -> str:
+    """
+    Extract the email body text from a Gmail message payload.
+
+    Args:
+        payload: Gmail message payload
+        max_chars: Characters of body text to read (None for all)
+
+    Returns:
+        Email body text
+    """
+    return read_body(payload, max_chars)[0]
@@ -0,0 +1,193 @@
+"""
+Rate Limiting for Gmail API Calls
+
+This module provides a token bucket limiter measured in Gmail quota units
+and exponential backoff for rate-limit (429) and server (5xx) errors.
+"""
+
+import random
+import threading
+import time
+from typing import Any, Callable, Optional
+
+# Gmail per-user quota and the cost of the calls MEM makes
+GMAIL_QUOTA_UNITS_PER_SECOND = 250
+LIST_COST = 5
+GET_COST = 5
+HISTORY_COST = 2
+PROFILE_COST = 1
+
+# Errors worth retrying: rate limits and transient server failures
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+RATE_LIMIT_REASONS = ('rateLimitExceeded', 'userRateLimitExceeded')
+
+
+class TokenBucket:
+    """Thread-safe token bucket that adapts its rate to throttling."""
+
+    def __init__(
+        self,
+        rate: float = GMAIL_QUOTA_UNITS_PER_SECOND,
+        capacity: Optional[float] = None,
+        min_rate: Optional[float] = None
+    ):
+        """
+        Initialize token bucket.
+
+        Args:
+            rate: Tokens added per second (quota units per second)
+            capacity: Maximum burst size (default: one second of tokens)
+            min_rate: Lowest rate slow_down() may reach (default: rate / 16)
+        """
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = float(min_rate) if min_rate else self.max_rate / 16
+        self.capacity = float(capacity) if capacity else self.max_rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        Block until the requested tokens are available and take them.
+
+        Args:
+            tokens: Number of tokens (requests larger than the bucket
+                capacity wait for a full bucket)
+
+        Returns:
+            Seconds spent waiting
+        """
+        tokens = min(float(tokens), self.capacity)
+        waited = 0.0
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity,
+                    self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+
+                delay = (tokens - self.tokens) / self.rate
+
+            time.sleep(delay)
+            waited += delay
+
+    def slow_down(self) -> None:
+        """Halve the rate after the server throttled a request."""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def speed_up(self) -> None:
+        """Recover the rate gradually after successful requests."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+
+
+def http_status(error: Exception) -> Optional[int]:
+    """
+    Get the HTTP status code of an API error.
+
+    Args:
+        error: Exception raised by a Gmail API call
+
+    Returns:
+        Status code, or None if the error has no HTTP response
+    """
+    resp = getattr(error, 'resp', None)
+    status = getattr(resp, 'status', None)
+    if status is None:
+        status = getattr(error, 'status_code', None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Check whether an API error is worth retrying.
+
+    Args:
+        error: Exception raised by a Gmail API call
+
+    Returns:
+        True for 429, 5xx and 403 rate-limit errors
+    """
+    status = http_status(error)
+    if status in RETRYABLE_STATUS:
+        return True
+    if status == 403:
+        return any(reason in str(error) for reason in RATE_LIMIT_REASONS)
+    return False
+
+
+def backoff_delay(attempt: int, base_delay: float = 1.0, max_delay: float = 32.0) -> float:
+    """
+    Exponential backoff delay with jitter.
+
+    Args:
+        attempt: Retry number (1 for the first retry)
+        base_delay: Delay of the first retry in seconds
+        max_delay: Upper bound in seconds
+
+    Returns:
+        Seconds to wait before the retry
+    """
+    delay = min(max_delay, base_delay * 2 ** (attempt - 1))
+    return delay + random.uniform(0, base_delay)
+
+
+def execute_with_backoff(
+    request,
+    limiter: Optional[TokenBucket] = None,
+    cost: float = 1,
+    max_retries: int = 5,
+    base_delay: float = 1.0,
+    on_retry: Optional[Callable[[Exception], None]] = None,
+    http=None
+) -> Any:
+    """
+    Execute an API request, retrying retryable errors with backoff.
+
+    Args:
+        request: Gmail API request (anything with execute())
+        limiter: Token bucket to take `cost` tokens from before each attempt
+        cost: Quota units of the request
+        max_retries: Maximum number of retries
+        base_delay: Delay of the first retry in seconds
+        on_retry: Called with the error before each retry
+        http: Http object to send the request with (default: the service's)
+
+    Returns:
+        Response of the request
+
+    Raises:
+        Exception: The last error if it is not retryable or retries ran out
+    """
+    attempt = 0
+    while True:
+        if limiter is not None:
+            limiter.acquire(cost)
+        try:
+            response = request.execute(http=http) if http is not None else request.execute()
+        except Exception as e:
+            if not is_retryable(e) or attempt >= max_retries:
+                raise
+            attempt += 1
+            if limiter is not None:
+                limiter.slow_down()
+            if on_retry is not None:
+                on_retry(e)
+            time.sleep(backoff_delay(attempt, base_delay))
+            continue
+
+        if limiter is not None and attempt == 0:
+            limiter.speed_up()
+        return response
@@ -9,32 +9,60 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+MODEL = "claude-sonnet-4-5-20250929"
+PROMPT = """Translate this English text to Russian. Return ONLY the Russian translation, nothing else.
+
+Text: {text}"""
+
 
 class Agent1:
-    def __init__(self):
+    def __init__(self, client=None, verbose: bool = True, cache=None):
+        """
+        Args:
+            client: Anthropic-compatible client (default: one created from
+                ANTHROPIC_API_KEY); anything with messages.create works
+            verbose: Print every translation
+            cache: TranslationCache shared by the agents (None to always
+                call the API)
+        """
         self.name = "Agent 1 (EN→RU)"
-        api_key = os.environ.get("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise ValueError("ANTHROPIC_API_KEY not found")
-        self.client = Anthropic(api_key=api_key)
-        print(f"✓ {self.name} initialized")
+        self.verbose = verbose
+        self.cache = cache
+        if client is None:
+            api_key = os.environ.get("ANTHROPIC_API_KEY")
+            if not api_key:
+                raise ValueError("ANTHROPIC_API_KEY not found")
+            client = Anthropic(api_key=api_key)
+        self.client = client
+        if verbose:
+            print(f"✓ {self.name} initialized")
 
-    def translate(self, english_text: str) -> str:
-        """Translate English to Russian"""
-        print(f"\n[{self.name}] Translating: {english_text}")
+    def request_translation(self, english_text: str) -> str:
+        """Translate English to Russian (cached, otherwise one API call; errors are raised)"""
+        if self.cache is not None:
+            return self.cache.get_or_compute(
+                MODEL, PROMPT, english_text, lambda: self._call_api(english_text)
+            )
+        return self._call_api(english_text)
 
-        prompt = f"""Translate this English text to Russian. Return ONLY the Russian translation, nothing else.
+    def _call_api(self, english_text: str) -> str:
+        """Send the translation request"""
+        message = self.client.messages.create(
+            model=MODEL,
+            max_tokens=1024,
+            messages=[{"role": "user", "content": PROMPT.format(text=english_text)}]
+        )
+        return message.content[0].text.strip()
 
-Text: {english_text}"""
+    def translate(self, english_text: str) -> str:
+        """Translate English to Russian"""
+        if self.verbose:
+            print(f"\n[{self.name}] Translating: {english_text}")
 
         try:
-            message = self.client.messages.create(
-                model="claude-sonnet-4-5-20250929",
-                max_tokens=1024,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            russian_text = message.content[0].text.strip()
-            print(f"[{self.name}] Result: {russian_text}")
+            russian_text = self.request_translation(english_text)
+            if self.verbose:
+                print(f"[{self.name}] Result: {russian_text}")
             return russian_text
         except Exception as e:
             print(f"[{self.name}] ERROR: {e}")
@@ -9,32 +9,60 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+MODEL = "claude-sonnet-4-5-20250929"
+PROMPT = """Translate this Russian text to Hebrew. Return ONLY the Hebrew translation, nothing else.
+
+Text: {text}"""
+
 
 class Agent2:
-    def __init__(self):
+    def __init__(self, client=None, verbose: bool = True, cache=None):
+        """
+        Args:
+            client: Anthropic-compatible client (default: one created from
+                ANTHROPIC_API_KEY); anything with messages.create works
+            verbose: Print every translation
+            cache: TranslationCache shared by the agents (None to always
+                call the API)
+        """
         self.name = "Agent 2 (RU→HE)"
-        api_key = os.environ.get("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise ValueError("ANTHROPIC_API_KEY not found")
-        self.client = Anthropic(api_key=api_key)
-        print(f"✓ {self.name} initialized")
+        self.verbose = verbose
+        self.cache = cache
+        if client is None:
+            api_key = os.environ.get("ANTHROPIC_API_KEY")
+            if not api_key:
+                raise ValueError("ANTHROPIC_API_KEY not found")
+            client = Anthropic(api_key=api_key)
+        self.client = client
+        if verbose:
+            print(f"✓ {self.name} initialized")
 
-    def translate(self, russian_text: str) -> str:
-        """Translate Russian to Hebrew"""
-        print(f"\n[{self.name}] Translating: {russian_text}")
+    def request_translation(self, russian_text: str) -> str:
+        """Translate Russian to Hebrew (cached, otherwise one API call; errors are raised)"""
+        if self.cache is not None:
+            return self.cache.get_or_compute(
+                MODEL, PROMPT, russian_text, lambda: self._call_api(russian_text)
+            )
+        return self._call_api(russian_text)
 
-        prompt = f"""Translate this Russian text to Hebrew. Return ONLY the Hebrew translation, nothing else.
+    def _call_api(self, russian_text: str) -> str:
+        """Send the translation request"""
+        message = self.client.messages.create(
+            model=MODEL,
+            max_tokens=1024,
+            messages=[{"role": "user", "content": PROMPT.format(text=russian_text)}]
+        )
+        return message.content[0].text.strip()
 
-Text: {russian_text}"""
+    def translate(self, russian_text: str) -> str:
+        """Translate Russian to Hebrew"""
+        if self.verbose:
+            print(f"\n[{self.name}] Translating: {russian_text}")
 
         try:
-            message = self.client.messages.create(
-                model="claude-sonnet-4-5-20250929",
-                max_tokens=1024,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            hebrew_text = message.content[0].text.strip()
-            print(f"[{self.name}] Result: {hebrew_text}")
+            hebrew_text = self.request_translation(russian_text)
+            if self.verbose:
+                print(f"[{self.name}] Result: {hebrew_text}")
             return hebrew_text
         except Exception as e:
             print(f"[{self.name}] ERROR: {e}")
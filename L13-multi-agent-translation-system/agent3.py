@@ -9,32 +9,60 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+MODEL = "claude-sonnet-4-5-20250929"
+PROMPT = """Translate this Hebrew text to English. Return ONLY the English translation, nothing else.
+
+Text: {text}"""
+
 
 class Agent3:
-    def __init__(self):
+    def __init__(self, client=None, verbose: bool = True, cache=None):
+        """
+        Args:
+            client: Anthropic-compatible client (default: one created from
+                ANTHROPIC_API_KEY); anything with messages.create works
+            verbose: Print every translation
+            cache: TranslationCache shared by the agents (None to always
+                call the API)
+        """
         self.name = "Agent 3 (HE→EN)"
-        api_key = os.environ.get("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise ValueError("ANTHROPIC_API_KEY not found")
-        self.client = Anthropic(api_key=api_key)
-        print(f"✓ {self.name} initialized")
+        self.verbose = verbose
+        self.cache = cache
+        if client is None:
+            api_key = os.environ.get("ANTHROPIC_API_KEY")
+            if not api_key:
+                raise ValueError("ANTHROPIC_API_KEY not found")
+            client = Anthropic(api_key=api_key)
+        self.client = client
+        if verbose:
+            print(f"✓ {self.name} initialized")
 
-    def translate(self, hebrew_text: str) -> str:
-        """Translate Hebrew to English"""
-        print(f"\n[{self.name}] Translating: {hebrew_text}")
+    def request_translation(self, hebrew_text: str) -> str:
+        """Translate Hebrew to English (cached, otherwise one API call; errors are raised)"""
+        if self.cache is not None:
+            return self.cache.get_or_compute(
+                MODEL, PROMPT, hebrew_text, lambda: self._call_api(hebrew_text)
+            )
+        return self._call_api(hebrew_text)
 
-        prompt = f"""Translate this Hebrew text to English. Return ONLY the English translation, nothing else.
+    def _call_api(self, hebrew_text: str) -> str:
+        """Send the translation request"""
+        message = self.client.messages.create(
+            model=MODEL,
+            max_tokens=1024,
+            messages=[{"role": "user", "content": PROMPT.format(text=hebrew_text)}]
+        )
+        return message.content[0].text.strip()
 
-Text: {hebrew_text}"""
+    def translate(self, hebrew_text: str) -> str:
+        """Translate Hebrew to English"""
+        if self.verbose:
+            print(f"\n[{self.name}] Translating: {hebrew_text}")
 
         try:
-            message = self.client.messages.create(
-                model="claude-sonnet-4-5-20250929",
-                max_tokens=1024,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            english_text = message.content[0].text.strip()
-            print(f"[{self.name}] Result: {english_text}")
+            english_text = self.request_translation(hebrew_text)
+            if self.verbose:
+                print(f"[{self.name}] Result: {english_text}")
             return english_text
         except Exception as e:
             print(f"[{self.name}] ERROR: {e}")
@@ -0,0 +1,228 @@
+"""
+Concurrent Translation Pipeline
+Runs many sentences through the agent chain at once: every stage has its
+own queue and workers, and a sentence moves on to the next stage as soon
+as its translation arrives, so the API round-trips of different sentences
+overlap instead of adding up.
+"""
+
+import asyncio
+import bisect
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence
+
+from anthropic import APIConnectionError, APITimeoutError
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0)
+
+# HTTP status codes worth retrying (timeouts, rate limits, overload, 5xx)
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+# Errors without a status worth retrying (the request never got an answer)
+RETRYABLE_ERRORS = (APIConnectionError, APITimeoutError, asyncio.TimeoutError)
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Check whether a failed API call is worth retrying.
+
+    Only rate limits, server errors, connection errors and timeouts are
+    retried; anything else (bad request, authentication, a bug in the
+    agent) fails fast.
+    """
+    if isinstance(error, RETRYABLE_ERRORS):
+        return True
+    return getattr(error, 'status_code', None) in RETRYABLE_STATUS
+
+
+def backoff_delay(attempt: int, base_delay: float = 1.0, max_delay: float = 30.0) -> float:
+    """Exponential backoff with jitter for retry number `attempt` (1-based)"""
+    delay = min(max_delay, base_delay * 2 ** (attempt - 1))
+    return delay + random.uniform(0, base_delay)
+
+
+class LatencyHistogram:
+    """Latency samples of one pipeline stage, bucketed for display"""
+
+    def __init__(self, name: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.samples: List[float] = []
+
+    def record(self, seconds: float):
+        """Add one latency sample"""
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> float:
+        """Latency below which q percent of the samples fall"""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self) -> Dict:
+        """Count, mean and percentiles in seconds (JSON friendly)"""
+        count = len(self.samples)
+        return {
+            'count': count,
+            'mean': sum(self.samples) / count if count else 0.0,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'max': max(self.samples) if count else 0.0,
+            'buckets': dict(zip([f"<={b}s" for b in self.buckets] + ['inf'], self.counts))
+        }
+
+    def format(self, width: int = 40) -> str:
+        """Text histogram with one bar per bucket"""
+        stats = self.summary()
+        lines = [
+            f"{self.name}: {stats['count']} calls, mean {stats['mean']:.3f}s, "
+            f"p50 {stats['p50']:.3f}s, p90 {stats['p90']:.3f}s, max {stats['max']:.3f}s"
+        ]
+        peak = max(self.counts) or 1
+        labels = [f"<= {b:g}s" for b in self.buckets] + [f"> {self.buckets[-1]:g}s"]
+        for label, count in zip(labels, self.counts):
+            if count:
+                lines.append(f"  {label:>9} | {'#' * max(1, count * width // peak)} {count}")
+        return '\n'.join(lines)
+
+
+class TranslationPipeline:
+    """Concurrent EN→RU→HE→EN chain over a list of sentences"""
+
+    def __init__(
+        self,
+        agents: Sequence,
+        max_concurrency: int = 8,
+        max_retries: int = 3,
+        base_delay: float = 1.0
+    ):
+        """
+        Args:
+            agents: Translation stages in chain order; each needs a name and
+                request_translation(text) that raises on API errors
+            max_concurrency: Maximum number of API calls in flight (all
+                stages together)
+            max_retries: Retries per call for retryable errors; after that
+                the stage passes its input text on unchanged (like
+                Agent.translate does)
+            base_delay: Delay of the first retry in seconds
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.agents = list(agents)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.histograms = [LatencyHistogram(agent.name) for agent in self.agents]
+        self.retries = 0
+        self.failures = 0
+
+    async def _call(self, stage: int, text: str, executor, limit: asyncio.Semaphore) -> str:
+        """One stage translation with retries; the blocking client runs in the executor"""
+        agent = self.agents[stage]
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            async with limit:
+                start = time.perf_counter()
+                try:
+                    result = await loop.run_in_executor(executor, agent.request_translation, text)
+                    self.histograms[stage].record(time.perf_counter() - start)
+                    return result
+                except Exception as e:
+                    error = e
+
+            if not is_retryable(error) or attempt >= self.max_retries:
+                self.failures += 1
+                print(f"[{agent.name}] ERROR: {error}")
+                return text
+            attempt += 1
+            self.retries += 1
+            await asyncio.sleep(backoff_delay(attempt, self.base_delay))
+
+    async def run_async(
+        self,
+        sentences: Sequence[str],
+        on_complete: Optional[Callable[[int, List[str]], None]] = None
+    ) -> List[List[str]]:
+        """
+        Translate all sentences through the chain.
+
+        Args:
+            sentences: Source sentences
+            on_complete: Called with (index, texts) when a sentence leaves the
+                last stage; texts holds the source and every stage output
+
+        Returns:
+            texts for each sentence, in input order
+        """
+        results: List[Optional[List[str]]] = [None] * len(sentences)
+        queues = [asyncio.Queue() for _ in self.agents]
+        limit = asyncio.Semaphore(self.max_concurrency)
+
+        async def worker(stage: int, executor):
+            queue = queues[stage]
+            while True:
+                index, texts = await queue.get()
+                try:
+                    texts.append(await self._call(stage, texts[-1], executor, limit))
+                    if stage + 1 < len(queues):
+                        queues[stage + 1].put_nowait((index, texts))
+                    else:
+                        results[index] = texts
+                        if on_complete is not None:
+                            on_complete(index, texts)
+                finally:
+                    queue.task_done()
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                thread_name_prefix="translate") as executor:
+            workers = [
+                asyncio.create_task(worker(stage, executor))
+                for stage in range(len(queues))
+                for _ in range(self.max_concurrency)
+            ]
+            for index, sentence in enumerate(sentences):
+                queues[0].put_nowait((index, [sentence]))
+
+            # A sentence is queued for the next stage before task_done, so
+            # joining the queues in chain order waits for every sentence
+            try:
+                for queue in queues:
+                    await queue.join()
+            finally:
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+
+        return results
+
+    def run(
+        self,
+        sentences: Sequence[str],
+        on_complete: Optional[Callable[[int, List[str]], None]] = None
+    ) -> List[List[str]]:
+        """Blocking wrapper around run_async"""
+        return asyncio.run(self.run_async(sentences, on_complete))
+
+    def stats(self) -> Dict:
+        """Per-stage latency summaries plus retry/failure counts"""
+        return {
+            'stages': {h.name: h.summary() for h in self.histograms},
+            'retries': self.retries,
+            'failures': self.failures
+        }
+
+    def print_stats(self):
+        """Print the per-stage latency histograms"""
+        for histogram in self.histograms:
+            print(histogram.format())
+        print(f"Retries: {self.retries}, failed calls: {self.failures}")
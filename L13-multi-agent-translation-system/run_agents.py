@@ -4,46 +4,27 @@ Main orchestrator script that runs the translation experiment
 """
 
 import os
-import sys
 import json
+import argparse
+import time
 from anthropic import Anthropic
 from dotenv import load_dotenv
-from typing import List, Dict
+from typing import List, Dict, Optional
 import matplotlib.pyplot as plt
 
-from agent1 import Agent1
+from agent1 import Agent1, MODEL
 from agent2 import Agent2
 from agent3 import Agent3
+from pipeline import TranslationPipeline
+from translation_cache import TranslationCache, CACHE_FILE, DEFAULT_MAX_ENTRIES
+from similarity import compute_metrics, summarize, metric_rows, EMBEDDING_MODEL
 
 load_dotenv()
 
 
-def text_to_vector(text: str) -> dict:
-    """Convert text to a simple character frequency vector"""
-    text = text.lower()
-    vector = {}
-    for char in text:
-        if char.isalnum() or char.isspace():
-            vector[char] = vector.get(char, 0) + 1
-    return vector
-
-
-def cosine_distance(vec1: dict, vec2: dict) -> float:
-    """Calculate cosine distance between two frequency vectors"""
-    all_keys = set(vec1.keys()) | set(vec2.keys())
-    dot_product = sum(vec1.get(k, 0) * vec2.get(k, 0) for k in all_keys)
-    mag1 = sum(v ** 2 for v in vec1.values()) ** 0.5
-    mag2 = sum(v ** 2 for v in vec2.values()) ** 0.5
-
-    if mag1 == 0 or mag2 == 0:
-        return 1.0
-
-    similarity = dot_product / (mag1 * mag2)
-    return 1.0 - similarity
-
-
-def generate_sentences(client: Anthropic, count: int = 100) -> List[str]:
-    """Generate diverse English sentences using Claude"""
+def generate_sentences(client: Anthropic, count: int = 100,
+                       cache: Optional[TranslationCache] = None) -> List[str]:
+    """Generate diverse English sentences using Claude (reused from the cache on reruns)"""
     print(f"\nGenerating {count} sentences...")
 
     prompt = f"""Generate exactly {count} diverse English sentences for a translation experiment.
@@ -58,14 +39,19 @@ Requirements:
 
 Just output the sentences, one per line."""
 
-    try:
+    def request() -> str:
         message = client.messages.create(
-            model="claude-sonnet-4-5-20250929",
+            model=MODEL,
             max_tokens=4096,
             messages=[{"role": "user", "content": prompt}]
         )
+        return message.content[0].text.strip()
 
-        response = message.content[0].text.strip()
+    try:
+        if cache is not None:
+            response = cache.get_or_compute(MODEL, prompt, '', request)
+        else:
+            response = request()
         sentences = [line.strip() for line in response.split('\n') if line.strip()]
 
         # Clean up any numbering that might have been added
@@ -106,33 +92,6 @@ def fallback_sentences(count: int) -> List[str]:
     return result[:count]
 
 
-def process_sentence(original: str, agent1: Agent1, agent2: Agent2, agent3: Agent3) -> Dict:
-    """Process one sentence through the translation chain"""
-    print(f"\n{'='*70}")
-    print(f"Processing: {original}")
-
-    # Translation chain: EN → RU → HE → EN
-    russian_text = agent1.translate(original)
-    hebrew_text = agent2.translate(russian_text)
-    final_english = agent3.translate(hebrew_text)
-
-    # Calculate cosine distance
-    vec1 = text_to_vector(original)
-    vec2 = text_to_vector(final_english)
-    distance = cosine_distance(vec1, vec2)
-
-    print(f"\nCOMPARISON:")
-    print(f"  Original: {original}")
-    print(f"  Final:    {final_english}")
-    print(f"  Distance: {distance:.4f}")
-
-    return {
-        'original': original,
-        'final': final_english,
-        'distance': distance
-    }
-
-
 def create_visualization(results: List[Dict]):
     """Create and save visualization of translation degradation"""
     sentence_nums = [r['sentence_num'] for r in results]
@@ -158,49 +117,104 @@ def create_visualization(results: List[Dict]):
     plt.close()
 
 
-def run_experiment(num_sentences: int = 10):
-    """Run the full translation experiment"""
+def run_experiment(num_sentences: int = 10, max_concurrency: int = 8,
+                   max_retries: int = 3, client=None,
+                   cache_file: Optional[str] = CACHE_FILE,
+                   cache_size: int = DEFAULT_MAX_ENTRIES,
+                   embedding_model: Optional[str] = None):
+    """
+    Run the full translation experiment
+
+    Args:
+        num_sentences: Number of sentences to generate
+        max_concurrency: Maximum number of translation calls in flight
+        max_retries: Retries per translation call for rate limits/server errors
+        client: Anthropic-compatible client (default: created from
+            ANTHROPIC_API_KEY); a stub client makes the run offline
+        cache_file: Translation cache database shared by all agents
+            (None to call the API for every request)
+        cache_size: Maximum number of cached responses (LRU eviction)
+        embedding_model: Also measure the embedding cosine distance with
+            this sentence-transformers model
+    """
     print("\n" + "="*70)
     print("MULTI-AGENT TRANSLATION TURING MACHINE")
     print("="*70)
 
     # Initialize API client
-    api_key = os.environ.get("ANTHROPIC_API_KEY")
-    if not api_key:
-        raise ValueError("ANTHROPIC_API_KEY not found in .env file")
-    client = Anthropic(api_key=api_key)
+    if client is None:
+        api_key = os.environ.get("ANTHROPIC_API_KEY")
+        if not api_key:
+            raise ValueError("ANTHROPIC_API_KEY not found in .env file")
+        client = Anthropic(api_key=api_key)
 
-    # Initialize translation agents
-    agent1 = Agent1()
-    agent2 = Agent2()
-    agent3 = Agent3()
+    # Repeated sentences and reruns are answered from the cache
+    cache = TranslationCache(cache_file, cache_size) if cache_file else None
 
-    # Generate sentences
-    sentences = generate_sentences(client, num_sentences)
+    # Initialize translation agents (sharing one client and cache)
+    agents = [Agent1(client, cache=cache), Agent2(client, cache=cache), Agent3(client, cache=cache)]
 
-    # Process each sentence
+    # Generate sentences
+    sentences = generate_sentences(client, num_sentences, cache)
+
+    # Translate all sentences concurrently; each one moves to the next
+    # agent as soon as its previous translation is done
+    print(f"\nTranslating {len(sentences)} sentences "
+          f"(up to {max_concurrency} calls in flight)...")
+    pipeline = TranslationPipeline(agents, max_concurrency=max_concurrency,
+                                   max_retries=max_retries)
+    done = 0
+
+    def report(index: int, texts: List[str]):
+        nonlocal done
+        done += 1
+        print(f"  [{done}/{len(sentences)}] Sentence {index + 1}: {texts[-1]}")
+
+    start = time.perf_counter()
+    chains = pipeline.run(sentences, on_complete=report)
+    elapsed = time.perf_counter() - start
+
+    # All degradation metrics for all sentences in one batch; 'distance' is
+    # the character frequency cosine distance
+    metrics = compute_metrics([chain[0] for chain in chains], [chain[-1] for chain in chains],
+                              embedding_model=embedding_model)
     results = []
-    for i, sentence in enumerate(sentences, 1):
-        print(f"\n--- Sentence {i}/{num_sentences} ---")
-        result = process_sentence(sentence, agent1, agent2, agent3)
-        result['sentence_num'] = i
-        results.append(result)
+    for i, (chain, sentence_metrics) in enumerate(zip(chains, metric_rows(metrics)), 1):
+        original, russian_text, hebrew_text, final_english = chain
+        results.append({
+            'original': original,
+            'russian': russian_text,
+            'hebrew': hebrew_text,
+            'final': final_english,
+            'distance': sentence_metrics['char_cosine'],
+            'metrics': sentence_metrics,
+            'sentence_num': i
+        })
+
+    print(f"\nTranslated {len(results)} sentences in {elapsed:.1f}s")
+    pipeline.print_stats()
+    if cache is not None:
+        cache.print_stats()
 
     # Analysis
     print("\n" + "="*70)
     print("ANALYSIS")
     print("="*70)
 
-    distances = [r['distance'] for r in results]
-    avg_distance = sum(distances) / len(distances)
-    min_distance = min(distances)
-    max_distance = max(distances)
+    metric_summary = summarize(metrics)
+    avg_distance = metric_summary['char_cosine']['avg']
+    min_distance = metric_summary['char_cosine']['min']
+    max_distance = metric_summary['char_cosine']['max']
 
     print(f"\nTotal sentences processed: {len(results)}")
     print(f"Average cosine distance: {avg_distance:.4f}")
     print(f"Min distance: {min_distance:.4f}")
     print(f"Max distance: {max_distance:.4f}")
 
+    print("\nAll metrics (avg / min / max):")
+    for name, stats in metric_summary.items():
+        print(f"  {name:<17} {stats['avg']:.4f} / {stats['min']:.4f} / {stats['max']:.4f}")
+
     # Detailed sentence comparison
     print("\n" + "="*70)
     print("DETAILED SENTENCE COMPARISON")
@@ -232,11 +246,17 @@ def run_experiment(num_sentences: int = 10):
                 'total_sentences': len(results),
                 'avg_distance': avg_distance,
                 'min_distance': min_distance,
-                'max_distance': max_distance
+                'max_distance': max_distance,
+                'metrics': metric_summary
             },
+            'pipeline': dict(pipeline.stats(), elapsed_seconds=elapsed),
+            'cache': cache.stats() if cache is not None else None,
             'results': results
         }, f, indent=2, ensure_ascii=False)
 
+    if cache is not None:
+        cache.close()
+
     print(f"\n✓ Results saved to: {output_file}")
     print("\n" + "="*70)
     print("EXPERIMENT COMPLETE!")
@@ -247,16 +267,29 @@ def run_experiment(num_sentences: int = 10):
 
 def main():
     """Main entry point"""
-    # Get number of sentences from command line, default to 10
-    num_sentences = 10
-    if len(sys.argv) > 1:
-        try:
-            num_sentences = int(sys.argv[1])
-        except ValueError:
-            print(f"Invalid number: {sys.argv[1]}, using default (10)")
-
-    print(f"\nStarting experiment with {num_sentences} sentences...\n")
-    run_experiment(num_sentences)
+    parser = argparse.ArgumentParser(description='Multi-agent translation experiment')
+    parser.add_argument('num_sentences', type=int, nargs='?', default=10,
+                        help='Number of sentences (default: 10)')
+    parser.add_argument('--concurrency', type=int, default=8,
+                        help='Maximum translation calls in flight (default: 8)')
+    parser.add_argument('--retries', type=int, default=3,
+                        help='Retries per call on rate limits/server errors (default: 3)')
+    parser.add_argument('--cache-file', type=str, default=CACHE_FILE,
+                        help=f'Translation cache database (default: {CACHE_FILE})')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_MAX_ENTRIES,
+                        help=f'Maximum cached responses (default: {DEFAULT_MAX_ENTRIES})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Call the API for every request')
+    parser.add_argument('--embeddings', action='store_true',
+                        help=f'Also measure embedding cosine distance ({EMBEDDING_MODEL}, '
+                             f'needs sentence-transformers)')
+    args = parser.parse_args()
+
+    print(f"\nStarting experiment with {args.num_sentences} sentences...\n")
+    run_experiment(args.num_sentences, args.concurrency, args.retries,
+                   cache_file=None if args.no_cache else args.cache_file,
+                   cache_size=args.cache_size,
+                   embedding_model=EMBEDDING_MODEL if args.embeddings else None)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,300 @@
+"""
+Batched Similarity Metrics
+Compares all original sentences with their back-translations at once:
+every text becomes a row of one sparse n-gram count matrix, and the
+distance of each pair is computed with a few sparse matrix operations
+instead of a Python loop over characters per pair.
+
+N-gram features are built with NumPy as well: all texts are joined and
+decoded into one array of code points (character n-grams) or token ids
+(word n-grams), and each n-gram is packed into a single integer.
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+# Characters ignored by all metrics (anything that is not a letter, digit
+# or whitespace); the NUL separator of normalize_all is kept
+_NON_ALNUM_RE = re.compile(r'[^\w\s\x00]|_')
+
+# Code points fit in 21 bits, so up to three characters pack into an int64
+_CHAR_BITS = 21
+
+# Feature ids below this are mapped to columns with a lookup table
+# instead of sorting
+_TABLE_LIMIT = 1 << 22
+
+# Sentence-transformers model for the optional embedding metric
+EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+
+# Metric name -> (unit, n-gram sizes) of its count vectors
+NGRAM_METRICS = {
+    # Character frequencies (the original degradation metric)
+    'char_cosine': ('char', (1,)),
+    # Character trigrams
+    'char3_cosine': ('char', (3,)),
+    # Word unigrams and bigrams
+    'word_cosine': ('word', (1, 2)),
+}
+# Set overlap metrics and the count vectors they use
+JACCARD_METRICS = {
+    'char3_jaccard': 'char3_cosine',
+}
+DEFAULT_METRICS = ('char_cosine', 'char3_cosine', 'word_cosine', 'char3_jaccard')
+
+
+def normalize(text: str) -> str:
+    """Lowercase and keep only letters, digits and whitespace"""
+    return _NON_ALNUM_RE.sub('', text.lower()).replace('\x00', '')
+
+
+def normalize_all(texts: Sequence[str]) -> List[str]:
+    """normalize() for many texts with one regex pass over the joined text"""
+    normalized = _NON_ALNUM_RE.sub('', '\x00'.join(texts).lower()).split('\x00')
+    if len(normalized) != len(texts):
+        # Some text contains NUL itself
+        return [normalize(text) for text in texts]
+    return normalized
+
+
+def _columns(features: np.ndarray) -> Tuple[np.ndarray, int]:
+    """Map feature ids to consecutive column indices"""
+    if features.size and features.max() < _TABLE_LIMIT:
+        present = np.zeros(int(features.max()) + 1, dtype=bool)
+        present[features] = True
+        table = np.cumsum(present) - 1
+        return table[features], int(table[-1]) + 1
+    vocabulary = np.unique(features)
+    return np.searchsorted(vocabulary, features), len(vocabulary)
+
+
+def _char_units(texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Normalized code points of all texts concatenated, and the length of
+    each text
+
+    The texts are lowercased and decoded in one go; characters that
+    normalize() drops are filtered with a keep/drop table built once per
+    distinct code point.
+    """
+    joined = '\x00'.join(texts)
+    if joined.count('\x00') != len(texts) - 1:
+        joined = '\x00'.join(text.replace('\x00', '') for text in texts)
+    units = np.frombuffer(joined.lower().encode('utf-32-le'), dtype=np.uint32)
+    if not units.size:
+        return units.astype(np.int64), np.zeros(len(texts), dtype=np.int64)
+
+    separators = units == 0
+    rows = np.cumsum(separators)
+    keep = np.zeros(int(units.max()) + 1, dtype=bool)
+    for code in np.flatnonzero(np.bincount(units)):
+        keep[code] = code > 0 and normalize(chr(code)) != ''
+    mask = keep[units]
+    lengths = np.bincount(rows[mask], minlength=len(texts))
+    return units[mask].astype(np.int64), lengths
+
+
+def _word_units(texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Token ids of all texts concatenated, and the token count of each text"""
+    lengths = np.fromiter(map(len, map(str.split, texts)), dtype=np.int64, count=len(texts))
+    tokens = ' '.join(texts).split()
+    vocabulary = {token: i for i, token in enumerate(dict.fromkeys(tokens))}
+    ids = np.fromiter(map(vocabulary.__getitem__, tokens), dtype=np.int64, count=len(tokens))
+    return ids, lengths
+
+
+def _units(texts: List[str], unit: str) -> Tuple[np.ndarray, np.ndarray, int]:
+    """Units of all texts, units per text, and the n-gram packing base"""
+    if unit == 'char':
+        units, lengths = _char_units(texts)
+        return units, lengths, 1 << _CHAR_BITS
+    if unit == 'word':
+        units, lengths = _word_units(normalize_all(texts))
+        return units, lengths, int(units.max()) + 1 if units.size else 1
+    raise ValueError(f"Unknown unit: {unit}")
+
+
+def _ngram_features(units: np.ndarray, lengths: np.ndarray, n: int,
+                    base: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pack every n-gram that lies inside one text into one integer
+
+    Args:
+        units: Concatenated unit ids (code points or token ids)
+        lengths: Number of units of each text
+        n: N-gram size
+        base: Multiplier per position (larger than every unit id)
+
+    Returns:
+        rows, features: Text index and packed id of each n-gram
+    """
+    rows = np.repeat(np.arange(len(lengths)), lengths)
+    if n == 1:
+        return rows, units
+    ends = np.repeat(np.cumsum(lengths), lengths)
+    start = np.flatnonzero(np.arange(len(units)) + n <= ends)
+    features = np.zeros(len(start), dtype=np.int64)
+    for k in range(n):
+        features = features * base + units[start + k]
+    return rows[start], features
+
+
+def _count_matrix(units: np.ndarray, lengths: np.ndarray, base: int,
+                  sizes: Sequence[int]) -> sparse.csr_matrix:
+    """Sparse n-gram counts, one row per text"""
+    rows, features = [], []
+    for n in sizes:
+        n_rows, n_features = _ngram_features(units, lengths, n, base)
+        rows.append(n_rows)
+        # Keep the ids of different n-gram sizes apart
+        features.append(n_features * len(sizes) + len(features))
+    columns, n_columns = _columns(np.concatenate(features))
+
+    return sparse.csr_matrix(
+        (np.ones(len(columns)), (np.concatenate(rows), columns)),
+        shape=(len(lengths), max(n_columns, 1))
+    )
+
+
+def ngram_matrices(originals: Sequence[str], finals: Sequence[str], unit: str = 'char',
+                   sizes: Sequence[int] = (1,)) -> Tuple[sparse.csr_matrix, sparse.csr_matrix]:
+    """
+    Sparse n-gram count matrices of both sides over one shared vocabulary
+
+    Args:
+        originals: Original sentences
+        finals: Back-translated sentences (same length)
+        unit: 'char' or 'word'
+        sizes: N-gram sizes to count (character n-grams up to 3)
+
+    Returns:
+        (A, B): CSR matrices, row i holds the counts of pair i
+    """
+    if len(originals) != len(finals):
+        raise ValueError("originals and finals must have the same length")
+    if unit == 'char' and max(sizes) > 3:
+        raise ValueError("character n-grams are limited to 3 characters")
+    counts = _count_matrix(*_units(list(originals) + list(finals), unit), sizes)
+    n = len(originals)
+    return counts[:n], counts[n:]
+
+
+def paired_cosine_distances(A: sparse.spmatrix, B: sparse.spmatrix) -> np.ndarray:
+    """
+    1 - cosine similarity of each row pair (A[i], B[i])
+
+    Pairs where either row is all zeros get distance 1.0.
+    """
+    dot = np.asarray(A.multiply(B).sum(axis=1)).ravel()
+    norm_a = np.sqrt(np.asarray(A.multiply(A).sum(axis=1)).ravel())
+    norm_b = np.sqrt(np.asarray(B.multiply(B).sum(axis=1)).ravel())
+    denom = norm_a * norm_b
+    similarity = np.divide(dot, denom, out=np.zeros_like(dot), where=denom > 0)
+    # Rounding can push identical rows slightly past 1
+    return np.where(denom > 0, 1.0 - np.clip(similarity, -1.0, 1.0), 1.0)
+
+
+def paired_jaccard_distances(A: sparse.spmatrix, B: sparse.spmatrix) -> np.ndarray:
+    """
+    1 - |set(A[i]) & set(B[i])| / |set(A[i]) | set(B[i])| for each row pair
+
+    Only which n-grams occur matters, not how often. Two empty rows get 0.0.
+    """
+    A = (A > 0).astype(np.float64)
+    B = (B > 0).astype(np.float64)
+    intersection = np.asarray(A.multiply(B).sum(axis=1)).ravel()
+    union = np.asarray(A.sum(axis=1)).ravel() + np.asarray(B.sum(axis=1)).ravel() - intersection
+    overlap = np.divide(intersection, union, out=np.ones_like(union), where=union > 0)
+    return 1.0 - overlap
+
+
+def embedding_distances(originals: Sequence[str], finals: Sequence[str],
+                        model_name: str = EMBEDDING_MODEL,
+                        batch_size: int = 256) -> np.ndarray:
+    """
+    Cosine distance of sentence embeddings (needs sentence-transformers)
+
+    Both sides are encoded in batches; the embeddings are L2-normalized so
+    the cosine is a row-wise dot product.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_name)
+    emb_a = model.encode(list(originals), batch_size=batch_size, normalize_embeddings=True)
+    emb_b = model.encode(list(finals), batch_size=batch_size, normalize_embeddings=True)
+    similarity = np.einsum('ij,ij->i', emb_a, emb_b)
+    return 1.0 - np.clip(similarity, -1.0, 1.0)
+
+
+def compute_metrics(originals: Sequence[str], finals: Sequence[str],
+                    metrics: Sequence[str] = DEFAULT_METRICS,
+                    embedding_model: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """
+    Degradation metrics for every (original, final) pair
+
+    Args:
+        originals: Original sentences
+        finals: Back-translated sentences (same length)
+        metrics: Names from NGRAM_METRICS and JACCARD_METRICS
+        embedding_model: Also compute 'embedding_cosine' with this
+            sentence-transformers model (skipped with a message if the
+            package is not installed)
+
+    Returns:
+        Dictionary metric name -> array of distances (0 = identical)
+    """
+    if len(originals) != len(finals):
+        raise ValueError("originals and finals must have the same length")
+    texts = list(originals) + list(finals)
+    n = len(originals)
+
+    # Texts are decoded once per unit and counted once per n-gram setting
+    results = {}
+    units = {}
+    matrices = {}
+    for name in metrics:
+        key = JACCARD_METRICS.get(name, name)
+        if key not in NGRAM_METRICS:
+            raise ValueError(f"Unknown metric: {name}")
+
+        if key not in matrices:
+            unit, sizes = NGRAM_METRICS[key]
+            if unit not in units:
+                units[unit] = _units(texts, unit)
+            counts = _count_matrix(*units[unit], sizes)
+            matrices[key] = counts[:n], counts[n:]
+        A, B = matrices[key]
+        if name in JACCARD_METRICS:
+            results[name] = paired_jaccard_distances(A, B)
+        else:
+            results[name] = paired_cosine_distances(A, B)
+
+    if embedding_model:
+        try:
+            results['embedding_cosine'] = embedding_distances(originals, finals, embedding_model)
+        except ImportError:
+            print("sentence-transformers not installed, skipping embedding_cosine")
+
+    return results
+
+
+def summarize(metrics: Dict[str, np.ndarray]) -> Dict[str, Dict[str, float]]:
+    """Average, min and max of every metric (JSON friendly)"""
+    return {
+        name: {
+            'avg': float(values.mean()) if values.size else 0.0,
+            'min': float(values.min()) if values.size else 0.0,
+            'max': float(values.max()) if values.size else 0.0,
+        }
+        for name, values in metrics.items()
+    }
+
+
+def metric_rows(metrics: Dict[str, np.ndarray]) -> List[Dict[str, float]]:
+    """Per-pair dictionaries {metric: distance} in pair order"""
+    names = list(metrics)
+    columns = [metrics[name].tolist() for name in names]
+    return [dict(zip(names, values)) for values in zip(*columns)]
@@ -0,0 +1,186 @@
+"""
+Translation Cache
+Persistent cache of API responses keyed by a hash of (model, prompt
+template, source text), shared by all agents. Least recently used entries
+are evicted once the cache is full, and hits/misses are counted so every
+run can report its hit rate.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+
+# Cache database file (in the experiment directory, ignored by git)
+CACHE_FILE = 'translation_cache.sqlite'
+DEFAULT_MAX_ENTRIES = 100_000
+
+
+def cache_key(model: str, prompt: str, text: str) -> str:
+    """Content address of one request: SHA-256 of model, prompt template and text"""
+    payload = json.dumps([model, prompt, text], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class TranslationCache:
+    """SQLite LRU cache of translations, safe to share between threads"""
+
+    def __init__(self, path: str = CACHE_FILE, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            path: SQLite file (':memory:' for a cache that lives only this run)
+            max_entries: Entries kept before the least recently used are evicted
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Future] = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS translations (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    result TEXT NOT NULL,
+                    last_used INTEGER NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS translations_lru ON translations (last_used)"
+            )
+            row = self._conn.execute("SELECT MAX(last_used) FROM translations").fetchone()
+        # Monotonic use counter; a higher value means more recently used
+        self._clock = row[0] or 0
+
+    def get(self, model: str, prompt: str, text: str) -> Optional[str]:
+        """Cached result or None (a hit marks the entry as recently used)"""
+        key = cache_key(model, prompt, text)
+        with self._lock:
+            result = self._lookup(key)
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return result
+
+    def put(self, model: str, prompt: str, text: str, result: str):
+        """Store a result, evicting least recently used entries if full"""
+        with self._lock:
+            self._store(cache_key(model, prompt, text), model, result)
+
+    def get_or_compute(self, model: str, prompt: str, text: str,
+                       compute: Callable[[], str]) -> str:
+        """
+        Return the cached result or call compute() and cache what it returns.
+
+        Concurrent requests for the same key wait for the first one instead
+        of calling the API again; they count as hits. Errors raised by
+        compute() are not cached and reach every waiting caller.
+        """
+        key = cache_key(model, prompt, text)
+        with self._lock:
+            result = self._lookup(key)
+            if result is not None:
+                self.hits += 1
+                return result
+            pending = self._pending.get(key)
+            if pending is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+                future = self._pending[key] = Future()
+
+        if pending is not None:
+            return pending.result()
+
+        try:
+            result = compute()
+        except Exception as e:
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._store(key, model, result)
+            del self._pending[key]
+        future.set_result(result)
+        return result
+
+    def _lookup(self, key: str) -> Optional[str]:
+        """Find an entry and refresh its LRU position (lock held)"""
+        row = self._conn.execute(
+            "SELECT result FROM translations WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._clock += 1
+        with self._conn:
+            self._conn.execute(
+                "UPDATE translations SET last_used = ? WHERE key = ?", (self._clock, key)
+            )
+        return row[0]
+
+    def _store(self, key: str, model: str, result: str):
+        """Insert an entry and evict the least recently used ones (lock held)"""
+        self._clock += 1
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO translations (key, model, result, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                (key, model, result, self._clock)
+            )
+            excess = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM translations WHERE key IN "
+                    "(SELECT key FROM translations ORDER BY last_used LIMIT ?)",
+                    (excess,)
+                )
+                self.evictions += excess
+
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered without an API call"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict:
+        """Hit/miss counters of this run (JSON friendly)"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate(),
+            'evictions': self.evictions,
+            'entries': len(self)
+        }
+
+    def print_stats(self):
+        """Print the hit rate of this run"""
+        stats = self.stats()
+        print(f"Translation cache: {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['hit_rate']:.1%} hit rate), {stats['evictions']} evicted, "
+              f"{stats['entries']} entries in {self.path}")
+
+    def clear(self):
+        """Remove all cached translations"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM translations")
+
+    def __len__(self) -> int:
+        """Number of cached translations"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
@@ -7,12 +7,18 @@ Usage: python main.py
 Output: kmeans_analysis.png, knn_results.png (in current directory)
 """
 
+import sys
+from pathlib import Path
 import numpy as np
 import matplotlib.pyplot as plt
-from gensim.models import Word2Vec
 import seaborn as sns
 from collections import Counter
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.kmeans import KMeansEngine
+from common.embeddings import EmbeddingService
+from common import label_matching
+
 plt.style.use('seaborn-v0_8-darkgrid')
 sns.set_palette("husl")
 
@@ -39,22 +45,10 @@ class KMeans:
         self.cluster_centers_ = None
 
     def fit_predict(self, X):
-        rng = np.random.RandomState(self.random_state)
-        best_inertia, best_centers, best_labels = np.inf, None, None
-        for _ in range(self.n_init):
-            centers = X[rng.choice(X.shape[0], self.n_clusters, replace=False)].copy()
-            for _ in range(self.max_iter):
-                distances = np.array([np.linalg.norm(X - centers[i], axis=1) for i in range(self.n_clusters)]).T
-                labels = np.argmin(distances, axis=1)
-                new_centers = np.array([X[labels == i].mean(axis=0) if np.any(labels == i) else centers[i] 
-                                       for i in range(self.n_clusters)])
-                if np.allclose(centers, new_centers): break
-                centers = new_centers
-            inertia = sum(np.sum((X[labels == i] - centers[i]) ** 2) for i in range(self.n_clusters) if np.any(labels == i))
-            if inertia < best_inertia:
-                best_inertia, best_centers, best_labels = inertia, centers, labels
-        self.cluster_centers_ = best_centers
-        return best_labels
+        # Shared engine: k-means++ init, GEMM distances, best of n_init runs
+        engine = KMeansEngine(n_clusters=self.n_clusters, max_iter=self.max_iter, n_init=self.n_init, random_state=self.random_state).fit(X)
+        self.cluster_centers_ = engine.cluster_centers_
+        return engine.labels_
 
 class KNN:
     def __init__(self, n_neighbors=3):
@@ -66,17 +60,20 @@ class KNN:
         return np.array([Counter(self.y_train[np.argsort(np.linalg.norm(self.X_train - x, axis=1))[:self.n_neighbors]]).most_common(1)[0][0] for x in X])
 
 def train_word2vec(sentences):
-    return Word2Vec([s.lower().split() for s in sentences], vector_size=50, window=5, min_count=1, workers=4, epochs=100)
+    # Shared service: the trained model is stored and reloaded (memory-mapped) on later runs
+    return EmbeddingService(vector_size=50, window=5, min_count=1, workers=4, epochs=100).fit(sentences)
 
 def sentences_to_vectors(sentences, model):
-    return np.array([np.mean([model.wv[w] for w in s.lower().split() if w in model.wv], axis=0) if any(w in model.wv for w in s.lower().split()) else np.zeros(model.wv.vector_size) for s in sentences])
+    # Mean word vectors for the whole batch at once, cached by sentence text
+    return model.embed(sentences)
 
 def confusion_matrix(y_true, y_pred, n=3):
-    m = np.zeros((n, n), dtype=int)
-    for t, p in zip(y_true, y_pred): m[t][p] += 1
-    return m
+    return label_matching.confusion_matrix(y_true, y_pred, n, n)
 
-def find_mapping(conf_mat):
+def find_mapping(conf_mat, method="greedy"):
+    # "greedy": row by row (the reported results); "hungarian": optimal assignment
+    if method == "hungarian":
+        return label_matching.match_labels(conf_mat)
     used, mapping = set(), {}
     for i in range(len(conf_mat)):
         avail = [j for j in range(len(conf_mat)) if j not in used]
@@ -126,7 +123,7 @@ def main():
     
     print("\n" + "="*70 + "\nSTEP 1: WORD2VEC\n" + "="*70)
     model = train_word2vec(SENTENCES)
-    print(f"✅ Trained! Vocab: {len(model.wv)} words")
+    print(f"✅ {'Loaded cached model' if model.loaded_from_cache else 'Trained'}! Vocab: {len(model.wv)} words")
     vectors = normalize(sentences_to_vectors(SENTENCES, model))
     print("✅ Vectorized and normalized")
     
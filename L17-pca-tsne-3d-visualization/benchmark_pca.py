@@ -0,0 +1,104 @@
+"""
+PCA Solver Benchmark
+
+Compares the solvers of PCA_FromScratch and IncrementalPCA_FromScratch
+with the original implementation (full covariance matrix + np.linalg.eig)
+on embedding-like matrices:
+runtime, peak memory (tracemalloc) and how much of the exact top-k
+variance each solver recovers.
+
+Usage:
+  python benchmark_pca.py                          # 100k × 300, 3 components
+  python benchmark_pca.py --samples 20000 --features 1000 --components 10
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from main import IncrementalPCA_FromScratch, PCA_FromScratch
+
+
+def legacy_pca(X, n_components):
+    """Original PCA_FromScratch.fit + transform (eig, full sort, centered copy)"""
+    mean = np.mean(X, axis=0)
+    X_centered = X - mean
+    cov_matrix = (X_centered.T @ X_centered) / (X.shape[0] - 1)
+    eigenvalues, eigenvectors = np.linalg.eig(cov_matrix)
+    idx = eigenvalues.argsort()[::-1]
+    eigenvalues = eigenvalues[idx][:n_components]
+    components = eigenvectors[:, idx][:, :n_components]
+    return eigenvalues.real, components.real, X_centered @ components.real
+
+
+def embedding_matrix(n_samples, n_features, seed=0):
+    """
+    Random matrix with a slowly decaying spectrum and a common offset,
+    like averaged word vectors
+    """
+    rng = np.random.default_rng(seed)
+    rank = min(50, n_features)
+    scales = 1.0 / np.arange(1, rank + 1) ** 0.5
+    X = (rng.standard_normal((n_samples, rank)) * scales) @ rng.standard_normal((rank, n_features))
+    X += 0.05 * rng.standard_normal((n_samples, n_features))
+    X += rng.standard_normal(n_features)
+    return X
+
+
+def measure(run, repeat):
+    """Best runtime over `repeat` runs and peak traced memory of one run"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark PCA_FromScratch solvers')
+    parser.add_argument('--samples', type=int, default=100_000,
+                        help='Rows of the embedding matrix (default: 100000)')
+    parser.add_argument('--features', type=int, default=300,
+                        help='Embedding dimensions (default: 300)')
+    parser.add_argument('--components', type=int, default=3,
+                        help='Components to keep (default: 3)')
+    parser.add_argument('--batch-size', type=int, default=10000,
+                        help='Rows per batch of the incremental PCA (default: 10000)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Timed runs per solver (default: 3)')
+    args = parser.parse_args()
+
+    X = embedding_matrix(args.samples, args.features)
+    k = args.components
+    print(f"Data: {X.shape[0]} × {X.shape[1]} float64 ({X.nbytes / 2**20:.0f} MB), "
+          f"{k} components, auto → "
+          f"{PCA_FromScratch(k)._choose_solver(*X.shape)}")
+
+    rows = [('legacy (eig)', lambda: legacy_pca(X, k)[0])]
+    for solver in ('eigh', 'svd', 'randomized'):
+        pca = PCA_FromScratch(k, solver=solver)
+        rows.append((solver, lambda pca=pca: pca.fit_transform(X) is not None and pca.eigenvalues))
+    pca = IncrementalPCA_FromScratch(k, batch_size=args.batch_size)
+    rows.append(('incremental', lambda: pca.fit_transform(X) is not None and pca.eigenvalues))
+
+    reference = None
+    print(f"\n  {'solver':<14}{'time':>10}{'peak memory':>14}{'variance found':>17}")
+    for name, run in rows:
+        seconds, peak, eigenvalues = measure(run, args.repeat)
+        if reference is None:
+            reference = np.sum(eigenvalues)
+        print(f"  {name:<14}{seconds:>9.3f}s{peak / 2**20:>11.1f} MB"
+              f"{np.sum(eigenvalues) / reference * 100:>16.4f}%")
+
+
+if __name__ == "__main__":
+    main()
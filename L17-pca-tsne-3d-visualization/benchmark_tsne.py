@@ -0,0 +1,112 @@
+"""
+T-SNE Benchmark
+
+Times PCA_FromScratch against TSNE_FromScratch (exact and Barnes-Hut)
+on clustered 50-dimensional vectors, like sentence embeddings of a few
+topics, for N = 1k ... 100k points.
+
+The one-off steps (kNN graph + P) are timed in full. Gradient descent
+is timed over the first --iterations iterations and projected to
+--max-iter (1000, the usual number), so large N finishes in minutes.
+Data and initialization are seeded, so runs are reproducible.
+
+Usage:
+  python benchmark_tsne.py                              # N = 1k, 5k, 10k, 50k, 100k
+  python benchmark_tsne.py --sizes 1000 2000 --iterations 1000
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from main import PCA_FromScratch, TSNE_FromScratch
+
+
+def clustered_vectors(n_samples, n_features=50, n_clusters=10, seed=0):
+    """Gaussian clusters around random centers (seeded)"""
+    rng = np.random.default_rng(seed)
+    centers = 3.0 * rng.standard_normal((n_clusters, n_features))
+    labels = rng.integers(0, n_clusters, n_samples)
+    return centers[labels] + rng.standard_normal((n_samples, n_features))
+
+
+def time_pca(X):
+    """Seconds for PCA to 3D"""
+    start = time.perf_counter()
+    PCA_FromScratch(n_components=3).fit_transform(X)
+    return time.perf_counter() - start
+
+
+def time_tsne(X, method, args):
+    """
+    (setup seconds, seconds per iteration) of one TSNE_FromScratch run
+    with args.iterations iterations
+    """
+    tsne = TSNE_FromScratch(
+        n_components=3,
+        perplexity=args.perplexity,
+        method=method,
+        max_iter=args.iterations,
+        random_state=args.seed,
+    )
+    tsne.fit_transform(X)
+    setup = tsne.timings_['neighbors'] + tsne.timings_['affinities']
+    return setup, tsne.timings_['optimize'] / tsne.n_iter_
+
+
+def format_seconds(seconds):
+    """Short duration: ms below one second, minutes above 100 s"""
+    if seconds is None:
+        return '—'
+    if seconds < 1:
+        return f"{seconds * 1000:.0f} ms"
+    if seconds < 100:
+        return f"{seconds:.1f} s"
+    return f"{seconds / 60:.1f} min"
+
+
+def main():
+    """Run the benchmark and print a Markdown table."""
+    parser = argparse.ArgumentParser(description='Benchmark PCA vs from-scratch T-SNE')
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[1000, 5000, 10000, 50000, 100000],
+                        help='Numbers of points (default: 1k 5k 10k 50k 100k)')
+    parser.add_argument('--features', type=int, default=50,
+                        help='Vector dimensions (default: 50)')
+    parser.add_argument('--perplexity', type=float, default=30.0,
+                        help='T-SNE perplexity (default: 30)')
+    parser.add_argument('--iterations', type=int, default=50,
+                        help='Gradient descent iterations timed (default: 50)')
+    parser.add_argument('--max-iter', type=int, default=1000,
+                        help='Iterations of a full run, for the projection (default: 1000)')
+    parser.add_argument('--exact-max', type=int, default=10000,
+                        help='Largest N for the exact O(N²) method (default: 10000)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed of the data and the embedding (default: 0)')
+    args = parser.parse_args()
+
+    print(f"NumPy {np.__version__}, {os.cpu_count()} CPU(s), {args.features} dimensions, "
+          f"perplexity {args.perplexity:g}, {args.iterations} timed iterations "
+          f"→ projected to {args.max_iter}\n")
+    print("| N | PCA | kNN + P | exact / iter | Barnes-Hut / iter "
+          "| exact total | Barnes-Hut total | Barnes-Hut vs PCA |")
+    print("|---|---|---|---|---|---|---|---|")
+
+    for n in args.sizes:
+        X = clustered_vectors(n, args.features, seed=args.seed)
+        pca_time = time_pca(X)
+        setup, bh_iter = time_tsne(X, 'barnes_hut', args)
+        exact_iter = time_tsne(X, 'exact', args)[1] if n <= args.exact_max else None
+
+        bh_total = setup + bh_iter * args.max_iter
+        exact_total = setup + exact_iter * args.max_iter if exact_iter is not None else None
+        print(f"| {n:,} | {format_seconds(pca_time)} | {format_seconds(setup)} "
+              f"| {format_seconds(exact_iter)} | {format_seconds(bh_iter)} "
+              f"| {format_seconds(exact_total)} | {format_seconds(bh_total)} "
+              f"| {bh_total / pca_time:,.0f}x slower |", flush=True)
+
+
+if __name__ == "__main__":
+    main()
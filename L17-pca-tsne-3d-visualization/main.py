@@ -3,7 +3,7 @@ Assignment 17: 3D Visualization of Sentences using PCA and T-SNE
 
 Demonstrates:
 1. PCA implementation from scratch (NumPy only!)
-2. T-SNE using sklearn
+2. T-SNE using sklearn (and from scratch: exact / Barnes-Hut)
 3. Time measurement for both algorithms
 4. 3D visualization of high-dimensional sentence vectors
 
@@ -11,14 +11,19 @@ Author: Anna
 Course: AI Developer Course
 """
 
+import sys
+from pathlib import Path
 import numpy as np
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
-from gensim.models import Word2Vec
 from sklearn.manifold import TSNE
 import time
 import seaborn as sns
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.embeddings import EmbeddingService
+from common.kmeans import KMeansEngine, gemm_squared_distances
+
 # Set style
 plt.style.use('seaborn-v0_8-darkgrid')
 sns.set_palette("husl")
@@ -66,14 +71,119 @@ class PCA_FromScratch:
     3. Find eigenvalues and eigenvectors
     4. Sort by eigenvalues (largest first)
     5. Project data onto top components
+    
+    Solvers (steps 2-4):
+    - 'eigh':       covariance matrix (d×d) + symmetric eigendecomposition
+    - 'svd':        thin SVD of the centered data (no covariance matrix)
+    - 'randomized': randomized range finder + SVD of a small (k+p)×d
+                    matrix, for n_components << d
+    - 'auto':       picked from the data shape (see _choose_solver)
     """
     
-    def __init__(self, n_components=3):
+    SOLVERS = ('auto', 'eigh', 'svd', 'randomized')
+    
+    # Up to this many features, one pass for the d×d covariance matrix
+    # plus eigh beats the repeated passes of the randomized solver
+    EIGH_MAX_FEATURES = 1000
+    
+    def __init__(self, n_components=3, solver='auto', n_oversamples=10,
+                 n_power_iter=4, chunk_size=2048, random_state=42):
+        """
+        Args:
+            n_components: Number of components to keep
+            solver: 'auto', 'eigh', 'svd' or 'randomized'
+            n_oversamples: Extra random directions of the randomized solver
+            n_power_iter: Power iterations of the randomized solver
+            chunk_size: Rows centered at a time (no full centered copy of X
+                for 'eigh' and 'randomized')
+            random_state: Seed of the randomized solver
+        """
+        if solver not in self.SOLVERS:
+            raise ValueError(f"solver must be one of {self.SOLVERS}, got {solver!r}")
         self.n_components = n_components
+        self.solver = solver
+        self.n_oversamples = n_oversamples
+        self.n_power_iter = n_power_iter
+        self.chunk_size = chunk_size
+        self.random_state = random_state
         self.mean = None
         self.components = None
         self.eigenvalues = None
+        self.solver_ = None
+        
+    def _choose_solver(self, n_samples, n_features):
+        """
+        Pick a solver from the data shape
+        
+        - d <= n and d <= EIGH_MAX_FEATURES: 'eigh' (one pass over X,
+          small d×d eigenproblem)
+        - n_components well below min(n, d) on larger data: 'randomized'
+          (cost grows with n·d·k instead of n·d² and memory stays small)
+        - Otherwise: 'eigh' when d <= n, else 'svd' on the smaller side
+        """
+        if self.solver != 'auto':
+            return self.solver
+        if n_features <= min(n_samples, self.EIGH_MAX_FEATURES):
+            return 'eigh'
+        small = min(n_samples, n_features)
+        if max(n_samples, n_features) > 500 and self.n_components < 0.1 * small:
+            return 'randomized'
+        return 'eigh' if n_features <= n_samples else 'svd'
+    
+    def _chunks(self, n_samples):
+        """Row slices of at most chunk_size rows"""
+        for start in range(0, n_samples, self.chunk_size):
+            yield slice(start, min(start + self.chunk_size, n_samples))
+    
+    def _fit_eigh(self, X):
+        """Covariance matrix accumulated chunk by chunk, then eigh"""
+        n_samples, n_features = X.shape
+        cov_matrix = np.zeros((n_features, n_features))
+        for rows in self._chunks(n_samples):
+            chunk = X[rows] - self.mean
+            cov_matrix += chunk.T @ chunk
+        cov_matrix /= n_samples - 1
+        
+        # Symmetric matrix: real eigenvalues in ascending order
+        eigenvalues, eigenvectors = np.linalg.eigh(cov_matrix)
+        k = self.n_components
+        return eigenvalues[::-1][:k], eigenvectors[:, ::-1][:, :k]
+    
+    def _fit_svd(self, X):
+        """Thin SVD of the centered data: Xc = U S Vt, eigenvalues = S²/(n-1)"""
+        X_centered = X - self.mean
+        _, singular_values, Vt = np.linalg.svd(X_centered, full_matrices=False)
+        k = self.n_components
+        return singular_values[:k] ** 2 / (X.shape[0] - 1), Vt[:k].T
+    
+    def _fit_randomized(self, X):
+        """
+        Randomized SVD (Halko et al.) of the implicitly centered data
+        
+        Xc @ M is computed as X @ M - mean @ M, so X is never copied.
+        """
+        n_samples, n_features = X.shape
+        k = self.n_components
+        n_random = min(k + self.n_oversamples, n_samples, n_features)
+        rng = np.random.default_rng(self.random_state)
+        
+        def centered_dot(M):          # Xc @ M
+            return X @ M - self.mean @ M
+        
+        def centered_t_dot(Q):        # Xc.T @ Q
+            return X.T @ Q - np.outer(self.mean, Q.sum(axis=0))
         
+        # Range finder with power iterations (QR keeps columns independent)
+        Q, _ = np.linalg.qr(centered_dot(rng.standard_normal((n_features, n_random))))
+        for _ in range(self.n_power_iter):
+            Z, _ = np.linalg.qr(centered_t_dot(Q))
+            Q, _ = np.linalg.qr(centered_dot(Z))
+        
+        # SVD of the small projected matrix B = Q.T @ Xc
+        B = centered_t_dot(Q).T
+        _, singular_values, Vt = np.linalg.svd(B, full_matrices=False)
+        return singular_values[:k] ** 2 / (n_samples - 1), Vt[:k].T
+    
     def fit(self, X):
         """
         Fit PCA model
@@ -81,41 +191,56 @@ class PCA_FromScratch:
         Args:
             X: Data matrix (n_samples, n_features)
         """
-        # Step 1: Center the data
-        self.mean = np.mean(X, axis=0)
-        X_centered = X - self.mean
+        X = np.asarray(X, dtype=np.float64)
+        n_samples, n_features = X.shape
+        if not 1 <= self.n_components <= min(n_samples, n_features):
+            raise ValueError(f"n_components must be between 1 and {min(n_samples, n_features)}")
         
-        # Step 2: Compute covariance matrix
-        # Cov = (X^T * X) / (n-1)
-        n_samples = X.shape[0]
-        cov_matrix = (X_centered.T @ X_centered) / (n_samples - 1)
+        # Step 1: Mean (centering happens inside the solvers)
+        self.mean = np.mean(X, axis=0)
         
-        # Step 3: Compute eigenvalues and eigenvectors
-        eigenvalues, eigenvectors = np.linalg.eig(cov_matrix)
+        # Steps 2-4: Top eigenvalues/eigenvectors of the covariance matrix
+        self.solver_ = self._choose_solver(n_samples, n_features)
+        fit_solver = {
+            'eigh': self._fit_eigh,
+            'svd': self._fit_svd,
+            'randomized': self._fit_randomized,
+        }[self.solver_]
+        eigenvalues, eigenvectors = fit_solver(X)
         
-        # Step 4: Sort by eigenvalues (descending)
-        idx = eigenvalues.argsort()[::-1]
-        eigenvalues = eigenvalues[idx]
-        eigenvectors = eigenvectors[:, idx]
+        # Deterministic signs: largest loading of each component is positive
+        signs = np.sign(eigenvectors[np.abs(eigenvectors).argmax(axis=0), range(eigenvectors.shape[1])])
+        signs[signs == 0] = 1
         
-        # Step 5: Keep top n_components
-        self.eigenvalues = eigenvalues[:self.n_components]
-        self.components = eigenvectors[:, :self.n_components]
+        # Step 5 uses the kept components
+        self.eigenvalues = eigenvalues
+        self.components = eigenvectors * signs
         
         return self
     
-    def transform(self, X):
+    def transform(self, X, out=None):
         """
         Project data onto principal components
         
+        Works chunk by chunk, so X can be a memory-mapped array larger
+        than RAM (only chunk_size rows are read and converted at a time).
+        
         Args:
             X: Data matrix (n_samples, n_features)
+            out: Optional array (n_samples, n_components) to write into,
+                e.g. a memory-mapped .npy file
             
         Returns:
             Transformed data (n_samples, n_components)
         """
-        X_centered = X - self.mean
-        return X_centered @ self.components
+        n_samples = X.shape[0]
+        if out is None:
+            out = np.empty((n_samples, self.components.shape[1]))
+        # (X - mean) @ W == X @ W - mean @ W, without a centered copy of X
+        offset = self.mean @ self.components
+        for rows in self._chunks(n_samples):
+            out[rows] = np.asarray(X[rows], dtype=np.float64) @ self.components - offset
+        return out
     
     def fit_transform(self, X):
         """Fit and transform in one step"""
@@ -127,34 +252,620 @@ class PCA_FromScratch:
         total_variance = np.sum(self.eigenvalues)
         return self.eigenvalues / total_variance
 
+
+class IncrementalPCA_FromScratch(PCA_FromScratch):
+    """
+    PCA that learns from one batch of rows at a time (NumPy only)
+    
+    For embedding sets that don't fit in memory: partial_fit(batch) updates
+    the mean and a low-rank basis, so only one batch is ever loaded.
+    
+    Update per batch (Ross et al., incremental SVD):
+    1. Center the batch with its own mean
+    2. Stack: current basis scaled by its singular values,
+              centered batch,
+              one row correcting for the shift of the mean
+    3. Thin SVD of the stacked matrix → new singular values and basis
+    4. Keep the top n_components + n_oversamples directions
+    
+    The extra directions make the top components close to exact PCA;
+    transform() is inherited and also works chunk by chunk.
+    """
+    
+    def __init__(self, n_components=3, batch_size=10000, n_oversamples=10,
+                 chunk_size=2048):
+        """
+        Args:
+            n_components: Number of components to keep
+            batch_size: Rows per partial_fit call in fit()
+            n_oversamples: Extra directions kept between batches
+            chunk_size: Rows projected at a time in transform()
+        """
+        super().__init__(n_components, n_oversamples=n_oversamples, chunk_size=chunk_size)
+        self.batch_size = batch_size
+        self.solver_ = 'incremental'
+        self.n_samples_seen = 0
+        self.singular_values = None
+        self.basis = None          # (n_kept, n_features), rows = directions
+    
+    def partial_fit(self, X):
+        """
+        Update the model with one batch of rows
+        
+        Args:
+            X: Batch (n_batch, n_features); the first batch needs at
+                least n_components rows
+        """
+        X = np.asarray(X, dtype=np.float64)
+        n_batch, n_features = X.shape
+        if n_batch == 0:
+            return self
+        if self.n_samples_seen == 0 and n_batch < self.n_components:
+            raise ValueError(f"First batch needs at least n_components={self.n_components} rows")
+        if self.mean is not None and n_features != self.mean.shape[0]:
+            raise ValueError(f"Expected {self.mean.shape[0]} features, got {n_features}")
+        
+        # Step 1: Batch mean and the updated overall mean
+        n_seen = self.n_samples_seen
+        n_total = n_seen + n_batch
+        batch_mean = X.mean(axis=0)
+        
+        # Step 2: Old basis + centered batch + mean correction row
+        if n_seen == 0:
+            self.mean = batch_mean
+            stacked = X - batch_mean
+        else:
+            correction = np.sqrt(n_seen * n_batch / n_total) * (self.mean - batch_mean)
+            stacked = np.vstack([
+                self.singular_values[:, None] * self.basis,
+                X - batch_mean,
+                correction
+            ])
+            self.mean = self.mean + (batch_mean - self.mean) * (n_batch / n_total)
+        
+        # Step 3: Thin SVD of the small stacked matrix
+        _, singular_values, Vt = np.linalg.svd(stacked, full_matrices=False)
+        
+        # Step 4: Keep the leading directions
+        n_kept = min(self.n_components + self.n_oversamples, len(singular_values))
+        self.singular_values = singular_values[:n_kept]
+        self.basis = Vt[:n_kept]
+        self.n_samples_seen = n_total
+        
+        # Public attributes like PCA_FromScratch (same sign convention)
+        components = self.basis[:self.n_components].T
+        signs = np.sign(components[np.abs(components).argmax(axis=0), range(components.shape[1])])
+        signs[signs == 0] = 1
+        self.components = components * signs
+        self.eigenvalues = self.singular_values[:self.n_components] ** 2 / max(n_total - 1, 1)
+        return self
+    
+    def fit(self, X):
+        """
+        Fit from scratch, reading X in batches of batch_size rows
+        
+        Args:
+            X: Data matrix (n_samples, n_features), e.g. the result of
+                load_vectors() (a memory-mapped .npy file)
+        """
+        n_samples = X.shape[0]
+        if not 1 <= self.n_components <= min(n_samples, X.shape[1]):
+            raise ValueError(f"n_components must be between 1 and {min(n_samples, X.shape[1])}")
+        self.n_samples_seen = 0
+        self.mean = None
+        
+        # Batches of at least n_components rows (last one absorbs the tail)
+        batch_size = max(self.batch_size, self.n_components)
+        starts = list(range(0, n_samples, batch_size))
+        if len(starts) > 1 and n_samples - starts[-1] < self.n_components:
+            starts.pop()
+        for start, end in zip(starts, starts[1:] + [n_samples]):
+            self.partial_fit(X[start:end])
+        return self
+
+# ============================================================================
+# T-SNE IMPLEMENTATION FROM SCRATCH (NumPy only!)
+# ============================================================================
+
+class TSNE_FromScratch:
+    """
+    T-SNE implementation using only NumPy
+    
+    Steps:
+    1. Find the nearest neighbors of every point (kNN graph)
+    2. Turn neighbor distances into probabilities P (binary search for
+       each point's Gaussian width so its perplexity matches)
+    3. Initialize the low-dimensional points (PCA or random)
+    4. Gradient descent on KL(P || Q), Q = Student-t similarities:
+       - attraction only along the kNN edges (sparse, cheap)
+       - repulsion between all pairs of points
+    
+    Methods (repulsion in step 4):
+    - 'exact':      every pair, in row blocks - O(N²) per iteration
+    - 'barnes_hut': groups of far-away points are summarized by their
+                    octree cell (3D; quadtree in 2D) - O(N log N)
+    
+    P is sparse in both methods: only the 3·perplexity nearest neighbors of
+    each point get a probability, so no N×N matrix is ever built.
+    """
+    
+    METHODS = ('exact', 'barnes_hut')
+    NEIGHBORS = ('auto', 'exact', 'approx')
+    
+    # Up to this many points, neighbors='auto' finds the exact kNN by
+    # brute force; above it, an inverted-file (k-means lists) search
+    EXACT_KNN_MAX = 10000
+    
+    # Distance matrix entries computed at a time (~128 MB of float64)
+    BLOCK_ELEMENTS = 1 << 24
+    
+    # Deepest octree level (cells this small hold near-duplicate points)
+    MAX_TREE_DEPTH = 20
+    
+    def __init__(self, n_components=3, perplexity=30.0, method='barnes_hut',
+                 angle=0.5, init='pca', learning_rate='auto', max_iter=1000,
+                 early_exaggeration=12.0, exaggeration_iter=250,
+                 neighbors='auto', n_probe=4, min_grad_norm=1e-7,
+                 chunk_size=2048, random_state=42, verbose=False):
+        """
+        Args:
+            n_components: Output dimensions (2 or 3 for 'barnes_hut')
+            perplexity: Effective number of neighbors (must be < n_samples)
+            method: 'exact' or 'barnes_hut'
+            angle: Barnes-Hut accuracy: a cell is summarized when
+                cell width / distance < angle (0 = exact)
+            init: 'pca' or 'random'
+            learning_rate: Step size, or 'auto' (max(N / early_exaggeration / 4, 50))
+            max_iter: Gradient descent iterations
+            early_exaggeration: Factor on P during the first iterations
+            exaggeration_iter: Iterations with early exaggeration
+            neighbors: kNN search - 'exact', 'approx' or 'auto'
+            n_probe: Nearest k-means lists searched per point ('approx')
+            min_grad_norm: Stop when the gradient norm falls below this
+            chunk_size: Points per Barnes-Hut traversal batch
+            random_state: Seed (initialization, k-means lists)
+            verbose: Print the KL divergence every 50 iterations
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"method must be one of {self.METHODS}, got {method!r}")
+        if neighbors not in self.NEIGHBORS:
+            raise ValueError(f"neighbors must be one of {self.NEIGHBORS}, got {neighbors!r}")
+        if init not in ('pca', 'random'):
+            raise ValueError(f"init must be 'pca' or 'random', got {init!r}")
+        if method == 'barnes_hut' and n_components not in (2, 3):
+            raise ValueError("'barnes_hut' supports 2 or 3 components (use method='exact')")
+        self.n_components = n_components
+        self.perplexity = perplexity
+        self.method = method
+        self.angle = angle
+        self.init = init
+        self.learning_rate = learning_rate
+        self.max_iter = max_iter
+        self.early_exaggeration = early_exaggeration
+        self.exaggeration_iter = exaggeration_iter
+        self.neighbors = neighbors
+        self.n_probe = n_probe
+        self.min_grad_norm = min_grad_norm
+        self.chunk_size = chunk_size
+        self.random_state = random_state
+        self.verbose = verbose
+        self.embedding_ = None
+        self.kl_divergence_ = None
+        self.n_iter_ = 0
+        self.timings_ = {}
+    
+    # ------------------------------------------------------------------
+    # Steps 1-2: kNN graph and joint probabilities
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def _smallest(distances, k):
+        """Column indices and values of the k smallest entries per row, sorted"""
+        part = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        values = np.take_along_axis(distances, part, axis=1)
+        order = np.argsort(values, axis=1)
+        return np.take_along_axis(part, order, axis=1), np.take_along_axis(values, order, axis=1)
+    
+    def _knn_exact(self, X, k):
+        """Brute-force kNN, a block of rows at a time"""
+        n_samples = X.shape[0]
+        sq = np.einsum('ij,ij->i', X, X)
+        indices = np.empty((n_samples, k), dtype=np.intp)
+        distances = np.empty((n_samples, k))
+        block = max(1, self.BLOCK_ELEMENTS // n_samples)
+        for start in range(0, n_samples, block):
+            stop = min(start + block, n_samples)
+            D = gemm_squared_distances(X[start:stop], X, sq[start:stop])
+            D[np.arange(stop - start), np.arange(start, stop)] = np.inf   # not its own neighbor
+            indices[start:stop], distances[start:stop] = self._smallest(D, k)
+        return indices, distances
+    
+    def _knn_approx(self, X, k):
+        """
+        Approximate kNN with an inverted file
+        
+        The points are split into ~√N k-means lists. Each point is only
+        compared with the points of the n_probe lists whose centers are
+        closest to it; the points of one list are searched together, over
+        the union of the lists they probe.
+        """
+        n_samples = X.shape[0]
+        n_lists = max(1, int(np.sqrt(n_samples)))
+        kmeans = KMeansEngine(n_clusters=n_lists, max_iter=10, random_state=self.random_state)
+        labels = kmeans.fit_predict(X)
+        centers = kmeans.cluster_centers_
+        
+        members = np.argsort(labels, kind='stable')
+        sizes = np.bincount(labels, minlength=n_lists)
+        bounds = np.concatenate([[0], np.cumsum(sizes)])
+        n_probe = min(self.n_probe, n_lists)
+        nearest_lists = np.argpartition(gemm_squared_distances(X, centers), n_probe - 1, axis=1)[:, :n_probe]
+        
+        sq = np.einsum('ij,ij->i', X, X)
+        indices = np.empty((n_samples, k), dtype=np.intp)
+        distances = np.empty((n_samples, k))
+        for c in np.flatnonzero(sizes):
+            queries = members[bounds[c]:bounds[c + 1]]
+            probe = np.unique(nearest_lists[queries])
+            if sizes[probe].sum() <= k:
+                # Too few candidates: add the lists closest to this one
+                order = np.argsort(gemm_squared_distances(centers[c:c + 1], centers)[0])
+                n_needed = np.searchsorted(np.cumsum(sizes[order]), k + 1) + 1
+                probe = np.union1d(probe, order[:n_needed])
+            candidates = np.concatenate([members[bounds[l]:bounds[l + 1]] for l in probe])
+            
+            D = gemm_squared_distances(X[queries], X[candidates], sq[queries])
+            D[queries[:, None] == candidates[None, :]] = np.inf
+            nearest, distances[queries] = self._smallest(D, k)
+            indices[queries] = candidates[nearest]
+        return indices, distances
+    
+    def _conditional_probabilities(self, sq_distances, tol=1e-5, max_steps=100):
+        """
+        p(j|i) over each point's neighbors, all points at once
+        
+        Bisection on beta = 1 / (2σ²) per row until the entropy of the row
+        equals log(perplexity).
+        """
+        # Shifting by the nearest distance keeps exp() from underflowing
+        # (the entropy and the normalized row don't change)
+        d = sq_distances - sq_distances[:, :1]
+        target = np.log(self.perplexity)
+        n_samples = d.shape[0]
+        beta = np.ones(n_samples)
+        low = np.zeros(n_samples)
+        high = np.full(n_samples, np.inf)
+        
+        for _ in range(max_steps):
+            P = np.exp(-d * beta[:, None])
+            sum_P = P.sum(axis=1)
+            entropy = np.log(sum_P) + beta * np.einsum('ij,ij->i', d, P) / sum_P
+            error = entropy - target
+            if np.abs(error).max() < tol:
+                break
+            # Entropy too high: narrower Gaussian (larger beta)
+            too_wide = error > 0
+            low = np.where(too_wide, beta, low)
+            high = np.where(too_wide, high, beta)
+            beta = np.where(np.isinf(high), beta * 2, (low + high) / 2)
+        
+        P = np.exp(-d * beta[:, None])
+        return P / P.sum(axis=1, keepdims=True)
+    
+    def _joint_probabilities(self, X):
+        """
+        Symmetric P as an edge list: p_ij = (p(j|i) + p(i|j)) / 2N
+        
+        Returns:
+            rows, cols, values (sorted by row, values sum to 1)
+        """
+        n_samples = X.shape[0]
+        k = min(n_samples - 1, int(3 * self.perplexity + 1))
+        
+        start = time.perf_counter()
+        exact = self.neighbors == 'exact' or (
+            self.neighbors == 'auto' and n_samples <= self.EXACT_KNN_MAX
+        )
+        indices, sq_distances = (self._knn_exact if exact else self._knn_approx)(X, k)
+        self.timings_['neighbors'] = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        conditional = self._conditional_probabilities(sq_distances)
+        
+        # Add each edge in both directions and merge duplicates
+        rows = np.repeat(np.arange(n_samples), k)
+        cols = indices.ravel()
+        keys = np.concatenate([rows * n_samples + cols, cols * n_samples + rows])
+        keys, inverse = np.unique(keys, return_inverse=True)
+        values = np.bincount(inverse, weights=np.tile(conditional.ravel(), 2)) / (2 * n_samples)
+        self.timings_['affinities'] = time.perf_counter() - start
+        return keys // n_samples, keys % n_samples, values
+    
+    # ------------------------------------------------------------------
+    # Step 4: gradient
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def _attraction(Y, rows, cols, P):
+        """
+        Σ_j p_ij·w_ij·(y_i - y_j) over the kNN edges, w = 1 / (1 + |y_i - y_j|²)
+        
+        Returns:
+            forces (N, dims), w of every edge
+        """
+        diff = Y[rows] - Y[cols]
+        w = 1.0 / (1.0 + np.einsum('ij,ij->i', diff, diff))
+        weights = P * w
+        forces = np.empty_like(Y)
+        for j in range(Y.shape[1]):
+            forces[:, j] = np.bincount(rows, weights=weights * diff[:, j], minlength=Y.shape[0])
+        return forces, w
+    
+    def _repulsion_exact(self, Y):
+        """
+        Σ_j w_ij²·(y_i - y_j) over all pairs, and Z = Σ_ij w_ij
+        """
+        n_samples = Y.shape[0]
+        sq = np.einsum('ij,ij->i', Y, Y)
+        forces = np.empty_like(Y)
+        Z = 0.0
+        block = max(1, self.BLOCK_ELEMENTS // n_samples)
+        for start in range(0, n_samples, block):
+            stop = min(start + block, n_samples)
+            W = 1.0 / (1.0 + gemm_squared_distances(Y[start:stop], Y, sq[start:stop]))
+            W[np.arange(stop - start), np.arange(start, stop)] = 0.0
+            Z += W.sum()
+            W *= W
+            forces[start:stop] = Y[start:stop] * W.sum(axis=1)[:, None] - W @ Y
+        return forces, Z
+    
+    def _build_tree(self, Y):
+        """
+        Octree (quadtree in 2D) of the embedding, one level at a time
+        
+        Points are sorted by Morton code (the bits of their cell coordinates
+        interleaved); the cells of level l are the distinct code prefixes
+        of l·dims bits, so every cell is a contiguous run of sorted points
+        and its children are a contiguous run of the next level's cells.
+        
+        Returns:
+            codes: Morton code of each point (input order)
+            levels: Per level (shift, width, prefixes, counts, sums,
+                    centers, child_start, child_end); centers holds one
+                    array per dimension (center of mass of each cell)
+        """
+        n_samples, dims = Y.shape
+        depth = min(self.MAX_TREE_DEPTH, 62 // dims)
+        low = Y.min(axis=0)
+        width = float((Y.max(axis=0) - low).max()) or 1.0
+        cells = np.minimum(((Y - low) / width * (1 << depth)).astype(np.int64), (1 << depth) - 1)
+        codes = np.zeros(n_samples, dtype=np.int64)
+        for bit in range(depth - 1, -1, -1):
+            for j in range(dims):
+                codes = (codes << 1) | ((cells[:, j] >> bit) & 1)
+        
+        order = np.argsort(codes, kind='stable')
+        sorted_codes, sorted_Y = codes[order], Y[order]
+        levels = []
+        for level in range(depth + 1):
+            shift = dims * (depth - level)
+            prefix = sorted_codes >> shift
+            starts = np.flatnonzero(np.concatenate([[True], prefix[1:] != prefix[:-1]]))
+            counts = np.diff(np.append(starts, n_samples)).astype(np.float64)
+            sums = np.add.reduceat(sorted_Y, starts, axis=0)
+            levels.append({
+                'shift': shift,
+                'width': width / (1 << level),
+                'prefixes': prefix[starts],
+                'counts': counts,
+                'sums': sums,
+                'centers': [sums[:, j] / counts for j in range(dims)],
+            })
+            if counts.max() == 1:
+                break   # every cell holds a single point
+        
+        for parent, child in zip(levels, levels[1:]):
+            child_parents = child['prefixes'] >> dims
+            parent['child_start'] = np.searchsorted(child_parents, parent['prefixes'], 'left')
+            parent['child_end'] = np.searchsorted(child_parents, parent['prefixes'], 'right')
+        return codes, levels
+    
+    def _repulsion_barnes_hut(self, Y):
+        """
+        Barnes-Hut approximation of _repulsion_exact
+        
+        Every point walks the tree from the root, a batch of points and one
+        level at a time: a cell that is far enough away (width / distance
+        < angle) or that cannot be split further acts as one point of
+        weight count at its center of mass; other cells are opened.
+        
+        Coordinates are gathered one dimension at a time with np.take
+        (1-D gathers are much cheaper than gathering rows).
+        """
+        n_samples, dims = Y.shape
+        codes, levels = self._build_tree(Y)
+        coords = [np.ascontiguousarray(Y[:, j]) for j in range(dims)]
+        theta2 = self.angle ** 2
+        forces = np.zeros_like(Y)
+        norms = np.zeros(n_samples)
+        
+        for start in range(0, n_samples, self.chunk_size):
+            stop = min(start + self.chunk_size, n_samples)
+            size = stop - start
+            points = np.arange(start, stop)
+            nodes = np.zeros(size, dtype=np.intp)
+            
+            for depth, level in enumerate(levels):
+                counts = np.take(level['counts'], nodes)
+                diff = [np.take(coords[j], points) - np.take(level['centers'][j], nodes)
+                        for j in range(dims)]
+                d2 = sum(d * d for d in diff)
+                inside = (np.take(codes, points) >> level['shift']) == np.take(level['prefixes'], nodes)
+                leaf = (counts == 1) | (depth == len(levels) - 1)
+                done = (~inside & (level['width'] ** 2 < theta2 * d2)) | leaf
+                
+                # A leaf that holds the point itself: use the other points only
+                own = np.flatnonzero(done & inside)
+                if own.size:
+                    counts[own] -= 1
+                    others = np.maximum(counts[own], 1)
+                    own_points, own_nodes = points[own], nodes[own]
+                    for j in range(dims):
+                        y = coords[j][own_points]
+                        diff[j][own] = y - (level['sums'][own_nodes, j] - y) / others
+                    d2[own] = sum(d[own] * d[own] for d in diff)
+                
+                w = 1.0 / (1.0 + d2[done])
+                weight = counts[done] * w
+                local = points[done] - start
+                norms[start:stop] += np.bincount(local, weights=weight, minlength=size)
+                weight *= w
+                for j in range(dims):
+                    forces[start:stop, j] += np.bincount(
+                        local, weights=weight * diff[j][done], minlength=size
+                    )
+                
+                # Open the remaining cells: continue with their children
+                opened = ~done
+                if not opened.any():
+                    break
+                first = level['child_start'][nodes[opened]]
+                lengths = level['child_end'][nodes[opened]] - first
+                points = np.repeat(points[opened], lengths)
+                offsets = np.cumsum(lengths) - lengths
+                nodes = np.arange(lengths.sum()) - np.repeat(offsets - first, lengths)
+        
+        return forces, norms.sum()
+    
+    def _gradient(self, Y, rows, cols, P, exaggeration):
+        """KL gradient 4·(exaggeration·attraction - repulsion / Z), and the KL divergence"""
+        attraction, w = self._attraction(Y, rows, cols, P)
+        if self.method == 'exact':
+            repulsion, Z = self._repulsion_exact(Y)
+        else:
+            repulsion, Z = self._repulsion_barnes_hut(Y)
+        gradient = 4.0 * (exaggeration * attraction - repulsion / Z)
+        
+        # KL(P || Q) needs only the edges (p_ij = 0 elsewhere), q_ij = w_ij / Z
+        kl = float(np.sum(P * np.log(np.maximum(P, 1e-12) / np.maximum(w / Z, 1e-12))))
+        return gradient, kl
+    
+    # ------------------------------------------------------------------
+    # Fit
+    # ------------------------------------------------------------------
+    
+    def _initial_embedding(self, X):
+        """PCA projection (scaled so component 1 has std 1e-4) or small random points"""
+        if self.init == 'pca':
+            Y = PCA_FromScratch(n_components=self.n_components).fit_transform(X)
+            return Y / np.std(Y[:, 0]) * 1e-4
+        rng = np.random.default_rng(self.random_state)
+        return 1e-4 * rng.standard_normal((X.shape[0], self.n_components))
+    
+    def fit_transform(self, X):
+        """
+        Embed X in n_components dimensions
+        
+        Args:
+            X: Data matrix (n_samples, n_features)
+            
+        Returns:
+            Embedding (n_samples, n_components)
+        """
+        X = np.asarray(X, dtype=np.float64)
+        n_samples = X.shape[0]
+        if not 0 < self.perplexity < n_samples:
+            raise ValueError(f"perplexity must be less than n_samples ({n_samples})")
+        self.timings_ = {}
+        rows, cols, P = self._joint_probabilities(X)
+        
+        start = time.perf_counter()
+        Y = self._initial_embedding(X)
+        learning_rate = self.learning_rate
+        if learning_rate == 'auto':
+            learning_rate = max(n_samples / self.early_exaggeration / 4, 50)
+        
+        # Gradient descent with momentum and per-coordinate gains
+        update = np.zeros_like(Y)
+        gains = np.ones_like(Y)
+        for iteration in range(self.max_iter):
+            early = iteration < self.exaggeration_iter
+            exaggeration = self.early_exaggeration if early else 1.0
+            momentum = 0.5 if early else 0.8
+            
+            gradient, kl = self._gradient(Y, rows, cols, P, exaggeration)
+            # Gain grows while the gradient keeps flipping direction
+            flipped = update * gradient < 0
+            gains = np.where(flipped, gains + 0.2, gains * 0.8)
+            np.maximum(gains, 0.01, out=gains)
+            update = momentum * update - learning_rate * gains * gradient
+            Y += update
+            
+            if self.verbose and (iteration + 1) % 50 == 0:
+                print(f"   Iteration {iteration + 1}: KL divergence {kl:.4f}")
+            if np.linalg.norm(gradient) < self.min_grad_norm:
+                break
+        
+        self.n_iter_ = iteration + 1
+        _, self.kl_divergence_ = self._gradient(Y, rows, cols, P, 1.0)
+        self.timings_['optimize'] = time.perf_counter() - start
+        self.embedding_ = Y
+        return Y
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
 def train_word2vec(sentences, vector_size=50):
-    """Train Word2Vec model"""
-    tokenized = [s.lower().split() for s in sentences]
-    model = Word2Vec(
-        sentences=tokenized,
+    """
+    Train Word2Vec model (shared embedding service)
+
+    The trained model is stored in .embedding_cache and reloaded with
+    memory-mapped vectors when the same corpus is used again.
+    """
+    return EmbeddingService(
         vector_size=vector_size,
         window=5,
         min_count=1,
         workers=4,
         epochs=100
-    )
-    return model
+    ).fit(sentences)
 
 def sentences_to_vectors(sentences, model):
-    """Convert sentences to vectors by averaging word vectors"""
-    vectors = []
-    for sent in sentences:
-        words = sent.lower().split()
-        word_vecs = [model.wv[w] for w in words if w in model.wv]
-        if word_vecs:
-            vectors.append(np.mean(word_vecs, axis=0))
-        else:
-            vectors.append(np.zeros(model.wv.vector_size))
-    return np.array(vectors)
+    """Convert sentences to vectors by averaging word vectors (whole batch at once, cached)"""
+    return model.embed(sentences)
+
+def load_vectors(path):
+    """
+    Open a .npy file of sentence vectors without reading it into memory
+    
+    Works with any (n_sentences, n_dims) .npy file, including the
+    sentence_vectors.npy files of the embedding cache.
+    """
+    return np.load(path, mmap_mode='r')
+
+def project_vectors_file(path, out_path=None, n_components=3, batch_size=10000):
+    """
+    Project a (possibly huge) .npy file of vectors to n_components dims
+    
+    Two passes over the memory-mapped file: partial_fit per batch, then a
+    chunked transform. With out_path the projection is written to a .npy
+    file as well, so neither input nor output has to fit in memory.
+    
+    Returns:
+        (projection, pca)
+    """
+    vectors = load_vectors(path)
+    pca = IncrementalPCA_FromScratch(n_components=n_components, batch_size=batch_size)
+    pca.fit(vectors)
+    out = None
+    if out_path is not None:
+        out = np.lib.format.open_memmap(out_path, mode='w+', dtype=np.float64,
+                                        shape=(vectors.shape[0], n_components))
+    projection = pca.transform(vectors, out=out)
+    if out is not None:
+        out.flush()
+    return projection, pca
 
 def plot_3d(data, labels, title, filename, time_taken=None):
     """
@@ -230,7 +941,7 @@ def main():
     
     print("Training Word2Vec model...")
     model = train_word2vec(SENTENCES, vector_size=50)
-    print(f"✅ Model trained!")
+    print(f"✅ Model {'loaded from cache' if model.loaded_from_cache else 'trained'}!")
     print(f"   Vocabulary: {len(model.wv)} words")
     print(f"   Vector dimensions: {model.wv.vector_size}")
     
@@ -261,6 +972,7 @@ def main():
     pca_time = time.time() - start_time
     
     print(f"\n⏱️  PCA Time: {pca_time:.4f} seconds")
+    print(f"🔧 Solver: {pca.solver_}")
     print(f"📊 Output shape: {pca_result.shape} (9 sentences × 3 dimensions)")
     
     # Explained variance
@@ -301,6 +1013,15 @@ def main():
     print(f"\n⏱️  T-SNE Time: {tsne_time:.4f} seconds")
     print(f"📊 Output shape: {tsne_result.shape} (9 sentences × 3 dimensions)")
     
+    # Same settings with the NumPy implementation (benchmark_tsne.py
+    # compares the methods on thousands of points)
+    start_time = time.time()
+    tsne_scratch = TSNE_FromScratch(n_components=3, perplexity=2, method='exact', max_iter=1000)
+    tsne_scratch.fit_transform(vectors)
+    tsne_scratch_time = time.time() - start_time
+    print(f"\n⏱️  T-SNE Time (NumPy, exact): {tsne_scratch_time:.4f} seconds")
+    print(f"📉 KL divergence: {tsne_scratch.kl_divergence_:.4f} (sklearn: {tsne.kl_divergence_:.4f})")
+    
     # Visualize T-SNE
     print("\n🎨 Creating T-SNE visualization...")
     plot_3d(
@@ -0,0 +1,89 @@
+"""
+Training Benchmark
+Compares the original full-batch training loop with the solvers of
+LogisticRegression on a large synthetic dataset (1M rows by default)
+from generate_synthetic_data.
+
+Usage:
+  python benchmark_training.py                  # 1,000,000 rows
+  python benchmark_training.py --rows 200000 --iterations 500
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from logistic_regression import LogisticRegression, generate_synthetic_data
+
+
+def legacy_fit(X: np.ndarray, y: np.ndarray, learning_rate: float, n_iterations: int) -> np.ndarray:
+    """Original LogisticRegression.fit (X @ beta three times per iteration)"""
+    model = LogisticRegression(learning_rate, n_iterations)
+    beta = np.random.randn(X.shape[1]) * 0.01
+    likelihood_history, error_history, beta_history = [], [], []
+    for _ in range(n_iterations):
+        predictions = model.sigmoid(X @ beta)
+        z = np.clip(X @ beta, -500, 500)
+        likelihood_history.append(np.sum(y * z - np.log(1 + np.exp(z))))
+        error_history.append(model.mean_squared_error(y, predictions))
+        beta_history.append(beta.copy())
+        beta = beta + learning_rate * (X.T @ (y - model.sigmoid(X @ beta)))
+    return beta
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark LogisticRegression solvers')
+    parser.add_argument('--rows', type=int, default=1_000_000,
+                        help='Rows of the dataset (default: 1000000)')
+    parser.add_argument('--iterations', type=int, default=200,
+                        help="Iterations of the full-batch 'gd' runs (default: 200)")
+    parser.add_argument('--epochs', type=int, default=20,
+                        help='Maximum epochs of the mini-batch solvers (default: 20)')
+    parser.add_argument('--batch-size', type=int, default=1024,
+                        help='Rows per mini-batch (default: 1024)')
+    args = parser.parse_args()
+
+    np.random.seed(42)
+    X, y = generate_synthetic_data(n_samples=args.rows // 2)
+    n = len(X)
+    # Same step per row as main.py (learning rate 0.1 on 400 rows)
+    gd_rate = 0.1 * 400 / n
+    print(f"Data: {n:,} rows × {X.shape[1]} features\n")
+
+    runs = [
+        ('legacy gd', None, lambda: legacy_fit(X, y, gd_rate, args.iterations)),
+        ('gd', LogisticRegression(gd_rate, args.iterations, solver='gd'), None),
+        ('sgd', LogisticRegression(8.0 / args.batch_size, args.epochs, solver='sgd',
+                                   batch_size=args.batch_size, tol=1e-4), None),
+        ('momentum', LogisticRegression(0.8 / args.batch_size, args.epochs, solver='momentum',
+                                        batch_size=args.batch_size, tol=1e-4), None),
+        ('adam', LogisticRegression(0.2, args.epochs, solver='adam',
+                                    batch_size=args.batch_size, tol=1e-4), None),
+        ('newton', LogisticRegression(solver='newton', n_iterations=50, tol=1e-10), None),
+    ]
+
+    print(f"  {'solver':<11}{'iterations':>11}{'time':>10}{'per iter':>11}"
+          f"{'log-likelihood':>17}{'accuracy':>10}")
+    for name, model, run in runs:
+        np.random.seed(0)
+        start = time.perf_counter()
+        if model is None:
+            beta = run()
+            n_iter = args.iterations
+        else:
+            model.fit(X, y, verbose=False)
+            beta, n_iter = model.beta, model.n_iter_
+        seconds = time.perf_counter() - start
+
+        scorer = LogisticRegression()
+        scorer.beta = beta
+        ll = scorer.log_likelihood(X, y, beta)
+        accuracy = np.mean(scorer.predict(X) == y)
+        print(f"  {name:<11}{n_iter:>11}{seconds:>9.2f}s{seconds / n_iter * 1000:>8.1f} ms"
+              f"{ll:>17.1f}{accuracy:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,35 +3,117 @@ Logistic Regression with Gradient Descent
 Binary classification using sigmoid and log-likelihood optimization
 """
 
+import sys
+from pathlib import Path
 import numpy as np
 import matplotlib.pyplot as plt
 import pandas as pd
-from typing import Tuple, List
+from typing import List, Optional, Tuple
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.history import HistoryRecorder
 
 np.random.seed(42)
 plt.style.use('seaborn-v0_8-darkgrid')
 
 
 class LogisticRegression:
-    """Logistic Regression classifier using gradient ascent"""
+    """
+    Logistic Regression classifier using gradient ascent
+    
+    Solvers:
+    - 'gd':       full-batch gradient ascent (the original training loop)
+    - 'sgd':      mini-batch gradient ascent, one epoch per iteration
+    - 'momentum': mini-batch gradient ascent with momentum
+    - 'adam':     mini-batch Adam (per-parameter adaptive step sizes)
+    - 'newton':   Newton-Raphson / IRLS, full batch (step = H⁻¹·gradient)
+    
+    Every step does one forward pass (z = X @ beta) that gives the
+    predictions, the log-likelihood, the MSE and the gradient together.
+    
+    Training metrics go into a fixed-size HistoryRecorder (self.history):
+    long runs are downsampled instead of growing a list per iteration.
+    Full-batch solvers record the metrics of the beta an iteration starts
+    from. Mini-batch solvers record the sum over the epoch's batches, each
+    scored with the beta of its own step (a cheap proxy), or with tol set
+    the exact metrics of the epoch's final beta.
+    """
+    
+    SOLVERS = ('gd', 'sgd', 'momentum', 'adam', 'newton')
+    MINI_BATCH_SOLVERS = ('sgd', 'momentum', 'adam')
+    DEFAULT_BATCH_SIZE = 256
     
-    def __init__(self, learning_rate: float = 0.01, n_iterations: int = 1000):
+    def __init__(self, learning_rate: float = 0.01, n_iterations: int = 1000,
+                 solver: str = 'gd', batch_size: Optional[int] = None,
+                 momentum: float = 0.9, adam_betas: Tuple[float, float] = (0.9, 0.999),
+                 tol: Optional[float] = None, n_iter_no_change: int = 5,
+                 history_size: int = 10_000, history_stride: int = 1):
+        """
+        Args:
+            learning_rate: Step size; multiplies the gradient summed over the
+                batch (not used by 'newton')
+            n_iterations: Maximum iterations (epochs for mini-batch solvers)
+            solver: 'gd', 'sgd', 'momentum', 'adam' or 'newton'
+            batch_size: Rows per step of the mini-batch solvers
+                (default 256; 'gd' and 'newton' always use all rows)
+            momentum: Velocity decay of 'momentum'
+            adam_betas: Decay rates of Adam's first and second moments
+            tol: Early stopping - stop once the log-likelihood has improved
+                by less than tol·|log-likelihood| for n_iter_no_change
+                iterations in a row (None: always run n_iterations). For
+                mini-batch solvers the log-likelihood is then taken from one
+                extra pass over all rows at the end of each epoch
+            n_iter_no_change: Iterations without improvement before stopping
+            history_size: Iterations kept in the training history; when it
+                is full, every other sample is dropped and the stride doubles
+            history_stride: Record every history_stride-th iteration (the
+                last iteration is always recorded)
+        """
+        if solver not in self.SOLVERS:
+            raise ValueError(f"solver must be one of {self.SOLVERS}, got {solver!r}")
         self.learning_rate = learning_rate
         self.n_iterations = n_iterations
+        self.solver = solver
+        self.batch_size = batch_size
+        self.momentum = momentum
+        self.adam_betas = adam_betas
+        self.tol = tol
+        self.n_iter_no_change = n_iter_no_change
         self.beta = None
-        self.likelihood_history = []
-        self.error_history = []
-        self.beta_history = []
+        self.n_iter_ = 0
+        self.converged_ = False
+        self.history = HistoryRecorder(capacity=history_size, stride=history_stride,
+                                       overflow='downsample')
+    
+    def _history_values(self, name: str) -> np.ndarray:
+        return self.history[name] if name in self.history else np.empty(0)
+    
+    @property
+    def likelihood_history(self) -> np.ndarray:
+        """Log-likelihood of the recorded iterations (see history.steps)"""
+        return self._history_values('log_likelihood')
+    
+    @property
+    def error_history(self) -> np.ndarray:
+        """MSE of the recorded iterations"""
+        return self._history_values('mse')
+    
+    @property
+    def beta_history(self) -> np.ndarray:
+        """Beta at the start of the recorded iterations (n_recorded, n_features)"""
+        return self._history_values('beta')
         
     def sigmoid(self, z: np.ndarray) -> np.ndarray:
         """Sigmoid activation function"""
         return 1 / (1 + np.exp(-np.clip(z, -500, 500)))
     
+    def _log_likelihood(self, y: np.ndarray, z: np.ndarray) -> float:
+        """Σ y·z - log(1 + e^z), with log(1 + e^z) = logaddexp(0, z) (no overflow)"""
+        return float(np.sum(y * z - np.logaddexp(0, z)))
+    
     def log_likelihood(self, X: np.ndarray, y: np.ndarray, beta: np.ndarray) -> float:
         """Calculate log-likelihood"""
-        z = np.clip(X @ beta, -500, 500)
-        ll = np.sum(y * z - np.log(1 + np.exp(z)))
-        return ll
+        return self._log_likelihood(y, X @ beta)
     
     def gradient(self, X: np.ndarray, y: np.ndarray, beta: np.ndarray) -> np.ndarray:
         """Calculate gradient of log-likelihood"""
@@ -44,12 +126,71 @@ class LogisticRegression:
         """Calculate mean squared error"""
         return np.mean((y_true - y_pred) ** 2)
     
+    def _forward(self, X: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray, float, float]:
+        """
+        One pass over a batch with the current beta
+        
+        Returns:
+            predictions, residuals (y - predictions), log-likelihood and
+            sum of squared errors of the batch
+        """
+        z = X @ self.beta
+        # exp(-|z|) never overflows and gives both the sigmoid and the
+        # stable log(1 + e^z) = max(z, 0) + log(1 + e^-|z|)
+        exp_neg = np.exp(-np.abs(z))
+        denominator = 1 + exp_neg
+        predictions = np.where(z >= 0, 1.0, exp_neg) / denominator
+        ll = float(y @ z - np.maximum(z, 0).sum() - np.log(denominator).sum())
+        residuals = y - predictions
+        return predictions, residuals, ll, float(residuals @ residuals)
+    
+    def _newton_step(self, X: np.ndarray, predictions: np.ndarray,
+                     grad: np.ndarray) -> np.ndarray:
+        """
+        Newton step H⁻¹·gradient, H = Xᵀ·diag(p(1-p))·X (the IRLS update)
+        
+        A tiny ridge keeps H invertible when predictions saturate.
+        """
+        weights = predictions * (1 - predictions)
+        hessian = X.T @ (X * weights[:, None])
+        hessian[np.diag_indices_from(hessian)] += 1e-10 * max(1.0, np.trace(hessian))
+        try:
+            return np.linalg.solve(hessian, grad)
+        except np.linalg.LinAlgError:
+            return np.linalg.lstsq(hessian, grad, rcond=None)[0]
+    
+    def _batches(self, X: np.ndarray, y: np.ndarray):
+        """Batches of one iteration (a shuffled epoch for mini-batch solvers)"""
+        if self.solver not in self.MINI_BATCH_SOLVERS:
+            yield X, y
+            return
+        batch_size = self.batch_size or self.DEFAULT_BATCH_SIZE
+        # One shuffled copy per epoch, then contiguous slices (views)
+        order = np.random.permutation(len(X))
+        X_shuffled, y_shuffled = X[order], y[order]
+        for start in range(0, len(X), batch_size):
+            yield X_shuffled[start:start + batch_size], y_shuffled[start:start + batch_size]
+    
     def fit(self, X: np.ndarray, y: np.ndarray, verbose: bool = True) -> None:
-        """Train model using gradient ascent"""
+        """Train model using gradient ascent (or the chosen solver)"""
         n_samples, n_features = X.shape
         
         # Initialize beta randomly
         self.beta = np.random.randn(n_features) * 0.01
+        self.history.clear()
+        self.converged_ = False
+        
+        # Optimizer state
+        velocity = np.zeros(n_features)
+        first_moment = np.zeros(n_features)
+        second_moment = np.zeros(n_features)
+        beta1, beta2 = self.adam_betas
+        step = 0
+        best_ll = -np.inf
+        no_improvement = 0
+        # Early stopping must compare like with like: score the whole
+        # epoch with its final beta instead of summing per-batch scores
+        epoch_end_pass = self.tol is not None and self.solver in self.MINI_BATCH_SOLVERS
         
         if verbose:
             print(f"{'='*70}")
@@ -57,28 +198,71 @@ class LogisticRegression:
             print(f"{'='*70}\n")
         
         for iteration in range(self.n_iterations):
-            # Predictions
-            z = X @ self.beta
-            predictions = self.sigmoid(z)
+            last_iteration = iteration == self.n_iterations - 1
+            # Copy the starting beta only if it may be recorded (early
+            # stopping can force a record on any iteration)
+            metric_beta = None
+            if not epoch_end_pass and (self.tol is not None or last_iteration
+                                       or self.history.should_record(iteration)):
+                metric_beta = self.beta.copy()
+            ll = 0.0
+            squared_error = 0.0
             
-            # Metrics
-            ll = self.log_likelihood(X, y, self.beta)
-            mse = self.mean_squared_error(y, predictions)
+            for X_batch, y_batch in self._batches(X, y):
+                # One forward pass: metrics and gradient of the same beta
+                predictions, residuals, batch_ll, batch_se = self._forward(X_batch, y_batch)
+                ll += batch_ll
+                squared_error += batch_se
+                grad = X_batch.T @ residuals
+                
+                # Update beta
+                step += 1
+                if self.solver == 'newton':
+                    self.beta += self._newton_step(X_batch, predictions, grad)
+                elif self.solver == 'momentum':
+                    velocity = self.momentum * velocity + self.learning_rate * grad
+                    self.beta += velocity
+                elif self.solver == 'adam':
+                    first_moment = beta1 * first_moment + (1 - beta1) * grad
+                    second_moment = beta2 * second_moment + (1 - beta2) * grad ** 2
+                    m_hat = first_moment / (1 - beta1 ** step)
+                    v_hat = second_moment / (1 - beta2 ** step)
+                    self.beta += self.learning_rate * m_hat / (np.sqrt(v_hat) + 1e-8)
+                else:
+                    self.beta += self.learning_rate * grad
             
-            # Store history
-            self.likelihood_history.append(ll)
-            self.error_history.append(mse)
-            self.beta_history.append(self.beta.copy())
+            # Metrics of this iteration (mini-batch: summed over the epoch)
+            if epoch_end_pass:
+                _, _, ll, squared_error = self._forward(X, y)
+                metric_beta = self.beta
+            mse = squared_error / n_samples
             
-            # Update beta
-            grad = self.gradient(X, y, self.beta)
-            self.beta += self.learning_rate * grad
+            # Store history (every history_stride-th iteration)
+            self.history.record(iteration, force=last_iteration,
+                                log_likelihood=ll, mse=mse, beta=metric_beta)
+            self.n_iter_ = iteration + 1
             
             # Print progress
             if verbose and (iteration % 100 == 0 or iteration == self.n_iterations - 1):
                 print(f"Iteration {iteration:4d} | Log-Likelihood: {ll:10.4f} | MSE: {mse:.6f}")
                 print(f"  Beta: [{', '.join([f'{b:.4f}' for b in self.beta])}]")
                 print(f"  {'-'*68}")
+            
+            # Early stopping
+            if self.tol is not None:
+                if ll > best_ll + self.tol * abs(ll):
+                    no_improvement = 0
+                else:
+                    no_improvement += 1
+                best_ll = max(best_ll, ll)
+                if no_improvement >= self.n_iter_no_change:
+                    self.converged_ = True
+                    self.history.record(iteration, force=True,
+                                        log_likelihood=ll, mse=mse, beta=metric_beta)
+                    if verbose:
+                        print(f"Converged after {iteration + 1} iterations "
+                              f"(log-likelihood improved < {self.tol:g} relative)")
+                    break
         
         if verbose:
             print(f"\n{'='*70}")
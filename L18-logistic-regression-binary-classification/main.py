@@ -93,11 +93,11 @@ def main():
                                save_path=os.path.join(output_dir, 'predictions_comparison.png'))
     
     print("3. Training progress plot...")
-    plot_training_progress(model.likelihood_history, model.error_history,
+    plot_training_progress(model.history,
                           save_path=os.path.join(output_dir, 'training_progress.png'))
     
     print("4. Beta evolution plot...")
-    plot_beta_evolution(model.beta_history,
+    plot_beta_evolution(model.history,
                        save_path=os.path.join(output_dir, 'beta_evolution.png'))
     
     # Step 6: Final summary
@@ -7,6 +7,7 @@ import matplotlib.pyplot as plt
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from common.history import HistoryRecorder
     from logistic_regression import LogisticRegression
 
 plt.rcParams['font.family'] = 'DejaVu Sans'
@@ -102,11 +103,14 @@ def plot_predictions_comparison(y_true: np.ndarray, y_pred_proba: np.ndarray,
     print(f"✓ Saved: {save_path}")
 
 
-def plot_training_progress(likelihood_history: list, error_history: list,
+def plot_training_progress(history: 'HistoryRecorder',
                            save_path: str = 'outputs/training_progress.png'):
-    """Plot log-likelihood and error over iterations"""
+    """Plot log-likelihood and error over iterations (model.history)"""
     fig, axes = plt.subplots(2, 1, figsize=(14, 10))
-    iterations = np.arange(len(likelihood_history))
+    iterations = history.steps
+    likelihood_history = history['log_likelihood']
+    error_history = history['mse']
+    span = iterations[-1] - iterations[0]
     
     # Plot 1: Log-Likelihood
     ax1 = axes[0]
@@ -119,11 +123,11 @@ def plot_training_progress(likelihood_history: list, error_history: list,
     ax1.grid(True, alpha=0.3)
     
     # Add annotations
-    max_ll = max(likelihood_history)
-    max_idx = likelihood_history.index(max_ll)
+    max_pos = np.argmax(likelihood_history)
+    max_ll, max_idx = likelihood_history[max_pos], iterations[max_pos]
     ax1.annotate(f'Max: {max_ll:.2f}', 
                 xy=(max_idx, max_ll), 
-                xytext=(max_idx + len(likelihood_history)*0.1, max_ll),
+                xytext=(max_idx + span*0.1, max_ll),
                 arrowprops=dict(arrowstyle='->', color='red', lw=2),
                 fontsize=10, fontweight='bold', color='red')
     
@@ -138,11 +142,11 @@ def plot_training_progress(likelihood_history: list, error_history: list,
     ax2.grid(True, alpha=0.3)
     
     # Add annotations
-    min_mse = min(error_history)
-    min_idx = error_history.index(min_mse)
+    min_pos = np.argmin(error_history)
+    min_mse, min_idx = error_history[min_pos], iterations[min_pos]
     ax2.annotate(f'Min: {min_mse:.6f}', 
                 xy=(min_idx, min_mse), 
-                xytext=(min_idx + len(error_history)*0.1, min_mse + (max(error_history)-min_mse)*0.1),
+                xytext=(min_idx + span*0.1, min_mse + (error_history.max()-min_mse)*0.1),
                 arrowprops=dict(arrowstyle='->', color='green', lw=2),
                 fontsize=10, fontweight='bold', color='green')
     
@@ -152,12 +156,12 @@ def plot_training_progress(likelihood_history: list, error_history: list,
     print(f"✓ Saved: {save_path}")
 
 
-def plot_beta_evolution(beta_history: list,
+def plot_beta_evolution(history: 'HistoryRecorder',
                         save_path: str = 'outputs/beta_evolution.png'):
-    """Plot evolution of beta parameters"""
-    beta_array = np.array(beta_history)
+    """Plot evolution of beta parameters (model.history)"""
+    beta_array = history['beta']
     n_params = beta_array.shape[1]
-    iterations = np.arange(len(beta_history))
+    iterations = history.steps
     
     plt.figure(figsize=(14, 8))
     
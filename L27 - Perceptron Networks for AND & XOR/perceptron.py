@@ -3,18 +3,27 @@ Perceptron Network for AND & XOR Logic Gates
 LIGHTWEIGHT VERSION - Uses only NumPy (no TensorFlow required!)
 """
 
+import sys
+from pathlib import Path
 import numpy as np
 import matplotlib.pyplot as plt
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from common.history import HistoryRecorder
+
 class SimpleNeuralNetwork:
     """Simple neural network with one hidden layer"""
     
-    def __init__(self, input_size=2, hidden_size=4, output_size=1):
+    def __init__(self, input_size=2, hidden_size=4, output_size=1,
+                 history_size=1000, history_stride=1):
         # Initialize weights randomly
         self.W1 = np.random.randn(input_size, hidden_size) * 0.5
         self.b1 = np.zeros((1, hidden_size))
         self.W2 = np.random.randn(hidden_size, output_size) * 0.5
         self.b2 = np.zeros((1, output_size))
+        # Loss per epoch, fixed size (long runs are downsampled)
+        self.history = HistoryRecorder(capacity=history_size, stride=history_stride,
+                                       overflow='downsample')
         
     def relu(self, x):
         """ReLU activation function"""
@@ -58,15 +67,15 @@ class SimpleNeuralNetwork:
         self.b1 -= learning_rate * db1
     
     def train(self, X, y, epochs=200, learning_rate=0.5):
-        """Train the network"""
-        losses = []
+        """Train the network, returns the recorded losses"""
+        self.history.clear()
         for epoch in range(epochs):
             # Forward pass
             predictions = self.forward(X)
             
             # Calculate MSE loss
             loss = np.mean((predictions - y) ** 2)
-            losses.append(loss)
+            self.history.record(epoch, force=epoch == epochs - 1, loss=loss)
             
             # Backward pass
             self.backward(X, y, learning_rate)
@@ -75,7 +84,7 @@ class SimpleNeuralNetwork:
                 accuracy = np.mean((predictions > 0.5) == y) * 100
                 print(f"  Epoch {epoch+1}/{epochs} - Loss: {loss:.4f} - Accuracy: {accuracy:.2f}%")
         
-        return losses
+        return self.history['loss']
     
     def predict(self, X):
         """Make predictions"""
@@ -100,7 +109,7 @@ def generate_dataset(gate_type, num_samples=100, noise_percent=0):
     
     return np.array(X), np.array(y).reshape(-1, 1)
 
-def plot_results(X, y, model, gate_type, noise_percent, losses):
+def plot_results(X, y, model, gate_type, noise_percent):
     """Visualize decision boundary and training progress"""
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
     
@@ -123,7 +132,7 @@ def plot_results(X, y, model, gate_type, noise_percent, losses):
     ax1.grid(True, alpha=0.3)
     
     # Plot training loss
-    ax2.plot(losses, linewidth=2, color='#2E86AB')
+    ax2.plot(model.history.steps, model.history['loss'], linewidth=2, color='#2E86AB')
     ax2.set_xlabel('Epoch', fontsize=12)
     ax2.set_ylabel('Mean Squared Error', fontsize=12)
     ax2.set_title('Training Loss Curve', fontsize=14, fontweight='bold')
@@ -159,7 +168,7 @@ def train_and_evaluate(gate_type, num_perceptrons=4, noise_percent=0, epochs=200
     print(f"  Accuracy: {accuracy:.2f}%")
     
     # Visualize
-    plot_results(X_test, y_test, model, gate_type, noise_percent, losses)
+    plot_results(X_test, y_test, model, gate_type, noise_percent)
     
     return model, losses
 
@@ -0,0 +1,4 @@
+"""
+Shared building blocks reused across the lesson projects
+Lesson scripts add the repository root to sys.path and import from here.
+"""
@@ -0,0 +1,328 @@
+"""
+Cached Word2Vec sentence embeddings shared by the sentence lessons
+Trained models are stored on disk keyed by corpus and training settings and
+reloaded with memory-mapped vectors, sentence embeddings are cached by text
+hash, and batches are embedded with one sparse token-count matrix product
+instead of averaging word vectors sentence by sentence.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+from itertools import repeat
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import numpy as np
+from numpy.lib import format as npy_format
+from scipy import sparse
+
+# Shared by all lessons (repository root, ignored by git)
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[1] / ".embedding_cache"
+
+_KEY_BYTES = 16
+
+
+def tokenize(sentence: str) -> list[str]:
+    """Lowercase whitespace tokenization used for training and embedding"""
+    return sentence.lower().split()
+
+
+def _npy_header(shape: tuple, dtype: np.dtype, version: tuple) -> bytes:
+    """Header of a C-order .npy file"""
+    header = {"descr": npy_format.dtype_to_descr(dtype), "fortran_order": False, "shape": shape}
+    buffer = io.BytesIO()
+    if version == (1, 0):
+        npy_format.write_array_header_1_0(buffer, header)
+    else:
+        npy_format.write_array_header_2_0(buffer, header)
+    return buffer.getvalue()
+
+
+def _npy_appender(path: Path, rows: np.ndarray, stored: int):
+    """
+    Plan writing rows after the first `stored` rows of a .npy file in place
+
+    Returns a function doing the write, or None if the file cannot grow
+    in place (fewer rows, different dtype or row shape, or no room in its
+    header for the new row count).
+    """
+    with open(path, "rb") as f:
+        version = npy_format.read_magic(f)
+        read_header = (npy_format.read_array_header_1_0 if version == (1, 0)
+                       else npy_format.read_array_header_2_0)
+        shape, fortran_order, dtype = read_header(f)
+        offset = f.tell()
+    if fortran_order or dtype != rows.dtype or shape[1:] != rows.shape[1:] or shape[0] < stored:
+        return None
+    header = _npy_header((stored + len(rows),) + shape[1:], dtype, version)
+    if len(header) != offset:
+        return None
+
+    def append():
+        with open(path, "r+b") as f:
+            # Rows past the stored count are left over from an interrupted append
+            f.seek(offset + stored * rows[:1].nbytes)
+            f.write(np.ascontiguousarray(rows).tobytes())
+            f.truncate()
+            f.flush()
+            f.seek(0)
+            f.write(header)
+    return append
+
+
+def _text_key(tokens: Sequence[str]) -> bytes:
+    """Hash of a tokenized sentence (sentences with equal tokens share it)"""
+    return hashlib.blake2b(" ".join(tokens).encode("utf-8"), digest_size=_KEY_BYTES).digest()
+
+
+class EmbeddingService:
+    """
+    Word2Vec sentence embeddings (mean of the word vectors) with an on-disk
+    model store and sentence cache
+
+    Usage:
+        service = EmbeddingService(vector_size=50).fit(sentences)
+        vectors = service.embed(sentences)
+    """
+
+    def __init__(
+        self,
+        vector_size: int = 50,
+        window: int = 5,
+        min_count: int = 1,
+        epochs: int = 100,
+        workers: int = 4,
+        seed: int = 1,
+        cache_dir: str | os.PathLike | None = DEFAULT_CACHE_DIR,
+    ):
+        """
+        Args:
+            vector_size, window, min_count, epochs, workers, seed: Word2Vec
+                training settings
+            cache_dir: Directory of stored models and sentence embeddings
+                (None keeps everything in memory)
+        """
+        self.params = dict(vector_size=vector_size, window=window, min_count=min_count,
+                           epochs=epochs, seed=seed)
+        self.workers = workers
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.wv = None
+        self.model_dir: Path | None = None
+        self.loaded_from_cache = False
+        self._stored_keys: dict[bytes, int] = {}
+        self._stored_vectors: np.ndarray | None = None
+        self._new_keys: list[bytes] = []
+        self._new_vectors: list[np.ndarray] = []  # blocks of new embeddings
+        self._new_index: dict[bytes, int] = {}
+
+    # ------------------------------------------------------------------
+    # Model
+    # ------------------------------------------------------------------
+
+    def model_key(self, corpus: Sequence[Sequence[str]]) -> str:
+        """Hash of the tokenized corpus and the training settings"""
+        digest = hashlib.sha256(json.dumps(self.params, sort_keys=True).encode("utf-8"))
+        for tokens in corpus:
+            digest.update(" ".join(tokens).encode("utf-8"))
+            digest.update(b"\n")
+        return digest.hexdigest()[:32]
+
+    def fit(self, sentences: Iterable[str]) -> "EmbeddingService":
+        """
+        Load the model trained on this corpus, or train and store it
+
+        A stored model is opened with its vectors memory-mapped, so
+        re-running a lesson skips training and does not copy the vectors.
+        """
+        from gensim.models import KeyedVectors, Word2Vec
+
+        corpus = [tokenize(sentence) for sentence in sentences]
+        key = self.model_key(corpus)
+        self.model_dir = self.cache_dir / key if self.cache_dir is not None else None
+        model_file = self.model_dir / "word2vec.kv" if self.model_dir is not None else None
+
+        if model_file is not None and model_file.exists():
+            self.wv = KeyedVectors.load(str(model_file), mmap="r")
+            self.loaded_from_cache = True
+        else:
+            model = Word2Vec(sentences=corpus, workers=self.workers, **self.params)
+            self.wv = model.wv
+            self.loaded_from_cache = False
+            if model_file is not None:
+                self.model_dir.mkdir(parents=True, exist_ok=True)
+                # Vectors in their own .npy file so they can be memory-mapped
+                self.wv.save(str(model_file), separately=["vectors"])
+
+        self._load_sentence_cache()
+        return self
+
+    # ------------------------------------------------------------------
+    # Embedding
+    # ------------------------------------------------------------------
+
+    def _require_model(self):
+        if self.wv is None:
+            raise RuntimeError("EmbeddingService.fit() must be called before embedding")
+
+    def embed_tokens(self, token_lists: Sequence[Sequence[str]]) -> np.ndarray:
+        """
+        Mean word vector of each token list (zeros if no token is known)
+
+        All tokens are mapped to vocabulary indices in one pass; a sparse
+        (sentences × vocabulary) count matrix times the vector matrix gives
+        all sums at once.
+        """
+        self._require_model()
+        n, dim = len(token_lists), self.wv.vector_size
+        lengths = np.fromiter(map(len, token_lists), dtype=np.int64, count=n)
+        flat = [token for tokens in token_lists for token in tokens]
+        indices = np.fromiter(map(self.wv.key_to_index.get, flat, repeat(-1)),
+                              dtype=np.int64, count=len(flat))
+        rows = np.repeat(np.arange(n), lengths)
+
+        known = indices >= 0
+        rows, indices = rows[known], indices[known]
+        counts = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, indices)),
+            shape=(n, len(self.wv.index_to_key)),
+        )
+        sums = np.asarray(counts @ self.wv.vectors, dtype=np.float32).reshape(n, dim)
+        n_known = np.bincount(rows, minlength=n).astype(np.float32)
+        return np.divide(sums, n_known[:, None], out=np.zeros_like(sums), where=n_known[:, None] > 0)
+
+    def embed(self, sentences: Sequence[str], use_cache: bool = True,
+              persist: bool = True) -> np.ndarray:
+        """
+        Sentence vectors (n_sentences, vector_size)
+
+        Args:
+            sentences: Sentences to embed
+            use_cache: Reuse embeddings of sentences seen before and add the
+                new ones to the cache
+            persist: Write new cache entries to disk right away (otherwise
+                call save_cache())
+        """
+        self._require_model()
+        token_lists = [tokenize(sentence) for sentence in sentences]
+        if not use_cache:
+            return self.embed_tokens(token_lists)
+
+        keys = [_text_key(tokens) for tokens in token_lists]
+        result = np.empty((len(keys), self.wv.vector_size), dtype=np.float32)
+
+        # Where each sentence's vector comes from: the stored cache, this
+        # session's new entries, or a batch embedding of the misses
+        stored_at, stored_rows, new_at, new_rows = [], [], [], []
+        missing: dict[bytes, list[int]] = {}
+        for i, key in enumerate(keys):
+            row = self._stored_keys.get(key)
+            if row is not None:
+                stored_at.append(i)
+                stored_rows.append(row)
+                continue
+            row = self._new_index.get(key)
+            if row is not None:
+                new_at.append(i)
+                new_rows.append(row)
+            else:
+                missing.setdefault(key, []).append(i)
+
+        if missing:
+            # Each distinct new sentence is embedded once
+            start = len(self._new_keys)
+            for offset, (key, positions) in enumerate(missing.items()):
+                self._new_index[key] = start + offset
+                new_at.extend(positions)
+                new_rows.extend([start + offset] * len(positions))
+            self._new_keys.extend(missing)
+            self._new_vectors.append(
+                self.embed_tokens([token_lists[positions[0]] for positions in missing.values()])
+            )
+
+        if stored_at:
+            result[stored_at] = self._stored_vectors[stored_rows]
+        if new_at:
+            result[new_at] = self._new_array()[new_rows]
+        if missing and persist:
+            self.save_cache()
+        return result
+
+    def _new_array(self) -> np.ndarray:
+        """This session's new cache entries as one array"""
+        if len(self._new_vectors) != 1:
+            self._new_vectors = [
+                np.concatenate(self._new_vectors) if self._new_vectors
+                else np.empty((0, self.wv.vector_size), dtype=np.float32)
+            ]
+        return self._new_vectors[0]
+
+    # ------------------------------------------------------------------
+    # Sentence cache files
+    # ------------------------------------------------------------------
+
+    def _cache_files(self) -> tuple[Path, Path]:
+        return self.model_dir / "sentence_keys.npy", self.model_dir / "sentence_vectors.npy"
+
+    def _load_sentence_cache(self):
+        """Open the stored sentence embeddings of the current model"""
+        self._stored_keys, self._stored_vectors = {}, None
+        self._new_keys, self._new_vectors, self._new_index = [], [], {}
+        if self.model_dir is None:
+            return
+        keys_file, vectors_file = self._cache_files()
+        if keys_file.exists() and vectors_file.exists():
+            keys = np.load(keys_file)
+            self._stored_keys = {key.tobytes(): row for row, key in enumerate(keys)}
+            self._stored_vectors = np.load(vectors_file, mmap_mode="r")
+
+    def save_cache(self):
+        """
+        Append the embeddings computed since the last save to disk
+
+        The new rows are written at the end of both cache files and only
+        their headers are rewritten, so a save costs the size of the new
+        entries rather than of the whole cache. The vectors header is
+        updated before the keys header: an interrupted save leaves at most
+        unused vectors behind. Files that cannot grow in place are
+        rewritten once.
+        """
+        if self.model_dir is None or not self._new_keys:
+            return
+        keys_file, vectors_file = self._cache_files()
+        new_keys = np.frombuffer(b"".join(self._new_keys), dtype=np.uint8).reshape(-1, _KEY_BYTES)
+        new_vectors = self._new_array()
+        start = len(self._stored_keys)
+
+        appenders = None
+        if self._stored_vectors is not None:
+            appenders = [_npy_appender(vectors_file, new_vectors, start),
+                         _npy_appender(keys_file, new_keys, start)]
+        # Release the memory map before its file changes
+        self._stored_vectors = None
+
+        if appenders is not None and None not in appenders:
+            for append in appenders:
+                append()
+        else:
+            if appenders is not None:
+                new_keys = np.concatenate([np.load(keys_file)[:start], new_keys])
+                new_vectors = np.concatenate([np.load(vectors_file, mmap_mode="r")[:start], new_vectors])
+            # Write next to the target and rename, so readers never see half a file
+            for path, array in ((keys_file, new_keys), (vectors_file, new_vectors)):
+                tmp = path.with_name(path.stem + ".tmp.npy")
+                np.save(tmp, array)
+                os.replace(tmp, path)
+
+        # The saved entries are now stored rows; reopen the vectors map
+        self._stored_keys.update((key, start + row) for row, key in enumerate(self._new_keys))
+        self._new_keys, self._new_vectors, self._new_index = [], [], {}
+        self._stored_vectors = np.load(vectors_file, mmap_mode="r")
+
+    @property
+    def cached_sentences(self) -> int:
+        """Number of sentence embeddings in the cache (stored and new)"""
+        return len(self._stored_keys) + len(self._new_keys)
@@ -0,0 +1,163 @@
+"""
+Bounded training history shared by the iterative trainers
+Values are written into preallocated NumPy ring buffers, one per metric,
+every `stride` steps, so a long run keeps a fixed amount of memory and
+recording a step is a couple of array writes instead of list appends and
+array copies.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+OVERFLOW_MODES = ("ring", "downsample")
+
+
+class HistoryRecorder:
+    """
+    Fixed-size history of training metrics
+
+    Usage:
+        history = HistoryRecorder(capacity=1000, stride=10)
+        for step in range(n_steps):
+            if history.should_record(step):
+                history.record(step, loss=loss, weights=w)
+        plt.plot(history.steps, history["loss"])
+
+    Every metric is a scalar or an array of fixed shape (e.g. a weight
+    vector); its buffer is allocated on the first record.
+    """
+
+    def __init__(self, capacity: int = 1000, stride: int = 1, overflow: str = "ring"):
+        """
+        Args:
+            capacity: Samples kept per metric
+            stride: Record every stride-th step (step 0, stride, 2·stride, ...)
+            overflow: What happens when the buffers are full:
+                "ring"       - overwrite the oldest samples (keeps the latest
+                               capacity samples)
+                "downsample" - drop every other sample and double the stride
+                               (keeps the whole run at a coarser resolution)
+        """
+        if capacity < 2:
+            raise ValueError("capacity must be at least 2")
+        if stride < 1:
+            raise ValueError("stride must be at least 1")
+        if overflow not in OVERFLOW_MODES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_MODES}, got {overflow!r}")
+        self.capacity = capacity
+        self.stride = stride
+        self.initial_stride = stride
+        self.overflow = overflow
+        self._steps = np.empty(capacity, dtype=np.int64)
+        self._buffers: dict[str, np.ndarray] = {}
+        self._start = 0      # Index of the oldest sample
+        self._count = 0
+        self._last_step: int | None = None
+
+    def should_record(self, step: int) -> bool:
+        """Whether record(step) would store a sample (skip computing values otherwise)"""
+        return step % self.stride == 0
+
+    def record(self, step: int, force: bool = False, **values) -> bool:
+        """
+        Store the values of one step if it falls on the stride
+
+        Args:
+            step: Iteration/epoch number (increasing)
+            force: Record even off the stride (e.g. the final step)
+            **values: Metric name -> scalar or array
+
+        Returns:
+            True if the sample was stored
+        """
+        if not (force or self.should_record(step)) or step == self._last_step:
+            return False
+        if self._count == self.capacity:
+            if self.overflow == "downsample":
+                while self._count == self.capacity:
+                    self._downsample()
+                if not (force or self.should_record(step)):
+                    return False
+            else:
+                self._start = (self._start + 1) % self.capacity
+                self._count -= 1
+
+        index = (self._start + self._count) % self.capacity
+        self._steps[index] = step
+        for name, value in values.items():
+            buffer = self._buffers.get(name)
+            if buffer is None:
+                value = np.asarray(value, dtype=np.float64)
+                buffer = self._buffers[name] = np.full((self.capacity,) + value.shape, np.nan)
+            buffer[index] = value
+        self._count += 1
+        self._last_step = step
+        return True
+
+    def _downsample(self):
+        """Double the stride and keep only the samples on the new stride"""
+        order = self._order()
+        keep = order[self._steps[order] % (2 * self.stride) == 0]
+        n = len(keep)
+        self._steps[:n] = self._steps[keep]
+        for buffer in self._buffers.values():
+            buffer[:n] = buffer[keep]
+        self._start = 0
+        self._count = n
+        self.stride *= 2
+
+    def _order(self) -> np.ndarray:
+        """Buffer indices of the stored samples, oldest first"""
+        return (self._start + np.arange(self._count)) % self.capacity
+
+    @property
+    def steps(self) -> np.ndarray:
+        """Step number of every stored sample, oldest first"""
+        return self._steps[self._order()]
+
+    @property
+    def fields(self) -> list[str]:
+        """Names of the recorded metrics"""
+        return list(self._buffers)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """Values of one metric, oldest first (a copy)"""
+        return self._buffers[name][self._order()]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._buffers
+
+    def __len__(self) -> int:
+        return self._count
+
+    def last(self, name: str):
+        """Most recent value of a metric"""
+        if not self._count:
+            raise IndexError("history is empty")
+        return self._buffers[name][(self._start + self._count - 1) % self.capacity]
+
+    def clear(self):
+        """
+        Forget all samples and metrics and restore the initial stride
+
+        The buffers are dropped too: the next run may record metrics of a
+        different shape (e.g. a refit on data with more features).
+        """
+        self._buffers = {}
+        self._start = 0
+        self._count = 0
+        self._last_step = None
+        self.stride = self.initial_stride
+
+    def to_dict(self) -> dict:
+        """{'step': [...], metric: [...]} with plain lists (JSON friendly)"""
+        result = {"step": self.steps.tolist()}
+        for name in self._buffers:
+            result[name] = self[name].tolist()
+        return result
+
+    @property
+    def nbytes(self) -> int:
+        """Memory of all buffers (fixed once every metric has been recorded)"""
+        return self._steps.nbytes + sum(buffer.nbytes for buffer in self._buffers.values())
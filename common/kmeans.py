@@ -0,0 +1,467 @@
+"""
+Reusable K-means engine shared by the K-means lessons
+k-means++ initialization, GEMM-based distances (||x||² - 2x·c + ||c||²)
+and a pluggable distance backend, so no N×k×d tensor is ever allocated.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
+
+
+# =============================================================================
+# Distance backends
+# =============================================================================
+
+def gemm_squared_distances(
+    points: np.ndarray,
+    centers: np.ndarray,
+    points_sq: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Squared Euclidean distances via ||x||² - 2x·c + ||c||²
+    One matrix product (N×d @ d×k) instead of an N×k×d broadcast.
+    """
+    if points_sq is None:
+        points_sq = np.einsum("ij,ij->i", points, points)
+    centers_sq = np.einsum("ij,ij->i", centers, centers)
+    distances = points_sq[:, None] - 2.0 * (points @ centers.T) + centers_sq[None, :]
+    # Cancellation can leave tiny negative values
+    return np.maximum(distances, 0.0, out=distances)
+
+
+def loop_squared_distances(
+    points: np.ndarray,
+    centers: np.ndarray,
+    points_sq: np.ndarray | None = None,
+) -> np.ndarray:
+    """Reference backend: one N×d difference per center (exact, slower)"""
+    distances = np.empty((points.shape[0], centers.shape[0]), dtype=points.dtype)
+    for i, center in enumerate(centers):
+        diff = points - center
+        distances[:, i] = np.einsum("ij,ij->i", diff, diff)
+    return distances
+
+
+DistanceBackend = Callable[[np.ndarray, np.ndarray, Optional[np.ndarray]], np.ndarray]
+
+BACKENDS: dict[str, DistanceBackend] = {
+    "gemm": gemm_squared_distances,
+    "loop": loop_squared_distances,
+}
+
+
+def register_backend(name: str, backend: DistanceBackend) -> None:
+    """Adds a distance backend (e.g. a GPU implementation) under a name"""
+    BACKENDS[name] = backend
+
+
+def get_backend(backend: str | DistanceBackend) -> DistanceBackend:
+    """Resolves a backend name (or passes a callable through)"""
+    if callable(backend):
+        return backend
+    try:
+        return BACKENDS[backend]
+    except KeyError:
+        raise ValueError(
+            f"Unknown distance backend '{backend}'. Available: {sorted(BACKENDS)}"
+        ) from None
+
+
+# =============================================================================
+# Building blocks
+# =============================================================================
+
+def kmeans_plus_plus(
+    points: np.ndarray,
+    k: int,
+    rng: np.random.Generator,
+    backend: DistanceBackend = gemm_squared_distances,
+    points_sq: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    k-means++ initialization: each new center is sampled with probability
+    proportional to its squared distance from the nearest chosen center.
+    """
+    n_samples = points.shape[0]
+    centers = np.empty((k, points.shape[1]), dtype=points.dtype)
+    centers[0] = points[rng.integers(n_samples)]
+    closest = backend(points, centers[:1], points_sq)[:, 0]
+
+    for i in range(1, k):
+        total = closest.sum()
+        if total > 0:
+            index = rng.choice(n_samples, p=closest / total)
+        else:
+            # All points coincide with chosen centers
+            index = rng.integers(n_samples)
+        centers[i] = points[index]
+        new_distances = backend(points, centers[i:i + 1], points_sq)[:, 0]
+        np.minimum(closest, new_distances, out=closest)
+
+    return centers
+
+
+def assign_labels(
+    points: np.ndarray,
+    centers: np.ndarray,
+    backend: DistanceBackend = gemm_squared_distances,
+    points_sq: np.ndarray | None = None,
+    chunk_size: int = 65536,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Nearest center for each point, in row chunks so only chunk_size×k
+    distances exist at a time.
+
+    Returns:
+        labels: Index of the nearest center
+        min_distances: Squared distance to that center
+    """
+    n_samples = points.shape[0]
+    labels = np.empty(n_samples, dtype=np.intp)
+    min_distances = np.empty(n_samples, dtype=points.dtype)
+
+    for start in range(0, n_samples, chunk_size):
+        stop = min(start + chunk_size, n_samples)
+        chunk_sq = None if points_sq is None else points_sq[start:stop]
+        distances = backend(points[start:stop], centers, chunk_sq)
+        labels[start:stop] = distances.argmin(axis=1)
+        min_distances[start:stop] = distances[
+            np.arange(stop - start), labels[start:stop]
+        ]
+
+    return labels, min_distances
+
+
+def cluster_sums(
+    points: np.ndarray,
+    labels: np.ndarray,
+    k: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Number of points and coordinate sums per cluster
+    Accumulated with bincount per dimension - no Python loop over the
+    points and no N×k one-hot matrix.
+    """
+    counts = np.bincount(labels, minlength=k)
+    sums = np.empty((k, points.shape[1]), dtype=np.float64)
+    for j in range(points.shape[1]):
+        sums[:, j] = np.bincount(labels, weights=points[:, j], minlength=k)
+    return counts, sums
+
+
+def update_centers(
+    points: np.ndarray,
+    labels: np.ndarray,
+    previous_centers: np.ndarray,
+) -> np.ndarray:
+    """Mean of the points in each cluster (empty clusters keep their old center)"""
+    counts, sums = cluster_sums(points, labels, previous_centers.shape[0])
+    centers = previous_centers.copy()
+    non_empty = counts > 0
+    centers[non_empty] = sums[non_empty] / counts[non_empty, None]
+    return centers
+
+
+# =============================================================================
+# Engine
+# =============================================================================
+
+@dataclass
+class KMeansResult:
+    """Result of one K-means run"""
+    labels: np.ndarray
+    centers: np.ndarray
+    inertia: float
+    n_iter: int
+    distance_evaluations: int = 0
+    skipped_evaluations: int = 0
+
+
+# Above this many points, algorithm="auto" switches to mini-batch updates
+MINIBATCH_THRESHOLD = 100_000
+
+
+class KMeansEngine:
+    """
+    K-means clustering (Lloyd or mini-batch iterations) with pluggable pieces
+
+    Args:
+        n_clusters: Number of clusters (k)
+        init: "k-means++", "random", or an explicit (k, d) array of centers
+        max_iter: Maximum Lloyd iterations (mini-batch: passes over the data)
+        n_init: Number of runs with different seeds (best inertia is kept)
+        dtype: np.float64 or np.float32 (halves memory, faster GEMM)
+        backend: Name of a registered distance backend or a callable
+        random_state: Seed or np.random.Generator
+        chunk_size: Rows per distance block during assignment
+        algorithm: "lloyd", "hamerly" (Lloyd with triangle-inequality
+            bounds - same result, fewer distances), "minibatch", or "auto"
+            (Hamerly up to 100k points, mini-batch above)
+        batch_size: Points per mini-batch step
+        max_no_improvement: Mini-batch early stopping - steps without a new
+            best smoothed batch inertia before stopping
+    """
+
+    def __init__(
+        self,
+        n_clusters: int = 3,
+        init: str | np.ndarray = "k-means++",
+        max_iter: int = 300,
+        n_init: int = 1,
+        dtype: type = np.float64,
+        backend: str | DistanceBackend = "gemm",
+        random_state: int | np.random.Generator | None = None,
+        chunk_size: int = 65536,
+        algorithm: str = "lloyd",
+        batch_size: int = 1024,
+        max_no_improvement: int = 10,
+    ):
+        self.n_clusters = n_clusters
+        self.init = init
+        self.max_iter = max_iter
+        self.n_init = n_init
+        self.dtype = dtype
+        self.backend = get_backend(backend)
+        self.rng = np.random.default_rng(random_state)
+        self.chunk_size = chunk_size
+        if algorithm not in ("lloyd", "hamerly", "minibatch", "auto"):
+            raise ValueError(f"Unknown algorithm '{algorithm}'")
+        self.algorithm = algorithm
+        self.batch_size = batch_size
+        self.max_no_improvement = max_no_improvement
+
+        self.labels_: np.ndarray | None = None
+        self.cluster_centers_: np.ndarray | None = None
+        self.inertia_: float | None = None
+        self.n_iter_: int = 0
+        self.distance_evaluations_: int = 0
+        self.skipped_distance_evaluations_: int = 0
+
+    def _initial_centers(
+        self, points: np.ndarray, points_sq: np.ndarray
+    ) -> np.ndarray:
+        if isinstance(self.init, np.ndarray):
+            return self.init.astype(points.dtype, copy=True)
+        if self.init == "random":
+            indices = self.rng.choice(points.shape[0], self.n_clusters, replace=False)
+            return points[indices].copy()
+        if self.init == "k-means++":
+            return kmeans_plus_plus(
+                points, self.n_clusters, self.rng, self.backend, points_sq
+            )
+        raise ValueError(f"Unknown init '{self.init}'")
+
+    def _run_lloyd(
+        self, points: np.ndarray, points_sq: np.ndarray, centers: np.ndarray
+    ) -> KMeansResult:
+        n_iter = 0
+        for n_iter in range(1, self.max_iter + 1):
+            labels, _ = assign_labels(
+                points, centers, self.backend, points_sq, self.chunk_size
+            )
+            new_centers = update_centers(points, labels, centers).astype(points.dtype)
+
+            converged = np.allclose(new_centers, centers)
+            centers = new_centers
+            if converged:
+                break
+
+        labels, min_distances = assign_labels(
+            points, centers, self.backend, points_sq, self.chunk_size
+        )
+        evaluations = (n_iter + 1) * points.shape[0] * self.n_clusters
+        return KMeansResult(
+            labels, centers, float(min_distances.sum()), n_iter, evaluations
+        )
+
+    def _run_hamerly(
+        self, points: np.ndarray, points_sq: np.ndarray, centers: np.ndarray
+    ) -> KMeansResult:
+        """
+        Lloyd iterations accelerated with Hamerly's bounds (Hamerly, 2010)
+
+        Each point keeps an upper bound on the distance to its own center
+        and one lower bound on the distance to every other center. After
+        the centers move, the bounds are shifted by the center movements;
+        a point is only re-examined if upper > max(lower, s(own center)),
+        where s(j) is half the distance from center j to its closest
+        neighbour. Produces the same clustering as Lloyd.
+        """
+        n_samples, k = points.shape[0], self.n_clusters
+
+        def full_distances(index: np.ndarray) -> np.ndarray:
+            squared = self.backend(points[index], centers, points_sq[index])
+            return np.sqrt(squared)
+
+        everyone = np.arange(n_samples)
+        distances = full_distances(everyone)
+        labels = distances.argmin(axis=1)
+        upper = distances[everyone, labels]
+        distances[everyone, labels] = np.inf
+        lower = distances.min(axis=1) if k > 1 else np.full(n_samples, np.inf)
+        del distances
+
+        evaluations = n_samples * k
+        possible = n_samples * k
+        n_iter = 0
+        for n_iter in range(1, self.max_iter + 1):
+            new_centers = update_centers(points, labels, centers).astype(points.dtype)
+            converged = np.allclose(new_centers, centers)
+            shift = np.sqrt(((new_centers - centers) ** 2).sum(axis=1))
+            centers = new_centers
+
+            # Shift the bounds by how far the centers moved
+            upper += shift[labels]
+            if k > 1:
+                order = np.argsort(shift)
+                largest, second = shift[order[-1]], shift[order[-2]]
+                lower -= np.where(labels == order[-1], second, largest)
+
+            # Half the distance from each center to its nearest other center
+            center_gaps = np.sqrt(np.maximum(
+                gemm_squared_distances(centers, centers), 0.0
+            ))
+            np.fill_diagonal(center_gaps, np.inf)
+            half_gap = 0.5 * center_gaps.min(axis=1)
+
+            possible += n_samples * k
+            bound = np.maximum(half_gap[labels], lower)
+            candidates = np.flatnonzero(upper > bound)
+            if candidates.size:
+                # Tighten the upper bound with one exact distance
+                diff = points[candidates] - centers[labels[candidates]]
+                upper[candidates] = np.sqrt(np.einsum("ij,ij->i", diff, diff))
+                evaluations += candidates.size
+                candidates = candidates[upper[candidates] > bound[candidates]]
+
+            if candidates.size:
+                # Bounds could not rule out a change: compute all k distances
+                distances = full_distances(candidates)
+                evaluations += candidates.size * k
+                rows = np.arange(candidates.size)
+                new_labels = distances.argmin(axis=1)
+                labels[candidates] = new_labels
+                upper[candidates] = distances[rows, new_labels]
+                distances[rows, new_labels] = np.inf
+                lower[candidates] = distances.min(axis=1)
+
+            if converged:
+                break
+
+        diff = points - centers[labels]
+        inertia = float(np.einsum("ij,ij->i", diff, diff).sum())
+        return KMeansResult(
+            labels, centers, inertia, n_iter, evaluations, possible - evaluations
+        )
+
+    def _run_minibatch(
+        self, points: np.ndarray, points_sq: np.ndarray, centers: np.ndarray
+    ) -> KMeansResult:
+        """
+        Mini-batch K-means (Sculley, 2010)
+        Each center moves toward its batch points with a per-center learning
+        rate 1 / (points seen so far), so memory per step is batch_size×k.
+        Stops early once the smoothed batch inertia stops improving.
+        """
+        n_samples = points.shape[0]
+        batch_size = min(self.batch_size, n_samples)
+        n_steps = max(1, self.max_iter * n_samples // batch_size)
+        seen = np.zeros(self.n_clusters, dtype=np.float64)
+        centers = centers.astype(np.float64)
+
+        smoothed = None
+        best = np.inf
+        no_improvement = 0
+        alpha = min(1.0, 2.0 * batch_size / (n_samples + 1))
+        step = 0
+        for step in range(1, n_steps + 1):
+            batch = self.rng.integers(n_samples, size=batch_size)
+            labels, min_distances = assign_labels(
+                points[batch], centers.astype(points.dtype),
+                self.backend, points_sq[batch], self.chunk_size,
+            )
+
+            counts, sums = cluster_sums(points[batch], labels, self.n_clusters)
+            updated = counts > 0
+            seen[updated] += counts[updated]
+            centers[updated] += (
+                sums[updated] - counts[updated, None] * centers[updated]
+            ) / seen[updated, None]
+
+            # Early stopping on an exponentially weighted batch inertia
+            batch_inertia = float(min_distances.mean())
+            smoothed = batch_inertia if smoothed is None else (
+                (1 - alpha) * smoothed + alpha * batch_inertia
+            )
+            if smoothed < best:
+                best = smoothed
+                no_improvement = 0
+            else:
+                no_improvement += 1
+                if no_improvement >= self.max_no_improvement:
+                    break
+
+        centers = centers.astype(points.dtype)
+        labels, min_distances = assign_labels(
+            points, centers, self.backend, points_sq, self.chunk_size
+        )
+        evaluations = (step * batch_size + n_samples) * self.n_clusters
+        return KMeansResult(
+            labels, centers, float(min_distances.sum()), step, evaluations
+        )
+
+    def _resolve_algorithm(self, n_samples: int) -> str:
+        if self.algorithm == "auto":
+            return "minibatch" if n_samples > MINIBATCH_THRESHOLD else "hamerly"
+        return self.algorithm
+
+    def fit(self, points: np.ndarray) -> "KMeansEngine":
+        """Clusters the points; results are stored in labels_, cluster_centers_"""
+        points = np.ascontiguousarray(points, dtype=self.dtype)
+        points_sq = np.einsum("ij,ij->i", points, points)
+
+        algorithm = self._resolve_algorithm(points.shape[0])
+        best: KMeansResult | None = None
+        evaluations = skipped = 0
+        for _ in range(self.n_init):
+            if algorithm == "minibatch":
+                # Initialize on a random subsample to keep k-means++ cheap
+                init_size = min(points.shape[0], max(3 * self.batch_size, 10 * self.n_clusters))
+                sample = self.rng.choice(points.shape[0], init_size, replace=False)
+                centers = self._initial_centers(points[sample], points_sq[sample])
+                result = self._run_minibatch(points, points_sq, centers)
+            elif algorithm == "hamerly":
+                centers = self._initial_centers(points, points_sq)
+                result = self._run_hamerly(points, points_sq, centers)
+            else:
+                centers = self._initial_centers(points, points_sq)
+                result = self._run_lloyd(points, points_sq, centers)
+            evaluations += result.distance_evaluations
+            skipped += result.skipped_evaluations
+            if best is None or result.inertia < best.inertia:
+                best = result
+
+        self.labels_ = best.labels
+        self.cluster_centers_ = best.centers
+        self.inertia_ = best.inertia
+        self.n_iter_ = best.n_iter
+        # Totals over all n_init runs
+        self.distance_evaluations_ = evaluations
+        self.skipped_distance_evaluations_ = skipped
+        return self
+
+    def fit_predict(self, points: np.ndarray) -> np.ndarray:
+        """Clusters the points and returns their labels"""
+        return self.fit(points).labels_
+
+    def predict(self, points: np.ndarray) -> np.ndarray:
+        """Nearest learned center for new points"""
+        points = np.ascontiguousarray(points, dtype=self.dtype)
+        labels, _ = assign_labels(
+            points, self.cluster_centers_, self.backend, chunk_size=self.chunk_size
+        )
+        return labels
@@ -0,0 +1,111 @@
+"""
+Cluster-to-label matching for evaluating clustering results
+A bincount confusion matrix plus the Hungarian algorithm (O(k³)) replaces
+trying all k! label permutations.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+
+def confusion_matrix(
+    true_labels: np.ndarray,
+    predicted_labels: np.ndarray,
+    n_true: int | None = None,
+    n_predicted: int | None = None,
+) -> np.ndarray:
+    """
+    Confusion matrix (rows = true labels, columns = predicted labels)
+    Built with one np.bincount over combined indices instead of a Python
+    loop over every point.
+    """
+    true_labels = np.asarray(true_labels, dtype=np.intp)
+    predicted_labels = np.asarray(predicted_labels, dtype=np.intp)
+    if n_true is None:
+        n_true = int(true_labels.max()) + 1 if true_labels.size else 0
+    if n_predicted is None:
+        n_predicted = int(predicted_labels.max()) + 1 if predicted_labels.size else 0
+
+    combined = true_labels * n_predicted + predicted_labels
+    counts = np.bincount(combined, minlength=n_true * n_predicted)
+    return counts.reshape(n_true, n_predicted)
+
+
+def hungarian(cost: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Minimum-cost assignment (Hungarian algorithm with potentials, O(n²m))
+
+    Args:
+        cost: (n, m) cost matrix; rectangular matrices are allowed
+
+    Returns:
+        rows, cols: Assigned pairs (each row/column used at most once),
+            sorted by row
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+
+    # 1-based arrays; index 0 is a virtual column used to start each search
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    row_of_col = np.zeros(m + 1, dtype=np.intp)
+    previous = np.zeros(m + 1, dtype=np.intp)
+
+    for row in range(1, n + 1):
+        row_of_col[0] = row
+        col = 0
+        min_slack = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[col] = True
+            current_row = row_of_col[col]
+            # Reduced costs from the current row to every unused column
+            free = ~used[1:]
+            reduced = cost[current_row - 1] - u[current_row] - v[1:]
+            improve = free & (reduced < min_slack[1:])
+            min_slack[1:][improve] = reduced[improve]
+            previous[1:][improve] = col
+
+            candidates = np.where(free, min_slack[1:], np.inf)
+            next_col = int(candidates.argmin()) + 1
+            delta = candidates[next_col - 1]
+
+            u[row_of_col[used]] += delta
+            v[used] -= delta
+            min_slack[~used] -= delta
+
+            col = next_col
+            if row_of_col[col] == 0:
+                break
+
+        # Augment along the alternating path
+        while col:
+            prev_col = previous[col]
+            row_of_col[col] = row_of_col[prev_col]
+            col = prev_col
+
+    cols = np.flatnonzero(row_of_col[1:])
+    rows = row_of_col[1:][cols] - 1
+    if transposed:
+        rows, cols = cols, rows
+    order = np.argsort(rows)
+    return rows[order], cols[order]
+
+
+def match_labels(matrix: np.ndarray) -> dict[int, int]:
+    """
+    Best one-to-one mapping predicted cluster -> true label
+
+    Args:
+        matrix: Confusion matrix (rows = true, columns = predicted)
+
+    Returns:
+        mapping: {predicted_cluster: true_label} maximizing the number of
+            correctly matched points
+    """
+    true_rows, predicted_cols = hungarian(-np.asarray(matrix))
+    return {int(p): int(t) for t, p in zip(true_rows, predicted_cols)}
@@ -0,0 +1,42 @@
+"""
+Tests of the shared training history (common/history.py)
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+sys.path.append(str(ROOT / "L18-logistic-regression-binary-classification"))
+from common.history import HistoryRecorder
+
+
+def test_clear_drops_metrics_of_the_previous_run():
+    history = HistoryRecorder(capacity=10)
+    for step in range(3):
+        history.record(step, loss=1.0, weights=np.zeros(3))
+
+    history.clear()
+    for step in range(2):
+        history.record(step, weights=np.ones(5))
+
+    assert history.fields == ["weights"]
+    assert history["weights"].shape == (2, 5)
+    assert "loss" not in history
+
+
+def test_logistic_regression_refit_with_other_feature_counts():
+    from logistic_regression import LogisticRegression
+
+    rng = np.random.default_rng(0)
+    model = LogisticRegression(n_iterations=20, history_stride=5)
+    for n_features in (3, 5, 1):
+        X = rng.normal(size=(50, n_features))
+        y = (X[:, 0] > 0).astype(float)
+        model.fit(X, y, verbose=False)
+
+        assert model.beta_history.shape == (len(model.history), n_features)
+        np.testing.assert_array_equal(model.history.steps, [0, 5, 10, 15, 19])
+        assert not np.isnan(model.beta_history).any()